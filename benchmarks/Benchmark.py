@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Times the quickstart stages on synthetic projects and compares the timings
+to a stored baseline:
+
+    python3 benchmarks/Benchmark.py --sizes 1000 100000 --output new.json
+    python3 benchmarks/Benchmark.py --baseline new.json
+
+The projects are generated once per scenario and size in the work
+directory, which can be kept with ``--work-dir`` to reuse them.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARK_DIR)
+# The working tree is benchmarked, not an installed version.
+sys.path.insert(0, REPO_DIR)
+
+from SyntheticProject import SCENARIOS, generate_project  # noqa: E402
+
+
+def time_call(function, repeat):
+    """
+    Runs a function several times.
+
+    :param function: The function to call without arguments.
+    :param repeat:   The number of calls.
+    :return:         A tuple of the list of the durations of the calls in
+                     seconds and the return value of the last call.
+    """
+    durations = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        durations.append(time.perf_counter() - start)
+    return durations, result
+
+
+def run_quickstart(project_dir, cache_dir):
+    """
+    Runs ``coala-quickstart --ci`` in a project and removes the generated
+    coafile.
+
+    :param project_dir: The project directory.
+    :param cache_dir:   The ``XDG_CACHE_HOME`` of the run, so that the bear
+                        cache of the user is not touched.
+    """
+    env = dict(os.environ, XDG_CACHE_HOME=cache_dir,
+               PYTHONPATH=os.pathsep.join(
+                   [REPO_DIR] + os.environ.get("PYTHONPATH", "").split(
+                       os.pathsep)))
+    subprocess.check_call(
+        [sys.executable, os.path.join(REPO_DIR, "coala-quickstart"), "--ci"],
+        cwd=project_dir, env=env, stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL)
+    for name in (".coafile", ".coafile.new"):
+        path = os.path.join(project_dir, name)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def benchmark_project(project_dir, repeat, jobs=None, cache_dir=None):
+    """
+    Times the stages of the quickstart on a project.
+
+    :param project_dir: The project directory.
+    :param repeat:      The number of runs of each stage.
+    :param jobs:        The number of threads scanning the project.
+    :param cache_dir:   The ``XDG_CACHE_HOME`` of the end-to-end runs, which
+                        are skipped if ``None``.
+    :return:            An ``OrderedDict`` with the stage names as keys and
+                        the lists of durations as values.
+    """
+    from pyprint.NullPrinter import NullPrinter
+    from coalib.output.printers.LogPrinter import LogPrinter
+    from coala_quickstart.generation.FileGlobs import get_project_files
+    from coala_quickstart.generation.Project import get_used_languages
+    from coala_quickstart.generation.Settings import generate_ignore_field
+    from coala_quickstart.generation.Utilities import (
+        get_extensions, split_by_language)
+
+    printer = NullPrinter()
+    log_printer = LogPrinter(printer)
+    timings = OrderedDict()
+
+    timings["get_project_files"], (index, ignore_globs) = time_call(
+        lambda: get_project_files(log_printer, printer, project_dir, jobs,
+                                  "filesystem", ignore_globs=[]),
+        repeat)
+    timings["get_used_languages"], _ = time_call(
+        lambda: list(get_used_languages(index)), repeat)
+    timings["split_by_language"], lang_files = time_call(
+        lambda: split_by_language(index), repeat)
+    extset = get_extensions(index)
+    # Given the index, which already knows which globs match, nothing would
+    # be done. Without it the project is scanned again for them.
+    timings["generate_ignore_field_rescan"], _ = time_call(
+        lambda: generate_ignore_field(project_dir, lang_files.keys(), extset,
+                                      ignore_globs, None),
+        repeat)
+    if cache_dir is not None:
+        timings["end_to_end"], _ = time_call(
+            lambda: run_quickstart(project_dir, cache_dir), repeat)
+    return timings
+
+
+def summarize(durations):
+    """
+    >>> summarize([0.3, 0.1, 0.2])
+    {'min': 0.1, 'median': 0.2, 'runs': 3}
+
+    :param durations: A list of durations.
+    :return:          A dict with their minimum, median and number.
+    """
+    return {"min": min(durations), "median": statistics.median(durations),
+            "runs": len(durations)}
+
+
+def compare(results, baseline, threshold, min_delta=0.0):
+    """
+    Compares the median durations to the ones of a baseline.
+
+    >>> lines, regressions = compare(
+    ...     {"a": {"median": 2.0}, "b": {"median": 1.0}},
+    ...     {"a": {"median": 1.0}, "b": {"median": 1.0}}, 0.1)
+    >>> regressions
+    ['a']
+
+    :param results:   A dict with benchmark names as keys and summaries as
+                      values.
+    :param baseline:  The results of the baseline.
+    :param threshold: The relative slowdown above which a benchmark is a
+                      regression.
+    :param min_delta: The slowdown in seconds below which a benchmark is
+                      not a regression, whatever its relative slowdown.
+    :return:          A tuple of the lines of a comparison table and the
+                      list of the names of the regressions.
+    """
+    lines = ["{:<48} {:>10} {:>10} {:>7}".format(
+        "benchmark", "base [s]", "new [s]", "ratio")]
+    regressions = []
+    for name, summary in results.items():
+        if name not in baseline:
+            continue
+        old, new = baseline[name]["median"], summary["median"]
+        ratio = new / old if old else float("inf")
+        line = "{:<48} {:10.4f} {:10.4f} {:7.2f}".format(name, old, new,
+                                                        ratio)
+        if ratio > 1 + threshold and new - old > min_delta:
+            regressions.append(name)
+            line += "  regression"
+        lines.append(line)
+    return lines, regressions
+
+
+def _get_arg_parser():
+    arg_parser = argparse.ArgumentParser(
+        description="Benchmarks coala-quickstart on synthetic projects.")
+    arg_parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1000],
+        help="the numbers of files of the generated projects, for example "
+             "1000 100000 1000000")
+    arg_parser.add_argument(
+        "--scenarios", nargs="+", choices=list(SCENARIOS),
+        default=list(SCENARIOS), help="the kinds of projects to generate")
+    arg_parser.add_argument(
+        "--repeat", type=int, default=3,
+        help="the number of runs of each benchmark")
+    arg_parser.add_argument(
+        "-j", "--jobs", type=int, default=None,
+        help="the number of threads scanning the projects")
+    arg_parser.add_argument(
+        "--no-end-to-end", action="store_true",
+        help="do not time whole `coala-quickstart --ci` runs")
+    arg_parser.add_argument(
+        "--work-dir",
+        help="the directory the projects are generated in and reused from, "
+             "a temporary directory by default")
+    arg_parser.add_argument(
+        "--output", help="write the results as JSON to this file")
+    arg_parser.add_argument(
+        "--baseline", help="compare the results to this JSON file")
+    arg_parser.add_argument(
+        "--threshold", type=float, default=0.1,
+        help="the relative slowdown reported as a regression, 0.1 by "
+             "default")
+    arg_parser.add_argument(
+        "--min-delta", type=float, default=0.001,
+        help="the slowdown in seconds below which nothing is reported as a "
+             "regression, 0.001 by default")
+    return arg_parser
+
+
+def main():
+    args = _get_arg_parser().parse_args()
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="quickstart-bench-")
+    cache_dir = None
+    if not args.no_end_to_end:
+        cache_dir = os.path.join(work_dir, "cache")
+
+    results = OrderedDict()
+    try:
+        for size in args.sizes:
+            for scenario in args.scenarios:
+                project_dir = os.path.join(work_dir,
+                                           "{}-{}".format(scenario, size))
+                if not os.path.isdir(project_dir):
+                    start = time.perf_counter()
+                    generate_project(project_dir, size, **SCENARIOS[scenario])
+                    print("Generated {} in {:.1f}s".format(
+                        project_dir, time.perf_counter() - start))
+                if cache_dir is not None and not os.path.isdir(cache_dir):
+                    # The first run fills the bear cache.
+                    run_quickstart(project_dir, cache_dir)
+
+                timings = benchmark_project(project_dir, args.repeat,
+                                            args.jobs, cache_dir)
+                for stage, durations in timings.items():
+                    name = "{}/{}/{}".format(scenario, size, stage)
+                    results[name] = summarize(durations)
+                    print("{:<48} {:10.4f}".format(
+                        name, results[name]["median"]))
+    finally:
+        if args.work_dir is None:
+            shutil.rmtree(work_dir)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({"python": platform.python_version(),
+                       "platform": platform.platform(),
+                       "results": results}, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)["results"]
+        lines, regressions = compare(results, baseline, args.threshold,
+                                     args.min_delta)
+        print()
+        print("\n".join(lines))
+        return int(bool(regressions))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
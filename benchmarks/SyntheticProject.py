@@ -0,0 +1,152 @@
+import os
+import random
+from collections import OrderedDict
+
+
+# The extensions of the generated source files and how often they occur.
+# Files without an extension are scripts whose language is only known from
+# their shebang line.
+DEFAULT_MIX = OrderedDict([
+    (".py", 5), (".js", 5), (".c", 2), (".h", 2), (".md", 1),
+    (".json", 1), ("", 1)])
+
+POLYGLOT_MIX = OrderedDict([
+    (".py", 3), (".js", 3), (".ts", 3), (".c", 2), (".h", 2), (".cpp", 2),
+    (".java", 2), (".go", 2), (".rb", 2), (".rs", 1), (".php", 1),
+    (".sh", 1), (".yml", 1), (".html", 1), (".css", 1), (".md", 1),
+    (".json", 1), ("", 1)])
+
+# The scenarios the benchmarks are run on. Each one varies one aspect of
+# the default project.
+SCENARIOS = OrderedDict([
+    ("default", {}),
+    ("flat", {"depth": 1}),
+    ("deep", {"depth": 12, "fanout": 3}),
+    ("polyglot", {"mix": POLYGLOT_MIX}),
+    ("gitignore", {"gitignore_size": 500}),
+    ("large_gitignore", {"gitignore_size": 2000}),
+    ("node_modules", {"node_modules": 0.5, "node_modules_depth": 4}),
+])
+
+
+def _file_content(extension, rng):
+    """
+    :param extension: The extension of the file.
+    :param rng:       The ``random.Random`` object to use.
+    :return:          A few lines of content for a file.
+    """
+    if not extension:
+        return "#!/usr/bin/env {}\necho\n".format(
+            rng.choice(("python3", "bash", "ruby", "node")))
+    return "line\n" * rng.randint(1, 40)
+
+
+def _gitignore_lines(size, rng):
+    """
+    Generates the lines of a ``.gitignore`` file mixing the usual kinds of
+    patterns.
+
+    :param size: The number of lines besides ``node_modules/``.
+    :param rng:  The ``random.Random`` object to use.
+    :return:     A list of lines.
+    """
+    kinds = ("*.tmp{}", "build{}/", "/generated{}", "**/cache{}/",
+             "dir{}/*.log", "!keep{}.tmp", "# comment {}")
+    lines = ["node_modules/"]
+    for number in range(size):
+        lines.append(rng.choice(kinds).format(number))
+    return lines
+
+
+def generate_project(root, files=1000, depth=4, fanout=6, mix=DEFAULT_MIX,
+                     gitignore_size=10, node_modules=0.0,
+                     node_modules_depth=2, seed=0):
+    """
+    Generates a synthetic project tree. The same arguments always give the
+    same tree.
+
+    :param root:
+        The directory to generate the project in. It is created if needed.
+    :param files:
+        The number of files to generate.
+    :param depth:
+        The maximum depth of the source directories.
+    :param fanout:
+        The number of subdirectories each source directory may have.
+    :param mix:
+        A dict with extensions as keys and their relative frequency as
+        values.
+    :param gitignore_size:
+        The number of patterns of the ``.gitignore`` file, which always
+        ignores ``node_modules`` as well. A tenth of the source files are
+        in ``build`` directories ignored by the patterns.
+    :param node_modules:
+        The share of the files that are in nested ``node_modules``
+        directories.
+    :param node_modules_depth:
+        How deep ``node_modules`` directories are nested in each other.
+    :param seed:
+        The seed of the random generator.
+    :return:
+        The number of files generated.
+    """
+    rng = random.Random(seed)
+    extensions = list(mix)
+    weights = [mix[extension] for extension in extensions]
+
+    ignored_dirs = ["build{}".format(number)
+                    for number in range(min(gitignore_size, 5))]
+
+    os.makedirs(root, exist_ok=True)
+    with open(os.path.join(root, ".gitignore"), "w") as file:
+        lines = (_gitignore_lines(gitignore_size - len(ignored_dirs), rng) +
+                 [directory + "/" for directory in ignored_dirs])
+        file.write("\n".join(lines) + "\n")
+
+    created = set()
+
+    def write(relative_path, content):
+        directory = os.path.dirname(relative_path)
+        if directory not in created:
+            os.makedirs(os.path.join(root, directory), exist_ok=True)
+            created.add(directory)
+        with open(os.path.join(root, relative_path), "w") as file:
+            file.write(content)
+
+    for number in range(files):
+        extension = _weighted_choice(extensions, weights, rng)
+        name = "file{}{}".format(number, extension)
+
+        if rng.random() < node_modules:
+            parts = []
+            for _ in range(rng.randint(1, node_modules_depth)):
+                parts += ["node_modules", "pkg{}".format(rng.randrange(20))]
+            write(os.path.join(*parts + ["index{}.js".format(number)]),
+                  _file_content(".js", rng))
+            continue
+
+        parts = ["dir{}".format(rng.randrange(fanout))
+                 for _ in range(rng.randint(0, depth))]
+        if ignored_dirs and rng.random() < 0.1:
+            parts.insert(0, rng.choice(ignored_dirs))
+        write(os.path.join(*parts + [name]), _file_content(extension, rng))
+
+    return files
+
+
+def _weighted_choice(values, weights, rng):
+    """
+    Picks a value with a probability proportional to its weight. Unlike
+    ``random.choices``, it is available on every supported Python version.
+
+    :param values:  A list of values.
+    :param weights: A list of their weights.
+    :param rng:     The ``random.Random`` object to use.
+    :return:        One of the values.
+    """
+    point = rng.random() * sum(weights)
+    for value, weight in zip(values, weights):
+        point -= weight
+        if point < 0:
+            return value
+    return values[-1]
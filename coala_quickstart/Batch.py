@@ -0,0 +1,184 @@
+import copy
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# The bears loaded by ``run_batch`` before the worker processes are started,
+# so that forked workers share them instead of loading them again.
+_bears = None
+
+
+def collect_projects(paths, parents=False):
+    """
+    Collects the project directories of a batch run.
+
+    :param paths:
+        A list of paths of project directories or of files listing one
+        project directory per line. Empty lines and lines starting with
+        ``#`` are skipped, relative paths are relative to the file.
+    :param parents:
+        Whether the directories given are parents whose subdirectories,
+        except hidden ones, are the projects.
+    :return:
+        The list of the full paths of the projects, without duplicates.
+    """
+    projects = []
+    for path in paths:
+        if os.path.isfile(path):
+            with open(path) as file:
+                lines = [line.strip() for line in file]
+            base = os.path.dirname(os.path.abspath(path))
+            candidates = [os.path.join(base, os.path.expanduser(line))
+                          for line in lines
+                          if line and not line.startswith("#")]
+        elif parents and os.path.isdir(path):
+            candidates = sorted(entry.path for entry in os.scandir(path)
+                                if entry.is_dir() and
+                                not entry.name.startswith("."))
+        else:
+            candidates = [os.path.expanduser(path)]
+
+        for candidate in candidates:
+            candidate = os.path.abspath(candidate)
+            if candidate not in projects:
+                projects.append(candidate)
+    return projects
+
+
+def generate_project(project_dir, args):
+    """
+    Generates the coafile of one project of a batch run, without any
+    output or question. The ignore globs are only taken from the
+    ``.gitignore`` files.
+
+    :param project_dir: Full path of the project directory.
+    :param args:        The parsed command line arguments.
+    :return:            A dict with the ``project``, the ``status``, which
+                        is ``generated``, ``up to date`` or ``failed``,
+                        the path of the ``coafile``, the ``languages``
+                        used, the ``seconds`` it took and the ``error``
+                        message of a failure.
+    """
+    from pyprint.NullPrinter import NullPrinter
+    from coalib.output.printers.LogPrinter import LogPrinter
+    from coala_quickstart.coala_quickstart import generate_coafile
+
+    global _bears
+    start = time.perf_counter()
+    result = {"project": project_dir, "status": "failed", "coafile": None,
+              "languages": [], "seconds": 0, "error": None}
+
+    if not os.path.isdir(project_dir):
+        result["error"] = "The project directory does not exist."
+        return result
+
+    try:
+        if _bears is None:
+            # Workers that are not forked load the bears themselves. Their
+            # ``sys.argv`` is the one of quickstart, which the coala
+            # configuration must not be loaded from.
+            from coala_quickstart.generation.Bears import load_bears
+            _bears = load_bears(arg_list=[])
+        printer = NullPrinter()
+        coafile, languages = generate_coafile(
+            printer, LogPrinter(printer), project_dir, args,
+            bears=_bears, ignore_globs=[])
+    except (Exception, SystemExit) as exception:
+        result["error"] = "{}: {}".format(type(exception).__name__,
+                                          exception)
+    else:
+        result["status"] = "generated" if coafile else "up to date"
+        result["coafile"] = coafile
+        result["languages"] = languages
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def format_report(results):
+    """
+    Formats the summary of a batch run.
+
+    >>> print("\\n".join(format_report([
+    ...     {"project": "/a", "status": "generated", "seconds": 1.5,
+    ...      "error": None},
+    ...     {"project": "/b", "status": "failed", "seconds": 0.25,
+    ...      "error": "Broken."}])))
+    status        seconds  project
+    generated       1.500  /a
+    failed          0.250  /b  Broken.
+    1 generated, 1 failed
+
+    :param results: A list of the dicts returned by ``generate_project``.
+    :return:        A list of the lines of the summary.
+    """
+    lines = ["{:<12}  {:>7}  project".format("status", "seconds")]
+    counts = {}
+    for result in results:
+        line = "{:<12}  {:>7.3f}  {}".format(
+            result["status"], result["seconds"], result["project"])
+        if result["error"]:
+            line += "  " + result["error"]
+        lines.append(line)
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    lines.append(", ".join("{} {}".format(count, status)
+                           for status, count in sorted(
+                               counts.items(), key=lambda item: -item[1])))
+    return lines
+
+
+def run_batch(printer, args, arg_parser=None):
+    """
+    Generates the coafiles of many projects. The bears are loaded once and
+    the projects are generated concurrently by a pool of processes, as
+    many as ``args.jobs``.
+
+    :param printer:    A ``ConsolePrinter`` object.
+    :param args:       The parsed command line arguments.
+    :param arg_parser: The ``ArgumentParser`` used to load the coala
+                       configuration.
+    :return:           0 if every coafile was generated, 1 otherwise.
+    """
+    global _bears
+    projects = collect_projects(args.batch, args.batch_parents)
+    if not projects:
+        printer.print("No project was given to generate coafiles for.",
+                      color="red")
+        return 1
+
+    from coala_quickstart.generation.Bears import load_bears
+    _bears = load_bears(arg_parser)
+
+    # Each project is scanned by a single thread of its process.
+    project_args = copy.copy(args)
+    project_args.jobs = 1
+    project_args.non_interactive = True
+
+    results = []
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        futures = {executor.submit(generate_project, project, project_args):
+                   project for project in projects}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as exception:
+                # The worker process died, as when the pool is broken.
+                result = {"project": futures[future], "status": "failed",
+                          "coafile": None, "languages": [], "seconds": 0,
+                          "error": "{}: {}".format(type(exception).__name__,
+                                                   exception)}
+            results.append(result)
+            printer.print("[{}/{}] {}: {}".format(
+                len(results), len(projects), result["project"],
+                result["status"]),
+                color="red" if result["status"] == "failed" else "green")
+
+    results.sort(key=lambda result: projects.index(result["project"]))
+    printer.print()
+    printer.print("\n".join(format_report(results)))
+
+    if args.batch_report:
+        with open(args.batch_report, "w") as file:
+            json.dump(results, file, indent=2)
+
+    return int(any(result["status"] == "failed" for result in results))
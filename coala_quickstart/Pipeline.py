@@ -0,0 +1,108 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from coala_quickstart.Profiling import stage
+
+
+def _run_stage(name, function, *args):
+    """
+    Runs a function as a stage of the ``StageStats``.
+
+    :param name:     The name of the stage.
+    :param function: The function to run.
+    :param args:     The arguments passed to the function.
+    :return:         The return value of the function.
+    """
+    with stage(name):
+        return function(*args)
+
+
+def _get_used_languages(project_files, weight):
+    """
+    :param project_files: A ``ProjectIndex`` of the project.
+    :param weight:        How the languages are weighed.
+    :return:              The list of ``get_used_languages``.
+    """
+    from coala_quickstart.generation.Project import get_used_languages
+
+    return list(get_used_languages(project_files, weight))
+
+
+def collect_project(printer, log_printer, project_dir, args,
+                    arg_parser=None, bears=None, ignore_globs=None,
+                    state=None):
+    """
+    Runs the stages the bear selection depends on in a thread pool, waiting
+    for them on an ``asyncio`` event loop. The only overlap gained here is
+    that of loading the bears, which do not depend on the project files,
+    with the other stages. Walking the project directory and computing the
+    language statistics still run one after the other, since each needs
+    the result of the previous one. The language detection overlaps with
+    the walk inside ``ProjectIndex.scan``, not here.
+
+    The ignore globs are asked for before anything runs concurrently, so
+    that the questions are not mixed with other output.
+
+    :param printer:
+        A ``ConsolePrinter`` object used for console interactions.
+    :param log_printer:
+        A ``LogPrinter`` object.
+    :param project_dir:
+        Full path of the user's project directory.
+    :param args:
+        The parsed command line arguments.
+    :param arg_parser:
+        The ``ArgumentParser`` used to load the coala configuration.
+    :param bears:
+        The bears returned by ``load_bears``, which are loaded if ``None``.
+    :param ignore_globs:
+        The list of glob expressions of the files to ignore, given by
+        ``get_ignore_globs`` if ``None``.
+    :param state:
+        The ``ScanState`` of the previous run.
+    :return:
+        A tuple of the ``ProjectIndex`` and the ignore globs returned by
+        ``get_project_files``, the list of ``get_used_languages`` and the
+        bears.
+    """
+    from coala_quickstart.generation.Bears import load_bears
+    from coala_quickstart.generation.FileGlobs import (
+        get_ignore_globs, get_project_files)
+
+    if ignore_globs is None:
+        ignore_globs = get_ignore_globs(printer, project_dir)
+
+    estimator = None
+    if args.estimate:
+        from coala_quickstart.generation.Estimate import LanguageEstimator
+        estimator = LanguageEstimator()
+
+    event_loop = asyncio.new_event_loop()
+    executor = ThreadPoolExecutor(max_workers=2)
+    try:
+        bears_task = None
+        if bears is None:
+            bears_task = event_loop.run_in_executor(
+                executor, _run_stage, "load_bears", load_bears, arg_parser)
+
+        files_task = event_loop.run_in_executor(
+            executor, _run_stage, "get_project_files", functools.partial(
+                get_project_files, log_printer, printer, project_dir,
+                args.jobs, args.file_source, state, ignore_globs,
+                not args.low_memory, args.language_weight, estimator))
+        project_files, ignore_globs = event_loop.run_until_complete(
+            files_task)
+
+        languages_task = event_loop.run_in_executor(
+            executor, _run_stage, "get_used_languages", _get_used_languages,
+            project_files, args.language_weight)
+        used_languages = event_loop.run_until_complete(languages_task)
+
+        if bears_task is not None:
+            bears = event_loop.run_until_complete(bears_task)
+    finally:
+        executor.shutdown()
+        event_loop.close()
+
+    return project_files, ignore_globs, used_languages, bears
@@ -0,0 +1,411 @@
+import builtins
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import ExitStack, contextmanager
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None
+
+# The ``StageRecorder`` objects that are active, notified of every stage.
+_recorders = []
+
+
+class ImportTimer:
+    """
+    Measures how long each module takes to import while it is active, in
+    the manner of ``python -X importtime``. The cumulative time of a module
+    includes the modules it imports, its own time does not. Each thread
+    keeps its own stack of the modules being imported, so imports of
+    concurrent threads are not counted in each other.
+
+    >>> _ = sys.modules.pop("colorsys", None)
+    >>> with ImportTimer() as timer:
+    ...     import colorsys
+    >>> list(timer.timings)
+    ['colorsys']
+    """
+
+    def __init__(self):
+        self.timings = OrderedDict()
+        self._import = None
+        self._local = threading.local()
+
+    def __enter__(self):
+        self._import = builtins.__import__
+        builtins.__import__ = self._timed_import
+        return self
+
+    def __exit__(self, *exc_info):
+        builtins.__import__ = self._import
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(),
+                      level=0):
+        if level or name in sys.modules:
+            return self._import(name, globals, locals, fromlist, level)
+
+        stack = getattr(self._local, "children", None)
+        if stack is None:
+            stack = self._local.children = []
+        stack.append(0)
+        start = time.perf_counter()
+        try:
+            return self._import(name, globals, locals, fromlist, level)
+        finally:
+            cumulative = time.perf_counter() - start
+            children = stack.pop()
+            if stack:
+                stack[-1] += cumulative
+            if name in sys.modules:
+                self.timings[name] = (cumulative - children, cumulative)
+
+    def format(self, limit=None):
+        """
+        Formats the timings as a table, slowest modules first.
+
+        :param limit: The maximum number of modules to list, all if
+                      ``None``.
+        :return:      A list of lines.
+        """
+        timings = sorted(self.timings.items(),
+                         key=lambda item: item[1][1], reverse=True)
+        lines = ["{:>10} {:>10}  {}".format("self [s]", "cumul. [s]",
+                                            "module")]
+        for name, (own, cumulative) in timings[:limit]:
+            lines.append("{:10.4f} {:10.4f}  {}".format(own, cumulative,
+                                                        name))
+        return lines
+
+
+def get_peak_rss():
+    """
+    :return: The peak resident set size of the process so far in MiB, or
+             ``None`` if it cannot be read on this platform.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # The size is given in bytes on macOS and in KiB elsewhere.
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+
+class StageRecorder:
+    """
+    The base of the objects that are told about the stages of a run and
+    their counters while they are active.
+    """
+
+    def __enter__(self):
+        _recorders.append(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        _recorders.remove(self)
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Records a stage.
+
+        :param name: The name of the stage.
+        """
+        yield
+
+    def count(self, name, amount=1):
+        """
+        Records a counter of the current stage.
+
+        :param name:   The name of the counter.
+        :param amount: The amount to add.
+        """
+
+
+class StageStats(StageRecorder):
+    """
+    Records the wall time, the CPU time, the peak memory and counters of
+    every stage of a run while it is active. The stages are marked with
+    ``stage`` and the counters are incremented with ``count``, which do
+    nothing when no ``StageRecorder`` is active.
+
+    >>> with StageStats() as stats:
+    ...     with stage("walk"):
+    ...         count("files scanned", 3)
+    >>> stats.stages["walk"]["counters"]
+    {'files scanned': 3}
+
+    Stages may be nested, the counters are recorded for the innermost stage
+    of the thread incrementing them. The CPU time is the one of the whole
+    process, so it is shared by the stages running concurrently.
+    """
+
+    def __init__(self):
+        self.stages = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self):
+        """
+        :return: The list of the names of the stages the current thread is
+                 in, innermost last.
+        """
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Measures a stage. A stage run more than once is accumulated.
+
+        :param name: The name of the stage.
+        """
+        with self._lock:
+            record = self.stages.setdefault(name, {
+                "wall_time": 0.0, "cpu_time": 0.0, "peak_rss": None,
+                "counters": {}})
+        stack = self._stack()
+        stack.append(name)
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            with self._lock:
+                record["wall_time"] += time.perf_counter() - wall_start
+                record["cpu_time"] += time.process_time() - cpu_start
+                record["peak_rss"] = get_peak_rss()
+            stack.pop()
+
+    def count(self, name, amount=1):
+        """
+        Increments a counter of the innermost stage of the current thread.
+        Counts outside of any stage are not recorded.
+
+        :param name:   The name of the counter.
+        :param amount: The amount to add.
+        """
+        stack = self._stack()
+        if not stack:
+            return
+        with self._lock:
+            counters = self.stages[stack[-1]]["counters"]
+            counters[name] = counters.get(name, 0) + amount
+
+    def format(self):
+        """
+        Formats the statistics as a table, in the order the stages started.
+
+        :return: A list of lines.
+        """
+        lines = ["{:<32} {:>9} {:>9} {:>10}  {}".format(
+            "stage", "wall [s]", "cpu [s]", "rss [MiB]", "counters")]
+        for name, record in self.stages.items():
+            peak_rss = ("-" if record["peak_rss"] is None
+                        else "{:.1f}".format(record["peak_rss"]))
+            lines.append("{:<32} {:9.4f} {:9.4f} {:>10}  {}".format(
+                name, record["wall_time"], record["cpu_time"], peak_rss,
+                ", ".join("{}={}".format(counter, value) for counter, value
+                          in sorted(record["counters"].items()))))
+        return lines
+
+    def to_json(self):
+        """
+        :return: The statistics as a JSON object on a single line, with a
+                 list of the ``stages`` and their ``name``, ``wall_time``
+                 and ``cpu_time`` in seconds, ``peak_rss`` in MiB and
+                 ``counters``.
+        """
+        return json.dumps({"stages": [
+            dict(record, name=name) for name, record in self.stages.items()]},
+            sort_keys=True)
+
+
+class MemoryProfiler(StageRecorder):
+    """
+    Traces the memory allocations with ``tracemalloc`` while it is active
+    and records the source lines that allocated the most memory during each
+    stage. The allocations of nested and concurrent stages are included.
+
+    >>> with MemoryProfiler() as profiler:
+    ...     with stage("allocate"):
+    ...         blocks = [bytearray(4096) for _ in range(100)]
+    >>> site = profiler.stages["allocate"][0]
+    >>> site.traceback[0].lineno, site.size_diff >= 409600
+    (3, True)
+    """
+
+    def __init__(self, limit=10, frames=1):
+        """
+        :param limit:  The number of allocation sites kept for each stage.
+        :param frames: The number of frames stored for each allocation.
+        """
+        self.limit = limit
+        self.frames = frames
+        self.stages = OrderedDict()
+        self._started = False
+
+    def __enter__(self):
+        import tracemalloc
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started = True
+        return StageRecorder.__enter__(self)
+
+    def __exit__(self, *exc_info):
+        import tracemalloc
+
+        StageRecorder.__exit__(self, *exc_info)
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
+
+    def _snapshot(self):
+        """
+        :return: A snapshot of the traced allocations, without the ones of
+                 ``tracemalloc`` itself.
+        """
+        import tracemalloc
+
+        return tracemalloc.take_snapshot().filter_traces(
+            (tracemalloc.Filter(False, tracemalloc.__file__),))
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Records the allocation sites of a stage. A stage run more than once
+        keeps the sites of its last run.
+
+        :param name: The name of the stage.
+        """
+        before = self._snapshot()
+        try:
+            yield
+        finally:
+            differences = self._snapshot().compare_to(before, "lineno")
+            self.stages[name] = [
+                difference for difference in differences
+                if difference.size_diff > 0][:self.limit]
+
+    def format(self):
+        """
+        Formats the top allocation sites of each stage.
+
+        :return: A list of lines.
+        """
+        import linecache
+
+        lines = []
+        for name, differences in self.stages.items():
+            lines.append("{}: {:+.1f} KiB".format(
+                name, sum(difference.size_diff
+                          for difference in differences) / 1024))
+            for difference in differences:
+                frame = difference.traceback[0]
+                lines.append("  {:+10.1f} KiB {:+8d}  {}:{}  {}".format(
+                    difference.size_diff / 1024, difference.count_diff,
+                    frame.filename, frame.lineno,
+                    linecache.getline(frame.filename, frame.lineno).strip()))
+        return lines
+
+
+class CpuProfiler:
+    """
+    Profiles the run with ``cProfile`` while it is active, including the
+    threads started meanwhile, and writes the statistics to a ``.pstats``
+    file, which can be read with the ``pstats`` module or tools like
+    ``snakeviz``.
+
+    Before Python 3.12 a profile only sees the thread it was enabled in, so
+    one is started in every new thread. Since 3.12 ``cProfile`` is built on
+    ``sys.monitoring`` and the profile of the main thread sees all threads,
+    while enabling another one fails.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: The path of the ``.pstats`` file to write.
+        """
+        self.path = path
+        self._profiles = []
+        self._lock = threading.Lock()
+
+    def _profile_thread(self, *args):
+        """
+        Starts a profile in a new thread. It is installed with
+        ``threading.setprofile`` and replaces itself on the first event.
+        """
+        import cProfile
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler is active and already sees the thread.
+            sys.setprofile(None)
+            return
+        with self._lock:
+            self._profiles.append(profile)
+
+    def __enter__(self):
+        import cProfile
+
+        if sys.version_info < (3, 12):
+            threading.setprofile(self._profile_thread)
+        profile = cProfile.Profile()
+        self._profiles.append(profile)
+        profile.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._profiles[0].disable()
+        threading.setprofile(None)
+        self.dump()
+
+    def dump(self):
+        """
+        Writes the statistics of all profiled threads to the ``path``.
+        """
+        import pstats
+
+        with self._lock:
+            profiles = [profile for profile in self._profiles
+                        if profile.getstats()]
+        if not profiles:
+            return
+        stats = pstats.Stats(*profiles)
+        stats.dump_stats(os.path.abspath(self.path))
+
+
+@contextmanager
+def stage(name):
+    """
+    Marks a stage of the run for the active ``StageRecorder`` objects, if
+    any.
+
+    :param name: The name of the stage.
+    """
+    if not _recorders:
+        yield
+        return
+    with ExitStack() as stack:
+        for recorder in list(_recorders):
+            stack.enter_context(recorder.stage(name))
+        yield
+
+
+def count(name, amount=1):
+    """
+    Increments a counter of the current stage of the active
+    ``StageRecorder`` objects, if any.
+
+    :param name:   The name of the counter.
+    :param amount: The amount to add.
+    """
+    for recorder in _recorders:
+        recorder.count(name, amount)
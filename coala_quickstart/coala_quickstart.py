@@ -1,24 +1,9 @@
 import argparse
 import os
+import time
+from contextlib import ExitStack
 
-from pyprint.ConsolePrinter import ConsolePrinter
-
-from coalib.output.printers.LogPrinter import LogPrinter
-
-from coala_utils.Question import ask_question
-
-from coala_quickstart.interaction.Logo import print_welcome_message
-from coala_quickstart.generation.Project import (
-    valid_path, get_used_languages, print_used_languages)
-from coala_quickstart.generation.FileGlobs import get_project_files
-from coala_quickstart.generation.Bears import (
-    filter_relevant_bears,
-    print_relevant_bears,
-    get_non_optional_settings_bears,
-    remove_unusable_bears,
-)
-from coala_quickstart.generation.Settings import (
-    generate_settings, write_coafile)
+from coala_quickstart.Profiling import stage
 
 
 def _get_arg_parser():
@@ -39,43 +24,301 @@ coala-quickstart automatically creates a .coafile for use by coala.
         '--ci', action='store_const', dest='non_interactive', const=True,
         help='continuous integration run, alias for `--non-interactive`')
 
+    arg_parser.add_argument(
+        '-j', '--jobs', type=int, default=None,
+        help='number of threads used to scan the project directory, or of '
+             'processes used with `--batch`, defaults to the number of '
+             'processors')
+
+    arg_parser.add_argument(
+        '--file-source', choices=('auto', 'git', 'filesystem'),
+        default='auto',
+        help='list the project files from the git index or by walking the '
+             'project directory, by default git is used when possible')
+
+    arg_parser.add_argument(
+        '--language-weight', choices=('files', 'bytes', 'lines'),
+        default='files',
+        help='weigh the detected languages by their number of files '
+             '(default), their size in bytes or their number of lines')
+
+    arg_parser.add_argument(
+        '--answers', metavar='FILE', type=_load_answers,
+        help='a JSON, YAML or ini file with the values of bear settings, '
+             'by bear or section name, or for every bear, so that they are '
+             'not asked for')
+
+    arg_parser.add_argument(
+        '--prerequisite-check', action='store_true', default=None,
+        help='check whether the executables and packages the selected bears '
+             'need are installed, which is done by default in non '
+             'interactive mode, where bears whose prerequisites are missing '
+             'are left out')
+
+    arg_parser.add_argument(
+        '--no-prerequisite-check', action='store_false',
+        dest='prerequisite_check',
+        help='do not check the prerequisites of the bears in non interactive '
+             'mode')
+
+    arg_parser.add_argument(
+        '--low-memory', action='store_true',
+        help='keep only the counts of the project files by extension '
+             'instead of their paths, for projects with millions of files')
+
+    arg_parser.add_argument(
+        '--estimate', action='store_true',
+        help='estimate the languages used from a random sample of the '
+             'project directories, which stops once the ranking of the '
+             'languages is stable, instead of reading the whole project; '
+             'the margins shown are approximate')
+
+    arg_parser.add_argument(
+        '--incremental', action='store_true',
+        help='keep the state of the run and only rescan what changed since '
+             'the previous one')
+
+    arg_parser.add_argument(
+        '--batch', nargs='+', metavar='PATH',
+        help='generate the coafiles of many projects non interactively, '
+             'given as project directories or files listing them')
+
+    arg_parser.add_argument(
+        '--batch-parents', action='store_true',
+        help='treat the directories given to `--batch` as parents whose '
+             'subdirectories are the projects')
+
+    arg_parser.add_argument(
+        '--batch-report', metavar='FILE',
+        help='write a JSON report of the `--batch` run to FILE')
+
+    arg_parser.add_argument(
+        '--profile-startup', action='store_true',
+        help='report the time spent importing each module')
+
+    arg_parser.add_argument(
+        '--stats', nargs='?', const='table', choices=('table', 'json'),
+        help='report the time, memory and counters of each stage, as a '
+             'table (default) or as JSON on a single line')
+
+    arg_parser.add_argument(
+        '--profile', choices=('cpu', 'memory'),
+        help='profile the run: `cpu` writes the statistics of cProfile to '
+             'the `--profile-output` file, `memory` reports the lines '
+             'allocating the most memory in each stage')
+
+    arg_parser.add_argument(
+        '--profile-output', metavar='FILE',
+        default='coala-quickstart.pstats',
+        help='the file the `--profile=cpu` statistics are written to, '
+             'coala-quickstart.pstats by default')
+
     return arg_parser
 
 
+def _load_answers(path):
+    """
+    Loads the ``--answers`` file.
+
+    :param path: The path of the file.
+    :return:     An ``Answers`` object.
+    """
+    from coala_quickstart.generation.Answers import Answers
+
+    try:
+        return Answers.load(path)
+    except ValueError as exception:
+        raise argparse.ArgumentTypeError(str(exception))
+
+
 def main():
+    from coalib.collecting.Dependencies import CircularDependencyError
+
     arg_parser = _get_arg_parser()
     args = arg_parser.parse_args()
+    if args.estimate and args.incremental:
+        arg_parser.error("--estimate cannot be used with --incremental, "
+                         "as a sample does not tell what changed")
+
+    with ExitStack() as stack:
+        timer = stats = memory_profiler = None
+        if args.profile_startup:
+            from coala_quickstart.Profiling import ImportTimer
+            timer = stack.enter_context(ImportTimer())
+        if args.stats:
+            from coala_quickstart.Profiling import StageStats
+            stats = stack.enter_context(StageStats())
+        if args.profile == 'memory':
+            from coala_quickstart.Profiling import MemoryProfiler
+            memory_profiler = stack.enter_context(MemoryProfiler())
+        if args.profile == 'cpu':
+            from coala_quickstart.Profiling import CpuProfiler
+            stack.enter_context(CpuProfiler(args.profile_output))
+        try:
+            result = _run(arg_parser, args)
+        except CircularDependencyError as exception:
+            from pyprint.ConsolePrinter import ConsolePrinter
+
+            ConsolePrinter().print(
+                "{}.\nThe bears of the cycle cannot be used, so the coafile "
+                "was not generated.".format(exception), color="red")
+            result = 1
+
+    if timer is not None:
+        print("\n".join(timer.format()))
+    if stats is not None:
+        print("\n".join(stats.format()) if args.stats == "table"
+              else stats.to_json())
+    if memory_profiler is not None:
+        print("\n".join(memory_profiler.format()))
+    if args.profile == 'cpu':
+        print("The CPU profile was written to '{}'.".format(
+            os.path.abspath(args.profile_output)))
+    return result
+
+
+def _run(arg_parser, args):
+    # The stages are imported as they are reached, so that coalib is not
+    # loaded for ``--help`` and only the needed parts are loaded otherwise.
+    from pyprint.ConsolePrinter import ConsolePrinter
+    from coalib.output.printers.LogPrinter import LogPrinter
 
     printer = ConsolePrinter()
     log_printer = LogPrinter(printer)
 
+    if args.batch:
+        from coala_quickstart.Batch import run_batch
+        return run_batch(printer, args, arg_parser)
+
     project_dir = os.getcwd()
     if not args.non_interactive:
+        from coala_utils.Question import ask_question
+        from coala_quickstart.interaction.Logo import print_welcome_message
+        from coala_quickstart.generation.Project import valid_path
+
         print_welcome_message(printer)
         project_dir = ask_question(
             "What is your project directory?",
             default=project_dir,
             typecast=valid_path)
 
-    project_files, ignore_globs = get_project_files(
-        log_printer,
+    generate_coafile(printer, log_printer, project_dir, args, arg_parser)
+
+
+def generate_coafile(printer, log_printer, project_dir, args,
+                     arg_parser=None, bears=None, ignore_globs=None):
+    """
+    Generates the coafile of a project.
+
+    :param printer:
+        A ``ConsolePrinter`` object used for console interactions.
+    :param log_printer:
+        A ``LogPrinter`` object.
+    :param project_dir:
+        Full path of the user's project directory.
+    :param args:
+        The parsed command line arguments.
+    :param arg_parser:
+        The ``ArgumentParser`` used to load the coala configuration.
+    :param bears:
+        The bears returned by ``load_bears``, which are loaded if ``None``.
+    :param ignore_globs:
+        The list of glob expressions of the files to ignore, loaded from
+        the ``.gitignore`` file or asked for if ``None``.
+    :return:
+        A tuple of the path of the written coafile, ``None`` if it was up
+        to date, and the list of the names of the languages used.
+    """
+    state = None
+    if args.incremental:
+        from coala_quickstart.generation.ScanState import ScanState
+        state = ScanState(project_dir)
+
+    from coala_quickstart.Pipeline import collect_project
+
+    project_files, ignore_globs, used_languages, bears = collect_project(
         printer,
-        project_dir)
+        log_printer,
+        project_dir,
+        args,
+        arg_parser,
+        bears,
+        ignore_globs,
+        state)
 
-    used_languages = list(get_used_languages(project_files))
-    print_used_languages(printer, used_languages)
+    if state is not None and state.loaded:
+        changed_languages = state.record_index(project_files)
+        printer.print("Directories rescanned since the previous run: {}, "
+                      "languages whose file count changed: {}".format(
+                          len(state.changed_dirs),
+                          ", ".join(changed_languages) or "none"))
+    elif state is not None:
+        state.record_index(project_files)
+
+    from coala_quickstart.generation.Project import print_used_languages
+
+    estimator = project_files.estimator
+    if estimator is not None:
+        printer.print("Sampled {} files in {} directories{}.".format(
+            estimator.sampled_files, estimator.sampled_dirs,
+            ", the whole project" if estimator.exhaustive else ""))
+    print_used_languages(printer, used_languages, args.language_weight)
+    languages = [lang for lang, _ in used_languages]
+
+    from coala_quickstart.generation.Bears import (
+        filter_relevant_bears,
+        print_relevant_bears,
+        get_missing_prerequisites_bears,
+        get_non_optional_settings_bears,
+        print_missing_prerequisites,
+        remove_unusable_bears,
+    )
 
-    relevant_bears = filter_relevant_bears(used_languages, arg_parser)
+    with stage("filter_relevant_bears"):
+        relevant_bears = filter_relevant_bears(used_languages, bears=bears)
     print_relevant_bears(printer, relevant_bears)
 
     if args.non_interactive:
-        unusable_bears = get_non_optional_settings_bears(relevant_bears)
+        with stage("get_non_optional_settings_bears"):
+            unusable_bears = get_non_optional_settings_bears(relevant_bears,
+                                                             args.answers)
         remove_unusable_bears(relevant_bears, unusable_bears)
+
+    # Checking the prerequisites imports the bears, so it is only done for
+    # the bears that are selected, and by default only when the bears
+    # whose prerequisites are missing are left out.
+    prerequisite_check = args.prerequisite_check
+    if prerequisite_check is None:
+        prerequisite_check = args.non_interactive
+    if prerequisite_check:
+        start = time.perf_counter()
+        with stage("check_prerequisites"):
+            missing_bears = get_missing_prerequisites_bears(relevant_bears,
+                                                            args.jobs)
+        print_missing_prerequisites(printer, missing_bears,
+                                    time.perf_counter() - start,
+                                    removed=args.non_interactive)
+        if args.non_interactive:
+            remove_unusable_bears(relevant_bears, missing_bears)
+
+    if args.non_interactive:
         print_relevant_bears(printer, relevant_bears, 'usable')
 
-    settings = generate_settings(
-        project_dir,
-        project_files,
-        ignore_globs,
-        relevant_bears)
-    write_coafile(printer, project_dir, settings)
+    from coala_quickstart.generation.Settings import (
+        generate_settings, write_coafile)
+
+    with stage("generate_settings"):
+        settings = generate_settings(
+            project_dir,
+            project_files,
+            ignore_globs,
+            relevant_bears,
+            state,
+            args.answers)
+    with stage("write_coafile"):
+        coafile = write_coafile(printer, project_dir, settings, state)
+
+    if state is not None:
+        state.save()
+
+    return coafile, languages
@@ -0,0 +1,167 @@
+import configparser
+import json
+import os
+
+
+def _setting_value(value):
+    """
+    Converts a value of an answers file to the value of a setting.
+
+    >>> _setting_value(["E501", "W503"])
+    'E501, W503'
+    >>> _setting_value(True)
+    'true'
+    >>> _setting_value(80)
+    '80'
+
+    :param value: A value read from JSON, YAML or an ini file.
+    :return:      The string coala parses the setting from.
+    """
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (list, tuple)):
+        return ", ".join(_setting_value(item) for item in value)
+    if value is None:
+        return ""
+    return str(value)
+
+
+class Answers:
+    """
+    The values of settings given in advance, so that they are not asked for.
+    Values are given either for a name, which is the name of a bear or of a
+    section of the coafile such as ``python`` or ``default``, or for every
+    bear needing the setting:
+
+    >>> answers = Answers({"PycodestyleBear": {"max_line_length": 100},
+    ...                    "use_spaces": True})
+    >>> answers.lookup("max_line_length", ["PycodestyleBear", "python"])
+    '100'
+    >>> answers.lookup("use_spaces", ["SpaceConsistencyBear", "default"])
+    'true'
+    >>> answers.lookup("max_line_length", ["LineLengthBear"]) is None
+    True
+    """
+
+    def __init__(self, data):
+        """
+        :param data:
+            A dict with names as keys and dicts of setting names and values
+            as values. Other values are the values of the settings named by
+            their key for every bear.
+        :raises ValueError:
+            If the values of a name are not setting values.
+        """
+        self.named = {}
+        self.common = {}
+        for key, value in data.items():
+            if isinstance(value, dict):
+                settings = {}
+                for setting, setting_value in value.items():
+                    if isinstance(setting_value, dict):
+                        raise ValueError(
+                            "The value of '{}' of '{}' is not a setting "
+                            "value.".format(setting, key))
+                    settings[str(setting)] = _setting_value(setting_value)
+                self.named.setdefault(str(key).lower(), {}).update(settings)
+            else:
+                self.common[str(key)] = _setting_value(value)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reads an answers file. The format is given by the extension of the
+        file: ``.json`` for JSON, ``.yml`` or ``.yaml`` for YAML, which
+        needs PyYAML, and ``.ini`` or ``.cfg`` for an ini file whose
+        sections are names and whose ``[DEFAULT]`` section holds the values
+        for every bear.
+
+        :param path:        The path of the file.
+        :return:            An ``Answers`` object.
+        :raises ValueError: If the file cannot be read or parsed.
+        """
+        extension = os.path.splitext(path)[1].lower()
+        if extension not in (".json", ".yml", ".yaml", ".ini", ".cfg"):
+            raise ValueError(
+                "The format of the answers file '{}' is not known, it "
+                "should end with .json, .yml, .yaml, .ini or .cfg.".format(
+                    path))
+        if extension in (".yml", ".yaml"):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError("PyYAML is needed to read the answers file "
+                                 "'{}'.".format(path))
+
+        try:
+            with open(path, "r") as file:
+                if extension == ".json":
+                    data = json.load(file)
+                elif extension in (".yml", ".yaml"):
+                    data = yaml.safe_load(file) or {}
+                else:
+                    # No section header can be empty, so [DEFAULT] is read
+                    # as a plain section and its values are not merged
+                    # into, or hidden by, the other sections.
+                    parser = configparser.ConfigParser(interpolation=None,
+                                                       default_section="")
+                    parser.optionxform = str
+                    parser.read_file(file)
+                    data = {}
+                    for section in parser.sections():
+                        values = dict(parser.items(section, raw=True))
+                        if section == "DEFAULT":
+                            data.update(values)
+                        else:
+                            data[section] = values
+        except OSError as exception:
+            raise ValueError("The answers file '{}' cannot be read: "
+                             "{}".format(path, exception.strerror))
+        except Exception as exception:
+            raise ValueError("The answers file '{}' cannot be parsed: "
+                             "{}".format(path, exception))
+
+        if not isinstance(data, dict):
+            raise ValueError("The answers file '{}' does not map names to "
+                             "values.".format(path))
+        return cls(data)
+
+    def lookup(self, setting, names):
+        """
+        :param setting: The name of a setting.
+        :param names:   The names of the bear needing the setting and of
+                        its section, the most specific first.
+        :return:        The value of the setting, from the first name with
+                        a value for it or else from the values for every
+                        bear, ``None`` if there is none.
+        """
+        for name in names:
+            settings = self.named.get(name.lower(), {})
+            if setting in settings:
+                return settings[setting]
+        return self.common.get(setting)
+
+    def apply(self, section, bears, needed_settings=()):
+        """
+        Sets the settings given for a section and its bears. The values
+        given for every bear are only set for the ``needed_settings``.
+
+        :param section:         A ``Section`` object.
+        :param bears:           The bear classes of the section.
+        :param needed_settings: The names of the non-optional settings of
+                                the bears of the section.
+        :return:                The list of the names of the settings set.
+        """
+        values = {}
+        for setting in needed_settings:
+            if setting in self.common:
+                values[setting] = self.common[setting]
+        values.update(self.named.get(section.name.lower(), {}))
+        # When bears of a section are given different values for the same
+        # setting, the last bear by name wins.
+        for bear in sorted(bears, key=lambda bear: bear.name):
+            values.update(self.named.get(bear.name.lower(), {}))
+
+        for setting in sorted(values):
+            section[setting] = values[setting]
+        return sorted(values)
@@ -0,0 +1,290 @@
+import json
+import os
+
+import pkg_resources
+
+from coala_quickstart.generation.BearManifest import import_bear
+
+
+CACHE_FORMAT = 4
+
+
+def get_cache_dir():
+    """
+    :return: The directory of the quickstart caches, which is
+             ``$XDG_CACHE_HOME/coala-quickstart``, or
+             ``~/.cache/coala-quickstart`` if the variable is not set.
+    """
+    cache_home = (os.environ.get("XDG_CACHE_HOME") or
+                  os.path.join(os.path.expanduser("~"), ".cache"))
+    return os.path.join(cache_home, "coala-quickstart")
+
+
+def get_cache_path():
+    """
+    Returns the path of the bear cache, which lives in the directory given
+    by ``get_cache_dir``.
+
+    :return: The path of the cache file.
+    """
+    return os.path.join(get_cache_dir(), "bears.json")
+
+
+def get_installed_versions():
+    """
+    :return: A dict with the versions of the installed ``coala`` and
+             ``coala-bears`` distributions, ``None`` if one is missing.
+    """
+    versions = {}
+    for distribution in ("coala", "coala-bears"):
+        try:
+            versions[distribution] = pkg_resources.get_distribution(
+                distribution).version
+        except pkg_resources.DistributionNotFound:
+            versions[distribution] = None
+    return versions
+
+
+class CachedBear:
+    """
+    Stands in for a bear class. The bear is described by the cache or the
+    bear manifest and its module is only imported once something that is
+    not known yet is needed. ``cache`` is the ``BearCache`` the bear belongs
+    to, if any.
+
+    >>> bear = CachedBear("SomeBear", "SomeBear.py", ["Python"],
+    ...                   {"max_length": "Length."}, [])
+    >>> bear.name
+    'SomeBear'
+    >>> bear.LANGUAGES
+    {'Python'}
+    >>> bear.get_non_optional_settings()
+    {'max_length': ('Length.', None)}
+    """
+
+    def __init__(self, name, module=None, languages=None,
+                 non_optional_settings=None, dependencies=None,
+                 registry=None):
+        """
+        :param name:
+            The name of the bear.
+        :param module:
+            The path of the file defining the bear.
+        :param languages:
+            The languages the bear supports, ``None`` if unknown.
+        :param non_optional_settings:
+            A dict with the names of the settings the bear needs as keys
+            and their descriptions as values, ``None`` if unknown.
+        :param dependencies:
+            The names of the bears in ``BEAR_DEPS``, ``None`` if unknown.
+        :param registry:
+            A dict with bear names as keys and ``CachedBear`` objects as
+            values, used to look up the dependencies.
+        """
+        self.name = name
+        self.module = module
+        self.cache = None
+        self._bear_class = None
+        self._import_failed = False
+        self._languages = None if languages is None else set(languages)
+        self._settings = (None if non_optional_settings is None
+                          else dict(non_optional_settings))
+        self._dependencies = (None if dependencies is None
+                              else list(dependencies))
+        self._registry = {} if registry is None else registry
+
+    @classmethod
+    def from_class(cls, bear_class, registry=None):
+        """
+        :param bear_class: A bear class that is already imported.
+        :param registry:   The registry to look up the dependencies in.
+        :return:           A ``CachedBear`` for the class.
+        """
+        bear = cls(bear_class.name, bear_class.source_location,
+                   registry=registry)
+        bear._bear_class = bear_class
+        return bear
+
+    def _add_dependency(self, bear_class):
+        """
+        Adds a dependency that is not in the registry yet.
+
+        :param bear_class: The bear class of the dependency.
+        """
+        dependency = self.from_class(bear_class, self._registry)
+        dependency.cache = self.cache
+        self._registry[bear_class.name] = dependency
+
+    @property
+    def bear_class(self):
+        """
+        :return: The bear class, imported the first time it is needed, or
+                 ``None`` if it cannot be imported.
+        """
+        if (self._bear_class is None and self.module is not None and
+                not self._import_failed):
+            self._bear_class = import_bear(self.module, self.name)
+            self._import_failed = self._bear_class is None
+            if self._bear_class is not None and self._languages is None:
+                self._languages = set(self._bear_class.LANGUAGES)
+        return self._bear_class
+
+    @property
+    def LANGUAGES(self):
+        if self._languages is None:
+            bear_class = self.bear_class
+            if bear_class is None:
+                return set()
+            self._languages = set(bear_class.LANGUAGES)
+        return self._languages
+
+    @property
+    def BEAR_DEPS(self):
+        if self._dependencies is None:
+            bear_class = self.bear_class
+            if bear_class is None:
+                return set()
+            dependencies = bear_class.BEAR_DEPS
+            for dependency in dependencies:
+                if dependency.name not in self._registry:
+                    self._add_dependency(dependency)
+            self._dependencies = [dependency.name
+                                  for dependency in dependencies]
+        return {self._registry[name] for name in self._dependencies
+                if name in self._registry}
+
+    def get_non_optional_settings(self):
+        """
+        :return: A dict with the names of the settings the bear needs as
+                 keys and a tuple of their description and annotation as
+                 values. Annotations are not cached and are ``None``.
+        """
+        if self._settings is None:
+            bear_class = self.bear_class
+            if bear_class is None:
+                return {}
+            self._settings = {
+                name: value[0] for name, value
+                in bear_class.get_metadata().non_optional_params.items()}
+        return {name: (description, None)
+                for name, description in self._settings.items()}
+
+    def to_dict(self):
+        """
+        :return: A dict with what is known about the bear, suitable for
+                 JSON. Unknown values are ``None``.
+        """
+        return {"module": self.module,
+                "languages": (None if self._languages is None
+                              else sorted(self._languages)),
+                "settings": self._settings,
+                "dependencies": self._dependencies}
+
+    def __getattr__(self, attribute):
+        if attribute.startswith("_"):
+            raise AttributeError(attribute)
+        bear_class = self.bear_class
+        if bear_class is None:
+            raise AttributeError(attribute)
+        return getattr(bear_class, attribute)
+
+    def __repr__(self):
+        return "<CachedBear {}>".format(self.name)
+
+
+class BearCache:
+    """
+    An on-disk cache of the available bears, so that the bear packages do
+    not have to be collected and imported on every run. It starts from the
+    bear manifest and records whatever is learned about the bears that get
+    imported. The cache is discarded as soon as the installed coala or
+    coala-bears version or the bear directories change.
+    """
+
+    def __init__(self, path=None, bear_dirs=()):
+        """
+        :param path:      The path of the cache file, ``get_cache_path()``
+                          by default.
+        :param bear_dirs: The list of bear directory globs the bears are
+                          collected from.
+        """
+        self.path = path or get_cache_path()
+        self.versions = get_installed_versions()
+        self.bear_dirs = list(bear_dirs)
+        self.bears = None
+        self.load()
+
+    def load(self):
+        """
+        Reads the cache file, if it exists and was written for the installed
+        versions and the same bear directories.
+        """
+        try:
+            with open(self.path, "r") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return
+
+        if (not isinstance(data, dict) or
+                data.get("format") != CACHE_FORMAT or
+                data.get("versions") != self.versions or
+                data.get("bear_dirs") != self.bear_dirs):
+            return
+
+        bears = {}
+        for name, entry in data.get("bears", {}).items():
+            bears[name] = CachedBear(name,
+                                     entry.get("module"),
+                                     entry.get("languages"),
+                                     entry.get("settings"),
+                                     entry.get("dependencies"),
+                                     bears)
+            bears[name].cache = self
+        self.bears = bears
+
+    def get(self):
+        """
+        :return: A set of ``CachedBear`` objects for all bears, or ``None``
+                 if nothing is cached.
+        """
+        if self.bears is None:
+            return None
+        return set(self.bears.values())
+
+    def update(self, manifest):
+        """
+        Replaces the cached bears with the ones from a bear manifest.
+
+        :param manifest: A dict with bear names as keys and dicts with the
+                         ``module`` and ``languages`` of the bear as values.
+        """
+        bears = {}
+        for name, entry in manifest.items():
+            bears[name] = CachedBear(name,
+                                     entry["module"],
+                                     entry["languages"],
+                                     registry=bears)
+            bears[name].cache = self
+        self.bears = bears
+
+    def save(self):
+        """
+        Writes the cache file. The cache is only an optimization, so failing
+        to write it is not an error.
+        """
+        if self.bears is None:
+            return
+        data = {
+            "format": CACHE_FORMAT,
+            "versions": self.versions,
+            "bear_dirs": self.bear_dirs,
+            "bears": {name: bear.to_dict()
+                      for name, bear in self.bears.items()}}
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp_path = "{}.{}".format(self.path, os.getpid())
+            with open(temp_path, "w") as file:
+                json.dump(data, file)
+            os.replace(temp_path, self.path)
+        except OSError:
+            pass
@@ -0,0 +1,101 @@
+from coalib.collecting.Dependencies import CircularDependencyError
+
+
+class BearDependencyGraph:
+    """
+    The graph of the ``BEAR_DEPS`` of bears and of their dependencies, down
+    to the bears without any. It is built once, so the dependencies of every
+    bear are only looked up once, and what is computed for a bear is
+    memoized and reused by the bears depending on it.
+
+    >>> class SomeBear:
+    ...     name = "SomeBear"
+    ...     BEAR_DEPS = set()
+    ...     @classmethod
+    ...     def get_non_optional_settings(cls):
+    ...         return {"max_length": ("Length.", int)}
+    >>> class DependentBear(SomeBear):
+    ...     name = "DependentBear"
+    ...     BEAR_DEPS = {SomeBear}
+    ...     @classmethod
+    ...     def get_non_optional_settings(cls):
+    ...         return {}
+    >>> class TopBear(DependentBear):
+    ...     name = "TopBear"
+    ...     BEAR_DEPS = {DependentBear}
+    >>> graph = BearDependencyGraph([TopBear])
+    >>> [bear.name for bear in graph.order]
+    ['SomeBear', 'DependentBear', 'TopBear']
+    >>> graph.non_optional_settings(TopBear)
+    {'max_length': ('Length.', <class 'int'>)}
+
+    Circular dependencies are errors, like when coala runs the bears:
+
+    >>> SomeBear.BEAR_DEPS = {TopBear}
+    >>> BearDependencyGraph([TopBear])
+    Traceback (most recent call last):
+      ...
+    coalib.collecting.Dependencies.CircularDependencyError: Circular \
+dependency detected: TopBear -> DependentBear -> SomeBear -> TopBear
+    """
+
+    def __init__(self, bears):
+        """
+        :param bears:
+            A collection of bear classes.
+        :raises CircularDependencyError:
+            If a bear depends on itself through its dependencies.
+        """
+        self.dependencies = {}
+        self.order = []
+        self._settings = {}
+
+        # Depth first search keeping the path from the bear it started from,
+        # so that a dependency found on the path closes a cycle.
+        for root in sorted(bears, key=lambda bear: bear.name):
+            if root in self.dependencies:
+                continue
+            path = [root]
+            pending = [iter(self._add(root))]
+            while pending:
+                bear = next(pending[-1], None)
+                if bear is None:
+                    pending.pop()
+                    self.order.append(path.pop())
+                elif bear in path:
+                    raise CircularDependencyError.for_bears(
+                        path[path.index(bear):] + [bear])
+                elif bear not in self.dependencies:
+                    path.append(bear)
+                    pending.append(iter(self._add(bear)))
+
+    def _add(self, bear):
+        """
+        Adds a bear to the graph.
+
+        :param bear: A bear class.
+        :return:     The tuple of its dependencies, sorted by name.
+        """
+        dependencies = tuple(sorted(bear.BEAR_DEPS,
+                                    key=lambda dependency: dependency.name))
+        self.dependencies[bear] = dependencies
+        return dependencies
+
+    def non_optional_settings(self, bear):
+        """
+        :param bear: A bear class of the graph.
+        :return:     A dict with the names of the non-optional settings of
+                     the bear and of all its direct and indirect
+                     dependencies as keys and a tuple of their description
+                     and annotation as values.
+        """
+        if bear not in self._settings:
+            # The dependencies come first in ``order``, so the settings of
+            # the dependencies of every bear are known when it is reached.
+            for node in self.order:
+                if node not in self._settings:
+                    settings = dict(node.get_non_optional_settings())
+                    for dependency in self.dependencies[node]:
+                        settings.update(self._settings[dependency])
+                    self._settings[node] = settings
+        return dict(self._settings[bear])
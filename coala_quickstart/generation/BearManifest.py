@@ -0,0 +1,177 @@
+import ast
+
+from pyprint.NullPrinter import NullPrinter
+
+from coalib.collecting.Collectors import collect_files
+from coalib.collecting.Importers import iimport_objects
+from coalib.output.printers.LogPrinter import LogPrinter
+from coalib.settings.ConfigurationGathering import load_configuration
+from coala_quickstart.Profiling import count
+
+
+BEAR_BASES = {"Bear", "LocalBear", "GlobalBear"}
+
+
+def _base_name(node):
+    """
+    :param node: An ``ast`` node of a base class or decorator.
+    :return:     The name the node refers to, ignoring modules and calls.
+    """
+    if isinstance(node, ast.Call):
+        node = node.func
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    if isinstance(node, ast.Name):
+        return node.id
+    return None
+
+
+def _is_bear_class(node):
+    """
+    Guesses from its definition whether a class is a bear: it either is
+    created by the ``linter`` decorator or derives from another bear.
+
+    :param node: An ``ast.ClassDef`` node.
+    :return:     True if the class looks like a bear.
+    """
+    if any(_base_name(decorator) == "linter"
+           for decorator in node.decorator_list):
+        return True
+    return any(name in BEAR_BASES or name.endswith("Bear")
+               for name in map(_base_name, node.bases) if name)
+
+
+def _get_languages(node):
+    """
+    :param node: An ``ast.ClassDef`` node of a bear.
+    :return:     The sorted list of languages assigned to ``LANGUAGES`` in the
+                 class body, the name of the bear whose ``LANGUAGES`` are
+                 reused (as in ``LANGUAGES = ClangBear.LANGUAGES``) or
+                 inherited, or ``None`` if they cannot be read statically.
+    """
+    for statement in node.body:
+        if (isinstance(statement, ast.Assign) and
+                any(isinstance(target, ast.Name) and
+                    target.id == "LANGUAGES"
+                    for target in statement.targets)):
+            value = statement.value
+            if (isinstance(value, ast.Attribute) and
+                    value.attr == "LANGUAGES" and
+                    isinstance(value.value, ast.Name)):
+                return value.value.id
+            try:
+                return sorted(ast.literal_eval(value))
+            except (ValueError, TypeError):
+                return None
+
+    bases = [name for name in map(_base_name, node.bases) if name]
+    parents = [name for name in bases if name not in BEAR_BASES]
+    if bases and not parents:
+        # The ``LANGUAGES`` of the base classes of coala are empty.
+        return []
+    if len(parents) == 1 and parents[0].endswith("Bear"):
+        return parents[0]
+    return None
+
+
+def scan_bear_file(file_path):
+    """
+    Finds the bears defined in a file without importing it.
+
+    >>> import tempfile
+    >>> with tempfile.NamedTemporaryFile("w", suffix=".py") as file:
+    ...     _ = file.write("class PyBear(LocalBear):\\n"
+    ...                    "    LANGUAGES = {'Python'}\\n"
+    ...                    "class Helper:\\n"
+    ...                    "    pass\\n")
+    ...     file.flush()
+    ...     scan_bear_file(file.name)
+    {'PyBear': ['Python']}
+
+    :param file_path:
+        The path of a Python file.
+    :return:
+        A dict with the name of each bear as key and its languages as
+        value, as returned by ``_get_languages``.
+    """
+    try:
+        with open(file_path, "rb") as file:
+            tree = ast.parse(file.read(), file_path)
+    except (OSError, SyntaxError, ValueError):
+        return {}
+
+    return {node.name: _get_languages(node)
+            for node in tree.body
+            if isinstance(node, ast.ClassDef) and _is_bear_class(node)}
+
+
+def get_bear_dirs(arg_parser=None, arg_list=None):
+    """
+    :param arg_parser: An ``ArgParser`` object used to load the coala
+                       configuration.
+    :param arg_list:   The list of arguments the coala configuration is
+                       loaded with, ``sys.argv`` if ``None``.
+    :return:           A list of globs matching the bear directories from
+                       the coala configuration and the installed packages.
+    """
+    log_printer = LogPrinter(NullPrinter())
+    sections, _ = load_configuration(arg_list=arg_list,
+                                     log_printer=log_printer,
+                                     arg_parser=arg_parser)
+    bear_dirs = []
+    for section in sections.values():
+        for bear_dir in section.bear_dirs():
+            if bear_dir not in bear_dirs:
+                bear_dirs.append(bear_dir)
+    return bear_dirs
+
+
+def build_manifest(bear_dirs):
+    """
+    Builds a manifest of the bears in the given directories by reading their
+    sources, so that no bear needs to be imported.
+
+    :param bear_dirs:
+        A list of globs matching bear directories.
+    :return:
+        A dict with bear names as keys and dicts with the ``module`` path and
+        the sorted list of ``languages`` of the bear as values. The languages
+        are ``None`` if they are only known once the bear is imported.
+    """
+    log_printer = LogPrinter(NullPrinter())
+    manifest = {}
+    for file_path in collect_files([bear_dir + ".py" for bear_dir in bear_dirs],
+                                   log_printer):
+        for name, languages in scan_bear_file(file_path).items():
+            manifest.setdefault(name, {"module": file_path,
+                                       "languages": languages})
+
+    for entry in manifest.values():
+        seen = set()
+        while isinstance(entry["languages"], str):
+            if entry["languages"] in seen:
+                entry["languages"] = None
+                break
+            seen.add(entry["languages"])
+            entry["languages"] = manifest.get(
+                entry["languages"], {"languages": None})["languages"]
+    return manifest
+
+
+def import_bear(module, name):
+    """
+    Imports a single bear from its module.
+
+    :param module: The path of the file defining the bear.
+    :param name:   The name of the bear.
+    :return:       The bear class, or ``None`` if it cannot be imported.
+    """
+    try:
+        bear = next(iter(iimport_objects(module, names=name,
+                                         attributes="kind", local=True)),
+                    None)
+    except Exception:
+        return None
+    if bear is not None:
+        count("bears imported")
+    return bear
@@ -1,32 +1,106 @@
-from pyprint.NullPrinter import NullPrinter
+from collections import defaultdict
 
 from coala_quickstart.Constants import IMPORTANT_BEAR_LIST
 from coala_quickstart.Strings import BEAR_HELP
-from coalib.settings.ConfigurationGathering import get_filtered_bears
-from coalib.misc.DictUtilities import inverse_dicts
-from coalib.output.printers.LogPrinter import LogPrinter
+from coala_quickstart.generation.BearCache import BearCache, CachedBear
+from coala_quickstart.generation.BearDependencies import BearDependencyGraph
+from coala_quickstart.generation.BearManifest import (
+    build_manifest, get_bear_dirs)
 
 
-def filter_relevant_bears(used_languages, arg_parser=None):
+def get_bears_by_language(bears, languages):
+    """
+    Partitions the bears by the languages they support. Bears supporting
+    ``All`` languages belong to every language.
+
+    >>> from coala_quickstart.generation.BearCache import CachedBear
+    >>> bears = {CachedBear("PyBear", languages=["Python"]),
+    ...          CachedBear("CBear", languages=["C", "C++"]),
+    ...          CachedBear("TextBear", languages=["All"])}
+    >>> result = get_bears_by_language(bears, ["python", "C++", "All"])
+    >>> {lang: sorted(bear.name for bear in result[lang])
+    ...  for lang in sorted(result)}  # doctest: +NORMALIZE_WHITESPACE
+    {'All': ['TextBear'], 'C++': ['CBear', 'TextBear'],
+     'python': ['PyBear', 'TextBear']}
+
+    :param bears:
+        A collection of bear classes.
+    :param languages:
+        A list of language names.
+    :return:
+        A dict with language name as key and a set of bear classes as value.
+    """
+    bears_by_language = defaultdict(set)
+    for bear in bears:
+        for language in bear.LANGUAGES:
+            bears_by_language[language.lower()].add(bear)
+
+    return {lang: bears_by_language[lang.lower()] | bears_by_language["all"]
+            for lang in languages}
+
+
+def load_bears(arg_parser=None, arg_list=None):
+    """
+    Loads the available bears from the bear cache, which is filled from the
+    bear manifest without importing any bear if it is out of date.
+
+    :param arg_parser:
+        An ``ArgParser`` object used to load the coala configuration.
+    :param arg_list:
+        The list of arguments the coala configuration is loaded with,
+        ``sys.argv`` if ``None``.
+    :return:
+        A set of ``CachedBear`` objects.
+    """
+    bear_dirs = get_bear_dirs(arg_parser, arg_list)
+    bear_cache = BearCache(bear_dirs=bear_dirs)
+    if bear_cache.get() is None:
+        bear_cache.update(build_manifest(bear_dirs))
+    return bear_cache.get()
+
+
+def _save_bear_caches(bears):
+    """
+    Saves the caches the bears belong to, to remember what was learned
+    about the bears that had to be imported.
+
+    :param bears: A collection of bear classes.
+    """
+    bear_caches = {bear.cache for bear in bears
+                   if isinstance(bear, CachedBear) and bear.cache}
+    for bear_cache in bear_caches:
+        bear_cache.save()
+
+
+def filter_relevant_bears(used_languages, arg_parser=None, bears=None):
     """
     From the bear dict, filter the bears per relevant language.
 
+    The bears are looked up in the bear cache, which is filled from the
+    bear manifest without importing any bear. The returned bears are
+    ``CachedBear`` objects which import their module only when needed, so
+    only the bears that are selected, or whose languages cannot be read
+    from their source, get imported.
+
     :param used_languages:
         A list of tuples with language name as the first element
         and percentage usage as the second element; sorted by
         percentage usage.
+    :param arg_parser:
+        An ``ArgParser`` object used to load the coala configuration.
+    :param bears:
+        The bears returned by ``load_bears``, which are loaded if ``None``.
     :return:
         A dict with language name as key and bear classes as value.
     """
-    log_printer = LogPrinter(NullPrinter())
     used_languages.append(("All", 100))
 
-    all_bears_by_lang = {
-        lang: set(inverse_dicts(*get_filtered_bears([lang],
-                                                    log_printer,
-                                                    arg_parser)).keys())
-        for lang, _ in used_languages
-    }
+    if bears is None:
+        bears = load_bears(arg_parser)
+
+    all_bears_by_lang = get_bears_by_language(
+        bears, [lang for lang, _ in used_languages])
+    _save_bear_caches(bears)
 
     bears_by_lang = {}
     for lang in all_bears_by_lang:
@@ -46,40 +120,114 @@ def filter_relevant_bears(used_languages, arg_parser=None):
 
 def get_non_optional_settings(bears):
     """
-    From the bear dict, get the non-optional settings.
+    From the bear dict, get the non-optional settings, including the ones
+    of all the direct and indirect dependencies of each bear.
 
     :param bears:
         A dict with language name as key and bear classes as value.
     :return:
         A dict with Bear class as key and bear non-optional settings as value.
+    :raises CircularDependencyError:
+        If a bear depends on itself through its dependencies.
     """
-    non_optional_settings = {}
+    all_bears = set()
     for language in bears:
-        for bear in bears[language]:
-            if bear not in non_optional_settings:
-                needed = bear.get_non_optional_settings()
-                # FIXME: This only finds non-optional settings for immediate
-                # dependencies.  See https://github.com/coala/coala/issues/3149
-                for bear_dep in bear.BEAR_DEPS:
-                    needed.update(bear_dep.get_non_optional_settings())
+        all_bears.update(bears[language])
+    graph = BearDependencyGraph(all_bears)
+    non_optional_settings = {bear: graph.non_optional_settings(bear)
+                             for bear in all_bears}
 
-                non_optional_settings[bear] = needed
+    # Remember the settings of the bears that had to be imported.
+    _save_bear_caches(graph.dependencies)
 
     return non_optional_settings
 
 
-def get_non_optional_settings_bears(bears):
+def get_non_optional_settings_bears(bears, answers=None):
     """
     Return tuple of bears with non optional settings.
 
-    :param unusable_bears:
-        A collection of Bear classes.
+    :param bears:
+        A dict with language name as key and bear classes as value.
+    :param answers:
+        An ``Answers`` object. Bears whose non-optional settings are all
+        answered are left out.
     """
     non_optional_settings = get_non_optional_settings(bears)
-    non_optional_settings = tuple(bear for bear, settings
-                                  in non_optional_settings.items()
-                                  if settings)
-    return non_optional_settings
+    if answers is None:
+        return tuple(bear for bear, settings
+                     in non_optional_settings.items()
+                     if settings)
+
+    unanswered = []
+    for language in bears:
+        # The bears of the ``All`` language go in the ``default`` section.
+        section = "default" if language.lower() == "all" else language
+        for bear in bears[language]:
+            if any(answers.lookup(setting, [bear.name, section]) is None
+                   for setting in non_optional_settings[bear]):
+                unanswered.append(bear)
+    return tuple(unanswered)
+
+
+def get_missing_prerequisites_bears(bears, jobs=None):
+    """
+    Checks the prerequisites, such as the external executables, of the
+    bears concurrently.
+
+    :param bears:
+        A dict with language name as key and bear classes as value.
+    :param jobs:
+        The number of threads checking the bears, or ``None`` to use the
+        number of processors.
+    :return:
+        A dict with the bears whose prerequisites are not satisfied as keys
+        and the messages saying what is missing as values.
+    """
+    from coala_quickstart.generation.Prerequisites import check_prerequisites
+
+    all_bears = set()
+    for language in bears:
+        all_bears.update(bears[language])
+    missing = check_prerequisites(all_bears, jobs)
+
+    # Remember what was learned about the bears that had to be imported.
+    _save_bear_caches(all_bears)
+
+    return missing
+
+
+def print_missing_prerequisites(printer, missing, seconds, removed=False):
+    """
+    Prints the bears whose prerequisites are not satisfied.
+
+    :param printer:
+        A ``ConsolePrinter`` object used for console interactions.
+    :param missing:
+        A dict with bear classes as keys and the messages saying what is
+        missing as values.
+    :param seconds:
+        The time the prerequisites were checked in.
+    :param removed:
+        Whether the bears are removed from the coafile.
+    """
+    printer.print("The prerequisites of the bears were checked in "
+                  "{:.2f}s.".format(seconds))
+    if not missing:
+        printer.print()
+        return
+
+    if removed:
+        printer.print("The following bears will not be used, as their "
+                      "prerequisites are not satisfied:", color="yellow")
+    else:
+        printer.print("The prerequisites of the following bears are not "
+                      "satisfied, coala will fail to run them until they "
+                      "are:", color="yellow")
+    for bear in sorted(missing, key=lambda bear: bear.name):
+        printer.print("    {}: {}".format(bear.name, missing[bear]),
+                      color="yellow")
+    printer.print()
 
 
 def remove_unusable_bears(bears, unusable_bears):
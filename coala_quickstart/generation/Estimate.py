@@ -0,0 +1,161 @@
+import math
+from collections import defaultdict
+
+
+# The normal quantiles of the two-sided confidence levels.
+Z_SCORES = {0.8: 1.282, 0.9: 1.645, 0.95: 1.96, 0.99: 2.576}
+
+
+class EstimatedShare(float):
+    """
+    A percentage estimated from a sample, with the half width of its
+    confidence interval as ``error``. It is used like the exact percentages
+    of ``get_used_languages``:
+
+    >>> share = EstimatedShare(42.0, 3.5)
+    >>> share + 1, share.error
+    (43.0, 3.5)
+    """
+
+    def __new__(cls, value, error):
+        share = float.__new__(cls, value)
+        share.error = error
+        return share
+
+    def __reduce__(self):
+        return EstimatedShare, (float(self), self.error)
+
+
+class LanguageEstimator:
+    """
+    Estimates the share of each language in a project from a random sample
+    of its directories. Each sampled directory is a cluster of files, the
+    shares are ratio estimates over the clusters and their confidence
+    intervals come from the variance between the clusters, assuming the
+    directories are sampled uniformly at random. When they are not, as with
+    ``ProjectIndex.sample``, the intervals are approximate. Only sums are
+    kept, so the memory used does not grow with the sample.
+
+    The sampling is done once the ranking of the most used languages has
+    not changed for a number of consecutive checks:
+
+    >>> estimator = LanguageEstimator(min_dirs=2, check_every=1,
+    ...                               stable_checks=1)
+    >>> for counts, files in [({"Python": 3}, 4), ({"Python": 2}, 2),
+    ...                       ({"Python": 4, "C": 1}, 5), ({"C": 1}, 3)]:
+    ...     estimator.add_directory(counts, files)
+    >>> estimator.done
+    True
+    >>> [(lang, round(share), round(share.error))
+    ...  for lang, share in estimator.shares()]
+    [('Python', 64, 36), ('C', 14, 15)]
+    """
+
+    def __init__(self, confidence=0.95, min_dirs=100, check_every=25,
+                 stable_checks=4, ranked=5, max_dirs=None):
+        """
+        :param confidence:    The level of the confidence intervals, one of
+                              ``Z_SCORES``.
+        :param min_dirs:      The number of directories sampled before the
+                              sampling may stop.
+        :param check_every:   The number of directories sampled between two
+                              checks of the ranking.
+        :param stable_checks: The number of consecutive checks the ranking
+                              must not change in for the sampling to stop.
+        :param ranked:        The number of most used languages whose order
+                              is checked.
+        :param max_dirs:      The number of directories after which the
+                              sampling stops anyway, unbounded if ``None``.
+        """
+        self.confidence = confidence
+        self.z_score = Z_SCORES[confidence]
+        self.min_dirs = min_dirs
+        self.check_every = check_every
+        self.stable_checks = stable_checks
+        self.ranked = ranked
+        self.max_dirs = max_dirs
+
+        self.sampled_dirs = 0
+        self.sampled_files = 0
+        self.exhaustive = False
+        self.done = False
+
+        self._total = 0
+        self._total_squares = 0
+        self._weights = defaultdict(int)
+        self._squares = defaultdict(int)
+        self._products = defaultdict(int)
+        self._ranking = None
+        self._unchanged = 0
+
+    def add_directory(self, weights, total, files=None):
+        """
+        Adds a sampled directory.
+
+        :param weights: A dict with language name as key and the weight of
+                        the files of the directory belonging to that
+                        language as value.
+        :param total:   The weight of all files of the directory, including
+                        files of unknown languages.
+        :param files:   The number of files of the directory, ``total`` if
+                        ``None``.
+        """
+        self.sampled_dirs += 1
+        self.sampled_files += total if files is None else files
+        self._total += total
+        self._total_squares += total * total
+        for lang, weight in weights.items():
+            self._weights[lang] += weight
+            self._squares[lang] += weight * weight
+            self._products[lang] += weight * total
+
+        if self.max_dirs is not None and self.sampled_dirs >= self.max_dirs:
+            self.done = True
+        if (self.sampled_dirs >= self.min_dirs and
+                self.sampled_dirs % self.check_every == 0):
+            ranking = [lang for lang, _ in self.shares()[:self.ranked]]
+            self._unchanged = (self._unchanged + 1
+                               if ranking == self._ranking else 0)
+            self._ranking = ranking
+            if self._unchanged >= self.stable_checks:
+                self.done = True
+
+    def finish(self, exhaustive):
+        """
+        Ends the sampling.
+
+        :param exhaustive: Whether every directory was sampled, in which
+                           case the shares are exact.
+        """
+        self.exhaustive = exhaustive
+        self.done = True
+
+    def shares(self):
+        """
+        :return: A list of tuples of a language name and its estimated
+                 percentage as an ``EstimatedShare``, sorted by decreasing
+                 percentage.
+        """
+        if not self._total:
+            return []
+        dirs = self.sampled_dirs
+        mean_total = self._total / dirs
+        results = []
+        for lang, weight in self._weights.items():
+            ratio = weight / self._total
+            if self.exhaustive:
+                error = 0.0
+            elif dirs < 2:
+                error = 100.0
+            else:
+                # The sum of the squared residuals of the clusters, the
+                # variance of a ratio estimate in cluster sampling.
+                residuals = (self._squares[lang] -
+                             2 * ratio * self._products[lang] +
+                             ratio * ratio * self._total_squares)
+                variance = (max(residuals, 0) /
+                            (dirs * (dirs - 1) * mean_total * mean_total))
+                error = 100 * self.z_score * math.sqrt(variance)
+            results.append((lang, EstimatedShare(100 * ratio, error)))
+        results.sort(key=lambda result: (-result[1], result[0]))
+        return results
@@ -0,0 +1,116 @@
+import sys
+
+from coala_utils.Extensions import exts
+
+
+class ExtensionClassifier:
+    """
+    Classifies file names by their extension. The table of extensions is
+    built once with lowercased keys, so that case variants such as ``.JS``
+    are recognized, and extensions with several dots such as ``.cmake.in``
+    are preferred to the last part of the name. Files such as ``x.d.ts`` or
+    ``x.min.js`` are classified by their last known extension.
+
+    >>> classifier = ExtensionClassifier()
+    >>> classifier.classify("app.min.js")
+    ('.js', ('JavaScript',))
+    >>> classifier.classify("INDEX.JS")
+    ('.JS', ('JavaScript',))
+    >>> classifier.classify("config.cmake.in")
+    ('.cmake.in', ('CMake',))
+    >>> classifier.classify("main.o")
+    ('.o', ())
+    >>> classifier.classify(".bashrc")
+    ('', ())
+
+    The result is memoized per suffix of the name made of as many parts as
+    the longest known extension, so that each distinct extension of a
+    project is only classified once.
+    """
+
+    def __init__(self, extensions=None):
+        """
+        :param extensions: A dict with extensions, starting with a dot, as
+                           keys and the sets of their languages as values.
+                           Defaults to the extensions of ``coala_utils``.
+        """
+        if extensions is None:
+            extensions = exts
+        self._languages = {}
+        for ext, languages in extensions.items():
+            ext = sys.intern(ext.lower())
+            self._languages[ext] = tuple(sorted(
+                set(self._languages.get(ext, ())) | set(languages)))
+        self._parts = max((ext.count(".") for ext in self._languages),
+                          default=1)
+        self._memo = {}
+
+    def _suffix(self, name):
+        """
+        >>> ExtensionClassifier({".cmake.in": {"CMake"}})._suffix(
+        ...     "a.b.cmake.in")
+        '.cmake.in'
+
+        :param name: A file name.
+        :return:     The end of the name starting at the dot that is the
+                     number of parts of the longest known extension from
+                     the end, or at its first extension dot if it has fewer.
+                     Leading dots are no extension dots, as with
+                     ``os.path.splitext``.
+        """
+        first = len(name) - len(name.lstrip("."))
+        start = len(name)
+        for _ in range(self._parts):
+            dot = name.rfind(".", first + 1, start)
+            if dot == -1:
+                break
+            start = dot
+        return name[start:]
+
+    def classify(self, name):
+        """
+        :param name: A file name, without its directory.
+        :return:     A tuple of the extension of the file and the tuple of
+                     the languages it belongs to. The extension is the
+                     longest known suffix of the name as it is written, or
+                     the part after its last dot if no suffix is known.
+        """
+        suffix = self._suffix(name)
+        result = self._memo.get(suffix)
+        if result is None:
+            result = self._memo[suffix] = self._classify_suffix(suffix)
+        return result
+
+    def _classify_suffix(self, suffix):
+        """
+        :param suffix: The suffix of a file name given by ``_suffix``.
+        :return:       The result of ``classify`` for the suffix.
+        """
+        lower = suffix.lower()
+        start = 0
+        while start != -1:
+            languages = self._languages.get(lower[start:])
+            if languages:
+                return sys.intern(suffix[start:]), languages
+            start = lower.find(".", start + 1)
+        return sys.intern(suffix[suffix.rfind("."):] if suffix else ""), ()
+
+
+_classifier = None
+
+
+def classify(name):
+    """
+    Classifies a file name with an ``ExtensionClassifier`` of the
+    extensions of ``coala_utils``, which is built on the first call.
+
+    >>> classify("types.d.ts")
+    ('.ts', ('TypeScript',))
+
+    :param name: A file name, without its directory.
+    :return:     A tuple of its extension and the tuple of its languages.
+    """
+    global _classifier
+    if _classifier is None:
+        _classifier = ExtensionClassifier()
+    return _classifier.classify(name)
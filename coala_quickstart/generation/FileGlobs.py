@@ -1,52 +1,130 @@
 import os
 
 from coalib.parsing.Globbing import glob_escape
-from coala_quickstart.generation.Utilities import get_gitignore_glob
+from coala_quickstart.generation.GitIgnore import GitIgnore
+from coala_quickstart.generation.Project import WEIGHT_FUNCTIONS
+from coala_quickstart.generation.ProjectIndex import ProjectIndex
 from coala_utils.Question import ask_question
 from coala_quickstart.Strings import GLOB_HELP
-from coalib.collecting.Collectors import collect_files
 
 
-def get_project_files(log_printer, printer, project_dir):
+def get_ignore_globs(printer, project_dir):
     """
-    Gets the list of files matching files in the user's project directory
-    after prompting for glob expressions.
+    Prompts for the glob expressions of the files to ignore, unless there
+    is a ``.gitignore`` file the files to ignore are loaded from.
 
-    :param log_printer:
-        A ``LogPrinter`` object.
-    :param printer:
-        A ``ConsolePrinter`` object.
-    :return:
-        A list of file paths matching the files.
+    :param printer:     A ``ConsolePrinter`` object.
+    :param project_dir: Full path of the user's project directory.
+    :return:            The list of glob expressions given.
     """
-    file_globs = ["**"]
-
-    ignore_globs = None
     if os.path.isfile(os.path.join(project_dir, ".gitignore")):
         printer.print("The contents of your .gitignore file for the project "
                       "will be automatically loaded as the files to ignore.",
                       color="green")
-        ignore_globs = get_gitignore_glob(project_dir)
-
-    if ignore_globs is None:
+        ignore_globs = []
+    else:
         printer.print(GLOB_HELP)
         ignore_globs = ask_question(
             "Which files do you want coala to ignore?",
             printer=printer,
             typecast=list)
     printer.print()
+    return ignore_globs
+
+
+def get_project_files(log_printer, printer, project_dir, jobs=1,
+                      source="auto", state=None, ignore_globs=None,
+                      keep_files=True, weight="files", estimator=None):
+    """
+    Gets the list of files matching files in the user's project directory
+    after prompting for glob expressions.
+
+    In a git project, the files ignored by the ``.gitignore`` files of the
+    whole tree, ``.git/info/exclude`` and the global excludes file are left
+    out as well, and no globs are asked for if there is a top-level
+    ``.gitignore`` file.
+
+    :param log_printer:
+        A ``LogPrinter`` object.
+    :param printer:
+        A ``ConsolePrinter`` object.
+    :param project_dir:
+        Full path of the user's project directory.
+    :param jobs:
+        The number of threads scanning the project directory, or ``None``
+        to use the number of processors.
+    :param source:
+        Where the files are listed from: ``git`` reads the file list of the
+        git index, ``filesystem`` walks the project directory and ``auto``
+        uses git when the project is in a git work tree. The directory is
+        walked whenever git cannot be used.
+    :param state:
+        The ``ScanState`` of the previous run, so that only what changed
+        since is read again.
+    :param ignore_globs:
+        The list of glob expressions of the files to ignore, given by
+        ``get_ignore_globs`` if ``None``.
+    :param keep_files:
+        Whether the ``ProjectIndex`` keeps every file, or only the
+        aggregates the settings are generated from, so that its memory
+        use does not grow with the number of files.
+    :param weight:
+        How the languages are weighed, one of ``LANGUAGE_WEIGHTS``, which
+        the files that are not kept or sampled are weighed by as they are
+        found.
+    :param estimator:
+        A ``LanguageEstimator``. If given, only a random sample of the
+        directories is walked, whatever the ``source``, until the estimator
+        has sampled enough of them, and the languages used are estimated.
+    :return:
+        A ``ProjectIndex`` of the files matched in the project directory,
+        which is a sequence of their paths if it keeps them, and the list
+        of ignore globs, including the ones equivalent to the ignore rules
+        that matched.
+    """
+    ignore_rules = None
+    if (os.path.isdir(os.path.join(project_dir, ".git")) or
+            os.path.isfile(os.path.join(project_dir, ".gitignore"))):
+        ignore_rules = GitIgnore(project_dir)
+
+    if ignore_globs is None:
+        ignore_globs = get_ignore_globs(printer, project_dir)
+    ignore_globs = list(ignore_globs)
 
     escaped_project_dir = glob_escape(project_dir)
-    file_path_globs = [os.path.join(
-        escaped_project_dir, glob_exp) for glob_exp in file_globs]
     ignore_path_globs = [os.path.join(
         escaped_project_dir, glob_exp) for glob_exp in ignore_globs]
 
     ignore_path_globs.append(os.path.join(escaped_project_dir, ".git/**"))
 
-    file_paths = collect_files(
-        file_path_globs,
-        log_printer,
-        ignored_file_paths=ignore_path_globs)
+    weigh = None
+    if (not keep_files or estimator is not None) and weight != "files":
+        weigh = WEIGHT_FUNCTIONS[weight]
+
+    project_index = None
+    if estimator is not None:
+        project_index = ProjectIndex.sample(project_dir, estimator,
+                                            ignore_path_globs, ignore_rules,
+                                            weigh)
+    elif source != "filesystem":
+        project_index = ProjectIndex.from_git(project_dir, ignore_path_globs,
+                                              jobs, ignore_rules=ignore_rules,
+                                              state=state,
+                                              keep_files=keep_files,
+                                              weigh=weigh)
+        if project_index is None and source == "git":
+            printer.print("The file list of git could not be read, the "
+                          "project directory will be scanned instead.",
+                          color="yellow")
+    if project_index is None:
+        project_index = ProjectIndex.scan(project_dir, ignore_path_globs,
+                                          jobs, ignore_rules=ignore_rules,
+                                          state=state, keep_files=keep_files,
+                                          weigh=weigh)
+
+    if ignore_rules is not None:
+        ignore_globs = ignore_globs + [
+            glob for glob in ignore_rules.matched_globs()
+            if glob not in ignore_globs]
 
-    return file_paths, ignore_globs
+    return project_index, ignore_globs
@@ -0,0 +1,58 @@
+import os
+import subprocess
+
+
+def _git_ls_files(project_dir, *options):
+    """
+    Runs ``git ls-files`` in the project directory.
+
+    :param project_dir: The directory to run git in.
+    :param options:     The options passed to ``git ls-files``.
+    :return:            A list of the paths printed, relative to the
+                        project directory and using the separator of the
+                        platform, or ``None`` if git failed.
+    """
+    try:
+        output = subprocess.check_output(
+            ("git", "ls-files", "-z") + options,
+            cwd=project_dir, stderr=subprocess.DEVNULL)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    paths = os.fsdecode(output).split("\0")
+    if os.sep != "/":
+        paths = [path.replace("/", os.sep) for path in paths]
+    return [path for path in paths if path]
+
+
+def list_git_files(project_dir):
+    """
+    Lists the files of a git work tree from its index instead of walking
+    the file system. Tracked files that were deleted and submodules are
+    left out, files that are neither tracked nor ignored are included.
+
+    :param project_dir:
+        The project directory, which may be anywhere in a git work tree.
+    :return:
+        A tuple of the sorted list of file paths and the list of untracked
+        paths git ignores, directories given only once and ending in a
+        separator. The paths are relative to the project directory.
+        ``None`` if the project is not in a git work tree or git is not
+        available.
+    """
+    staged = _git_ls_files(project_dir, "--stage")
+    if staged is None:
+        return None
+
+    deleted = set(_git_ls_files(project_dir, "--deleted") or ())
+    files = set()
+    for entry in staged:
+        info, _, path = entry.partition("\t")
+        # Submodules are recorded with the gitlink mode.
+        if not info.startswith("160000") and path not in deleted:
+            files.add(path)
+    files.update(_git_ls_files(project_dir, "--others", "--exclude-standard")
+                 or ())
+
+    ignored = _git_ls_files(project_dir, "--others", "--ignored",
+                            "--exclude-standard", "--directory") or []
+    return sorted(files), ignored
@@ -0,0 +1,635 @@
+import os
+import re
+import subprocess
+from collections import OrderedDict
+
+from coalib.parsing.Globbing import glob_escape
+
+from coala_quickstart.generation.IgnoreMatcher import GlobTracker
+
+
+def _to_posix(path):
+    """
+    :param path: A relative path using the separator of the platform.
+    :return:     The path using ``/`` as separator, as in ignore files.
+    """
+    return path.replace(os.sep, "/") if os.sep != "/" else path
+
+
+def _split_pattern(pattern):
+    """
+    Splits a gitignore pattern into wildcards and literal characters.
+
+    :param pattern: A gitignore pattern without negation or trailing slash.
+    :return:        An iterator of tuples of a token and whether it is a
+                    literal character. Tokens that are not literal are
+                    ``**``, ``*``, ``?`` or a bracket expression.
+    """
+    position = 0
+    while position < len(pattern):
+        char = pattern[position]
+        if char == "\\" and position + 1 < len(pattern):
+            yield pattern[position + 1], True
+            position += 2
+        elif pattern.startswith("**", position):
+            yield "**", False
+            position += 2
+        elif char in "*?":
+            yield char, False
+            position += 1
+        elif char == "[":
+            end = pattern.find("]", position + 2)
+            if end < 0:
+                yield char, True
+                position += 1
+            else:
+                yield pattern[position:end + 1], False
+                position = end + 1
+        else:
+            yield char, True
+            position += 1
+
+
+def translate_pattern(pattern):
+    """
+    Translates a gitignore pattern into a regular expression matching paths
+    relative to the directory of the ignore file.
+
+    >>> bool(re.match(translate_pattern("doc/**/*.txt"), "doc/a/b.txt"))
+    True
+    >>> bool(re.match(translate_pattern("doc/**/*.txt"), "doc/b.txt"))
+    True
+    >>> bool(re.match(translate_pattern("doc/*.txt"), "doc/a/b.txt"))
+    False
+
+    :param pattern: A gitignore pattern without negation or trailing slash.
+    :return:        A regular expression.
+    """
+    anchored = "/" in pattern
+    pattern = pattern.lstrip("/")
+
+    parts = []
+    tokens = list(_split_pattern(pattern))
+    for index, (token, literal) in enumerate(tokens):
+        previous = tokens[index - 1][0] if index else "/"
+        following = tokens[index + 1][0] if index + 1 < len(tokens) else None
+        if literal:
+            parts.append(re.escape(token))
+        elif token == "**" and previous == "/" and following == "/":
+            # ``a/**/b`` also matches ``a/b``, the slash is consumed here.
+            parts.append("(?:.*/)?")
+            tokens[index + 1] = ("", True)
+        elif token == "**" and previous == "/" and following is None:
+            parts.append(".*")
+        elif token in ("*", "**"):
+            parts.append("[^/]*")
+        elif token == "?":
+            parts.append("[^/]")
+        else:
+            parts.append("[" + ("^" + token[2:-1] if token[1] == "!"
+                                else token[1:-1]) + "]")
+
+    return ("" if anchored else "(?:.*/)?") + "".join(parts) + r"\Z"
+
+
+class IgnoreRule:
+    """
+    A single pattern of an ignore file, compiled once.
+
+    >>> rule = IgnoreRule.parse("!/build/\\n")
+    >>> rule.negate, rule.directory_only, rule.anchored
+    (True, True, True)
+    >>> rule.matches("build", is_dir=True)
+    True
+    >>> rule.matches("src/build", is_dir=True)
+    False
+    """
+
+    def __init__(self, pattern, negate=False, directory_only=False, base=""):
+        """
+        :param pattern:
+            The pattern without the leading ``!`` and the trailing ``/``.
+        :param negate:
+            Whether the pattern re-includes paths instead of ignoring them.
+        :param directory_only:
+            Whether the pattern only matches directories.
+        :param base:
+            The directory of the ignore file, relative to the project
+            directory, using ``/`` as separator.
+        """
+        self.pattern = pattern
+        self.negate = negate
+        self.directory_only = directory_only
+        self.anchored = "/" in pattern
+        self.base = base
+        self.regex_source = translate_pattern(pattern)
+        self.literal = self._literal()
+        self._regex = None
+
+    @property
+    def regex(self):
+        """
+        The compiled regular expression of the rule. It is compiled when it
+        is first needed, as most rules are only looked up.
+        """
+        if self._regex is None:
+            self._regex = re.compile(self.regex_source, re.DOTALL)
+        return self._regex
+
+    def _literal(self):
+        """
+        Finds whether the rule only matches a literal name, a name ending in
+        a literal suffix, a literal path or names in a literal directory, so
+        that it can be looked up in a dict instead of being matched with the
+        other rules.
+
+        >>> IgnoreRule.parse("node_modules/").literal
+        ('name', 'node_modules')
+        >>> IgnoreRule.parse("**/*.log").literal
+        ('suffix', '.log')
+        >>> IgnoreRule.parse("/src/main.c").literal
+        ('path', 'src/main.c')
+        >>> IgnoreRule.parse("src/*.c").literal
+        ('directory', 'src')
+        >>> IgnoreRule.parse("src/**/*.c").literal
+        (None, None)
+
+        :return: A tuple of ``name``, ``suffix``, ``path`` or ``directory``
+                 and the literal text, or of ``None`` twice.
+        """
+        tokens = list(_split_pattern(self.pattern.lstrip("/")))
+        anchored = self.anchored
+        if tokens[:2] == [("**", False), ("/", True)]:
+            tokens = tokens[2:]
+            if ("/", True) in tokens:
+                return None, None
+            anchored = False
+        if tokens and tokens[0] == ("*", False) and not anchored:
+            kind, tokens = "suffix", tokens[1:]
+        else:
+            kind = "path" if anchored else "name"
+        if not all(literal for _, literal in tokens):
+            if kind != "path" or ("/", True) not in tokens:
+                return None, None
+            # Only the name after the last slash has wildcards.
+            last = len(tokens) - tokens[::-1].index(("/", True))
+            if (not all(literal for _, literal in tokens[:last]) or
+                    ("**", False) in tokens[last:]):
+                return None, None
+            return "directory", "".join(token for token, _
+                                        in tokens[:last - 1])
+        text = "".join(token for token, _ in tokens)
+        if kind == "suffix" and "/" in text:
+            return None, None
+        return kind, text
+
+    @classmethod
+    def parse(cls, line, base=""):
+        """
+        Parses a line of an ignore file.
+
+        :param line: The line.
+        :param base: The directory of the ignore file, relative to the
+                     project directory.
+        :return:     An ``IgnoreRule``, or ``None`` if the line is blank or
+                     a comment.
+        """
+        line = line.rstrip("\n").rstrip("\r")
+        if not line or line.startswith("#"):
+            return None
+
+        # Trailing whitespace is ignored unless it is escaped.
+        end = len(line)
+        while end > 0 and line[end - 1] == " " and (
+                end < 2 or line[end - 2] != "\\"):
+            end -= 1
+        line = line[:end]
+
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        directory_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            return None
+        return cls(line, negate, directory_only, base)
+
+    def matches(self, path, is_dir=False):
+        """
+        :param path:   A path relative to the directory of the ignore file,
+                       using ``/`` as separator.
+        :param is_dir: Whether the path is a directory.
+        :return:       True if the pattern matches the path.
+        """
+        if self.directory_only and not is_dir:
+            return False
+        return self.regex.match(path) is not None
+
+    def globs(self, files=True, directories=True):
+        """
+        Translates the rule into as few coala globs as possible.
+
+        >>> IgnoreRule.parse("*.log").globs(directories=False)
+        ['**.log']
+        >>> IgnoreRule.parse("/build/").globs()
+        ['build/**']
+        >>> IgnoreRule.parse("doc/**/*.txt").globs(directories=False)
+        ['doc/**/*.txt', 'doc/*.txt']
+
+        :param files:
+            Whether the globs need to match the files the rule matches.
+        :param directories:
+            Whether the globs need to match the content of the directories
+            the rule matches.
+        :return:
+            A list of coala globs, relative to the project directory,
+            matching what the rule ignores. Negated rules cannot be
+            expressed as ignore globs and give none.
+        """
+        if self.negate:
+            return []
+
+        tokens = list(_split_pattern(self.pattern.lstrip("/")))
+        anchored = self.anchored
+        if tokens[:2] == [("**", False), ("/", True)]:
+            # The rest matches at any depth, but coala's ``**/`` does not
+            # match zero directories.
+            tokens = tokens[2:]
+            anchored = False
+        # Likewise, ``a/**/b`` also matches ``a/b``, which is added as a
+        # variant without the ``**/``. The positions are handled from the
+        # end so that the earlier ones do not move in the variants.
+        variants = [tokens]
+        for position in reversed(range(1, len(tokens) - 1)):
+            if (tokens[position] == ("**", False) and
+                    tokens[position - 1] == ("/", True) and
+                    tokens[position + 1] == ("/", True)):
+                variants += [variant[:position] + variant[position + 2:]
+                             for variant in variants]
+        variants = ["".join(glob_escape(token) if literal else token
+                            for token, literal in variant)
+                    for variant in variants]
+        prefix = self.base + "/" if self.base else ""
+
+        if anchored:
+            paths = [prefix + glob for glob in variants]
+        elif tokens[0] == ("*", False) and all(
+                literal and token != "/" for token, literal in tokens[1:]):
+            # A name ending in a literal suffix, like ``*.log``, matches the
+            # same paths as ``**.log``.
+            paths = [prefix + "*" + variants[0]]
+        else:
+            paths = [path for glob in variants
+                     for path in (prefix + glob, prefix + "**/" + glob)]
+
+        globs = [path + "/**" for path in paths] if directories else []
+        if files and not self.directory_only:
+            globs.extend(paths)
+        return [os.path.normpath(glob) for glob in globs]
+
+    def __repr__(self):
+        return "<IgnoreRule {}{}{} in {!r}>".format(
+            "!" if self.negate else "", self.pattern,
+            "/" if self.directory_only else "", self.base)
+
+
+class _RuleSet:
+    """
+    Rules of an ignore file matched together. The rules matching a literal
+    name, suffix or path are looked up in dicts, so their number does not
+    slow the matching down, and the rules of a literal directory are only
+    matched against the paths in that directory. The others are combined
+    into one regular expression. Of the rules matching a path, the last one
+    wins.
+    """
+
+    def __init__(self, rules):
+        """
+        :param rules: A list of ``IgnoreRule`` objects.
+        """
+        self.rules = rules
+        self.lookups = {"name": {}, "suffix": {}, "path": {}}
+        self.directories = {}
+        others = []
+        for position, rule in enumerate(rules):
+            kind, text = rule.literal
+            if kind is None:
+                others.append(position)
+            elif kind == "directory":
+                self.directories.setdefault(text, []).insert(0, position)
+            else:
+                self.lookups[kind][text] = position
+        self.suffix_lengths = sorted({len(suffix)
+                                      for suffix in self.lookups["suffix"]})
+
+        # The alternatives are in reverse order, so the first one matching
+        # is the last rule.
+        self.others = list(reversed(others))
+        self.regex = (re.compile("|".join("(" + rules[position].regex_source +
+                                          ")" for position in self.others),
+                                 re.DOTALL)
+                      if others else None)
+
+    def match(self, path):
+        """
+        :param path: A path relative to the directory of the ignore file,
+                     using ``/`` as separator.
+        :return:     The last rule matching the path, or ``None``.
+        """
+        name = path[path.rfind("/") + 1:]
+        best = max(self.lookups["name"].get(name, -1),
+                   self.lookups["path"].get(path, -1))
+        suffixes = self.lookups["suffix"]
+        for length in self.suffix_lengths:
+            if length > len(name):
+                break
+            best = max(best, suffixes.get(name[len(name) - length:], -1))
+        for position in self.directories.get(path[:-len(name) - 1], ()):
+            if position < best:
+                break
+            if self.rules[position].regex.match(path):
+                best = position
+                break
+        if self.regex is not None and best < self.others[0]:
+            match = self.regex.match(path)
+            if match:
+                best = max(best, self.others[match.lastindex - 1])
+        return self.rules[best] if best >= 0 else None
+
+
+class IgnoreFile:
+    """
+    The rules of one ignore file, which apply to the paths below its
+    directory.
+    """
+
+    def __init__(self, rules, base=""):
+        """
+        :param rules: A list of ``IgnoreRule`` objects.
+        :param base:  The directory of the ignore file, relative to the
+                      project directory, using ``/`` as separator.
+        """
+        self.rules = rules
+        self.base = base
+        self._file_rules = _RuleSet(
+            [rule for rule in rules if not rule.directory_only])
+        self._directory_rules = _RuleSet(rules)
+
+    @classmethod
+    def read(cls, file_path, base=""):
+        """
+        :param file_path: The path of the ignore file.
+        :param base:      The directory the rules apply to, relative to the
+                          project directory.
+        :return:          An ``IgnoreFile``, without rules if the file cannot
+                          be read.
+        """
+        rules = []
+        try:
+            with open(file_path, "r", errors="replace") as file:
+                for line in file:
+                    rule = IgnoreRule.parse(line, base)
+                    if rule is not None:
+                        rules.append(rule)
+        except OSError:
+            pass
+        return cls(rules, base)
+
+    def match(self, path, is_dir=False):
+        """
+        :param path:   A path relative to the project directory, using
+                       ``/`` as separator, below the directory of the file.
+        :param is_dir: Whether the path is a directory.
+        :return:       The last rule matching the path, or ``None``.
+        """
+        if self.base:
+            path = path[len(self.base) + 1:]
+        rules = self._directory_rules if is_dir else self._file_rules
+        return rules.match(path)
+
+
+def get_excludes_file(project_dir):
+    """
+    Finds the user's global ignore file, as configured with
+    ``core.excludesFile``, or its default location.
+
+    :param project_dir: The project directory, whose git configuration may
+                        override the global one.
+    :return:            The path of the global ignore file.
+    """
+    try:
+        output = subprocess.check_output(
+            ["git", "config", "--path", "--get", "core.excludesFile"],
+            cwd=project_dir, stderr=subprocess.DEVNULL,
+            universal_newlines=True, timeout=10)
+        if output.strip():
+            return os.path.expanduser(output.strip())
+    except (OSError, subprocess.SubprocessError):
+        pass
+
+    config_home = (os.environ.get("XDG_CONFIG_HOME") or
+                   os.path.join(os.path.expanduser("~"), ".config"))
+    return os.path.join(config_home, "git", "ignore")
+
+
+class GitIgnore:
+    """
+    The ignore rules of a git project: the global excludes file,
+    ``.git/info/exclude`` and every ``.gitignore`` file of the tree. The
+    ``.gitignore`` files are loaded while the tree is walked, each applying
+    only below its own directory. As in git, the last matching rule wins,
+    rules of deeper files take precedence over higher ones and nothing
+    below an ignored directory can be re-included. Since ``**.log`` would
+    also match ``keep.log`` in the example below, the log files ignored are
+    listed in the ``matched_globs`` instead.
+
+    >>> import tempfile, shutil
+    >>> project_dir = tempfile.mkdtemp()
+    >>> with open(os.path.join(project_dir, ".gitignore"), "w") as file:
+    ...     _ = file.write("*.log\\n!keep.log\\nbuild/\\n")
+    >>> ignore = GitIgnore(project_dir, excludes_file="")
+    >>> ignore.load_directory("", [".gitignore"])
+    >>> ignore.is_ignored("debug.log"), ignore.is_ignored("keep.log")
+    (True, False)
+    >>> ignore.is_ignored("build/keep.log")
+    True
+    >>> ignore.matched_globs()
+    ['debug.log', 'build/**', '**/build/**']
+    >>> shutil.rmtree(project_dir)
+    """
+
+    def __init__(self, project_dir, excludes_file=None,
+                 filename=".gitignore"):
+        """
+        :param project_dir:
+            Full path of the user's project directory.
+        :param excludes_file:
+            The path of the global ignore file, found with
+            ``get_excludes_file`` if ``None``. An empty string disables it.
+        :param filename:
+            The name of the ignore files in the tree.
+        """
+        self.project_dir = project_dir
+        self.filename = filename
+        self.matched_rules = OrderedDict()
+        self.reincluded = set()
+        self._files = {}
+        self._ignored_dirs = {}
+
+        if excludes_file is None:
+            excludes_file = get_excludes_file(project_dir)
+        self._root_files = [
+            IgnoreFile.read(file_path)
+            for file_path in (excludes_file, os.path.join(
+                project_dir, ".git", "info", "exclude"))
+            if file_path]
+
+    def __bool__(self):
+        return any(ignore_file.rules for ignore_file in
+                   self._root_files + list(self._files.values()))
+
+    def load_directory(self, directory, names):
+        """
+        Loads the ignore file of a directory, if it has one.
+
+        :param directory: The directory, relative to the project directory.
+        :param names:     The names of the files in the directory.
+        """
+        if self.filename in names:
+            base = _to_posix(directory)
+            ignore_file = IgnoreFile.read(
+                os.path.join(self.project_dir, directory, self.filename),
+                base)
+            if ignore_file.rules:
+                self._files[base] = ignore_file
+                self._ignored_dirs.clear()
+
+    def _ignore_files(self, path):
+        """
+        :param path: A path relative to the project directory, using ``/``
+                     as separator.
+        :return:     An iterator of the ignore files applying to the path,
+                     from the highest precedence to the lowest.
+        """
+        position = len(path)
+        while position > 0:
+            position = path.rfind("/", 0, position)
+            if position < 0:
+                break
+            ignore_file = self._files.get(path[:position])
+            if ignore_file is not None:
+                yield ignore_file
+        ignore_file = self._files.get("")
+        if ignore_file is not None:
+            yield ignore_file
+        yield from reversed(self._root_files)
+
+    def match(self, path, is_dir=False):
+        """
+        Finds the rule deciding whether a path is ignored, assuming that no
+        directory above it is ignored. Rules ignoring a path are recorded
+        in ``matched_rules``, along with the paths they ignored and whether
+        these are directories. Paths a negated rule re-includes are
+        recorded in ``reincluded``.
+
+        :param path:   A path relative to the project directory.
+        :param is_dir: Whether the path is a directory.
+        :return:       The deciding rule, or ``None`` if no rule matches.
+        """
+        path = _to_posix(path)
+        for ignore_file in self._ignore_files(path):
+            rule = ignore_file.match(path, is_dir)
+            if rule is not None:
+                if rule.negate:
+                    self.reincluded.add((path, is_dir))
+                else:
+                    self.matched_rules.setdefault(rule, []).append(
+                        (path, is_dir))
+                return rule
+        return None
+
+    def is_ignored(self, path, is_dir=False):
+        """
+        :param path:   A path relative to the project directory.
+        :param is_dir: Whether the path is a directory.
+        :return:       True if the path or a directory above it is ignored.
+        """
+        path = _to_posix(path)
+        position = path.rfind("/")
+        if position >= 0 and self._is_ignored_dir(path[:position]):
+            return True
+        rule = self.match(path, is_dir)
+        return rule is not None and not rule.negate
+
+    def _is_ignored_dir(self, directory):
+        """
+        :param directory: A directory relative to the project directory,
+                          using ``/`` as separator.
+        :return:          True if the directory or one above it is ignored.
+                          The result is remembered until another ignore
+                          file is loaded.
+        """
+        ignored = self._ignored_dirs.get(directory)
+        if ignored is None:
+            position = directory.rfind("/")
+            ignored = (position >= 0 and
+                       self._is_ignored_dir(directory[:position]))
+            if not ignored:
+                rule = self.match(directory, True)
+                ignored = rule is not None and not rule.negate
+            self._ignored_dirs[directory] = ignored
+        return ignored
+
+    def matched_globs(self):
+        """
+        Translates the rules that ignored paths into coala globs. A rule
+        whose globs would also match a path that a negated rule re-included
+        is replaced by the paths it ignored, since ignore globs cannot
+        re-include anything.
+
+        :return: The minimal list of coala globs, relative to the project
+                 directory, matching the files and directories the rules
+                 ignored.
+        """
+        rule_globs = OrderedDict(
+            (rule, rule.globs(files=any(not is_dir for _, is_dir in paths),
+                              directories=any(is_dir for _, is_dir in paths)))
+            for rule, paths in self.matched_rules.items())
+
+        overlapping = set()
+        if self.reincluded:
+            tracker = GlobTracker(glob for globs in rule_globs.values()
+                                  for glob in globs)
+            for path, is_dir in sorted(self.reincluded):
+                if not tracker:
+                    break
+                tracker.add(path + "/" if is_dir else path)
+            overlapping = tracker.matched
+
+        globs = []
+        for rule, paths in self.matched_rules.items():
+            if overlapping.isdisjoint(rule_globs[rule]):
+                globs.extend(rule_globs[rule])
+            else:
+                globs.extend(os.path.normpath(glob_escape(path)) +
+                             (os.sep + "**" if is_dir else "")
+                             for path, is_dir in paths)
+        return minimize_globs(globs)
+
+
+def minimize_globs(globs):
+    """
+    Removes duplicate globs and globs matching only paths that a glob
+    ending in ``**`` with the same beginning matches already.
+
+    >>> minimize_globs(["build/**", "build/*.o", "**.o", "**.o"])
+    ['build/**', '**.o']
+
+    :param globs: An iterable of coala globs.
+    :return:      A list of the remaining globs, in their original order.
+    """
+    globs = list(OrderedDict.fromkeys(globs))
+    prefixes = [glob[:-2] for glob in globs if glob.endswith("**")]
+    return [glob for glob in globs
+            if not any(glob.startswith(prefix) and glob != prefix + "**"
+                       for prefix in prefixes)]
@@ -0,0 +1,134 @@
+import os
+import re
+
+from coalib.parsing.Globbing import translate, _iter_alternatives
+
+
+def _glob_regex(glob):
+    """
+    Translates a coala glob into a regular expression without the trailing
+    inline flags, so that it can be embedded in a larger expression.
+
+    :param glob: A coala glob expression.
+    :return:     An iterator of regular expressions, one for each alternative
+                 of the glob.
+    """
+    for pattern in _iter_alternatives(glob):
+        regex = translate(os.path.normcase(os.path.expanduser(pattern)))
+        if regex.endswith("(?ms)"):
+            regex = regex[:-len("(?ms)")]
+        yield regex
+
+
+class IgnoreMatcher:
+    """
+    Matches paths against a list of coala globs. All globs are compiled once
+    into a single regular expression, so testing a path costs one regex match
+    instead of one match per glob.
+
+    >>> matcher = IgnoreMatcher(["/project/build/**", "/project/**/*.pyc"])
+    >>> matcher.match("/project/build/main.o")
+    0
+    >>> matcher.match("/project/src/main.pyc")
+    1
+    >>> matcher.match("/project/src/main.py") is None
+    True
+    """
+
+    def __init__(self, globs):
+        """
+        :param globs: A list of coala glob expressions.
+        """
+        self.globs = tuple(globs)
+        regexes = [tuple(_glob_regex(glob)) for glob in self.globs]
+        self._patterns = [
+            re.compile("|".join("(?:" + regex + ")" for regex in alternatives),
+                       re.MULTILINE | re.DOTALL)
+            for alternatives in regexes]
+        self._group_globs = [index
+                             for index, alternatives in enumerate(regexes)
+                             for regex in alternatives]
+        self._regex = re.compile(
+            "|".join("(" + regex + ")"
+                     for alternatives in regexes
+                     for regex in alternatives),
+            re.MULTILINE | re.DOTALL) if self.globs else None
+
+    def __bool__(self):
+        return bool(self.globs)
+
+    def match(self, path):
+        """
+        Tests the path against all globs at once.
+
+        :param path: The path to test.
+        :return:     The index of the first glob matching the path, or
+                     ``None`` if no glob matches.
+        """
+        if self._regex is None:
+            return None
+        match = self._regex.match(os.path.normcase(path))
+        if match is None:
+            return None
+        return self._group_globs[match.lastindex - 1]
+
+    def matching_globs(self, path, indices=None):
+        """
+        Finds every glob matching the path.
+
+        :param path:    The path to test.
+        :param indices: The indices of the globs to test, all globs if
+                        ``None``.
+        :return:        A list of indices of the globs matching the path.
+        """
+        path = os.path.normcase(path)
+        if indices is None:
+            indices = range(len(self._patterns))
+        return [index for index in indices
+                if self._patterns[index].match(path)]
+
+
+class GlobTracker:
+    """
+    Records which globs of a list match at least one of the paths added to
+    it. The globs are compiled once. A path is tested against all of them
+    at once first, and only if it matches, against each glob that has not
+    matched yet.
+
+    >>> tracker = GlobTracker(["/project/build/**", "/project/**/*.pyc"])
+    >>> tracker.add("/project/build/main.o")
+    >>> sorted(tracker.matched)
+    ['/project/build/**']
+    >>> bool(tracker)
+    True
+    >>> tracker.add("/project/src/main.pyc")
+    >>> bool(tracker)
+    False
+    """
+
+    def __init__(self, globs):
+        """
+        :param globs: A list of coala glob expressions.
+        """
+        self.matched = set()
+        self._matcher = IgnoreMatcher(globs)
+        self._unmatched = set(range(len(self._matcher.globs)))
+
+    def __bool__(self):
+        """
+        :return: True while there are globs that have not matched yet.
+        """
+        return bool(self._unmatched)
+
+    def add(self, path):
+        """
+        Tests the path against the globs that have not matched yet.
+
+        :param path: The path to test.
+        """
+        if not self._unmatched or self._matcher.match(path) is None:
+            return
+        matching = self._matcher.matching_globs(path, list(self._unmatched))
+        for index in matching:
+            self._unmatched.discard(index)
+            self.matched.add(self._matcher.globs[index])
@@ -0,0 +1,206 @@
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+
+SAMPLE_SIZE = 512
+
+FILENAME_LANGUAGES = {
+    ".bash_profile": ("bash",),
+    ".bashrc": ("bash",),
+    ".profile": ("sh",),
+    "CMakeLists.txt": ("CMake",),
+    "Dockerfile": ("Dockerfile",),
+    "GNUmakefile": ("Makefile",),
+    "Gemfile": ("Ruby",),
+    "Makefile": ("Makefile",),
+    "Rakefile": ("Ruby",),
+    "SConscript": ("Python",),
+    "SConstruct": ("Python",),
+    "Vagrantfile": ("Ruby",),
+    "makefile": ("Makefile",),
+    "requirements.txt": ("Python Requirements",),
+}
+
+INTERPRETER_LANGUAGES = {
+    "bash": ("bash",),
+    "dash": ("dash",),
+    "julia": ("Julia",),
+    "ksh": ("ksh",),
+    "lua": ("Lua",),
+    "node": ("JavaScript",),
+    "nodejs": ("JavaScript",),
+    "perl": ("Perl",),
+    "php": ("PHP",),
+    "python": ("Python",),
+    "rscript": ("R",),
+    "ruby": ("Ruby",),
+    "sh": ("sh",),
+}
+
+MODELINE_LANGUAGES = {
+    "c": ("C",),
+    "c++": ("C++",),
+    "cmake": ("CMake",),
+    "cpp": ("C++",),
+    "dockerfile": ("Dockerfile",),
+    "javascript": ("JavaScript",),
+    "js": ("JavaScript",),
+    "json": ("JSON",),
+    "lua": ("Lua",),
+    "make": ("Makefile",),
+    "makefile": ("Makefile",),
+    "markdown": ("Markdown",),
+    "perl": ("Perl",),
+    "php": ("PHP",),
+    "python": ("Python",),
+    "ruby": ("Ruby",),
+    "sh": ("sh",),
+    "yaml": ("YAML",),
+}
+MODELINE_LANGUAGES.update(INTERPRETER_LANGUAGES)
+
+VIM_MODELINE = re.compile(
+    r"(?:^|\s)(?:vi|vim|ex)[<=>]?\d*:.*?\b(?:ft|filetype|syntax)=([\w+-]+)")
+EMACS_MODELINE = re.compile(r"-\*-(.*?)-\*-")
+
+
+def detect_by_name(name):
+    """
+    Detects the language of a file from a well known file name.
+
+    >>> detect_by_name("Dockerfile")
+    ('Dockerfile',)
+    >>> detect_by_name("script")
+    ()
+
+    :param name: The file name.
+    :return:     A tuple of the languages of the file.
+    """
+    return FILENAME_LANGUAGES.get(name, ())
+
+
+def _detect_by_shebang(line):
+    """
+    :param line: The first line of a file.
+    :return:     A tuple of the languages of the interpreter the shebang
+                 line refers to.
+    """
+    words = line[2:].split()
+    if not words:
+        return ()
+    interpreter = os.path.basename(words[0])
+    if interpreter == "env":
+        words = [word for word in words[1:]
+                 if not word.startswith("-") and "=" not in word]
+        if not words:
+            return ()
+        interpreter = os.path.basename(words[0])
+    interpreter = re.sub(r"[\d.]+$", "", interpreter).lower()
+    return INTERPRETER_LANGUAGES.get(interpreter, ())
+
+
+def _detect_by_modeline(line):
+    """
+    :param line: A line of a file.
+    :return:     A tuple of the languages set by a vim or emacs modeline
+                 in the line.
+    """
+    match = VIM_MODELINE.search(line)
+    if match:
+        return MODELINE_LANGUAGES.get(match.group(1).lower(), ())
+
+    match = EMACS_MODELINE.search(line)
+    if match:
+        variables = match.group(1).strip()
+        if ":" not in variables:
+            return MODELINE_LANGUAGES.get(variables.lower(), ())
+        for variable in variables.split(";"):
+            key, _, value = variable.partition(":")
+            if key.strip().lower() == "mode":
+                return MODELINE_LANGUAGES.get(value.strip().lower(), ())
+    return ()
+
+
+def detect_by_content(sample):
+    """
+    Detects the language of a file from a shebang line or a modeline at its
+    beginning.
+
+    >>> detect_by_content("#!/usr/bin/env python3\\nprint(1)\\n")
+    ('Python',)
+    >>> detect_by_content("#!/bin/bash -e\\n")
+    ('bash',)
+    >>> detect_by_content("# -*- mode: ruby -*-\\n")
+    ('Ruby',)
+    >>> detect_by_content("# vim: set ft=make:\\n")
+    ('Makefile',)
+    >>> detect_by_content("just text\\n")
+    ()
+
+    :param sample: The beginning of the file.
+    :return:       A tuple of the languages of the file.
+    """
+    lines = sample.splitlines()
+    if lines and lines[0].startswith("#!"):
+        languages = _detect_by_shebang(lines[0])
+        if languages:
+            return languages
+
+    for line in lines:
+        languages = _detect_by_modeline(line)
+        if languages:
+            return languages
+    return ()
+
+
+def detect_languages(file_path, sample_size=SAMPLE_SIZE):
+    """
+    Detects the language of a file whose extension is unknown from its name
+    or, failing that, from the first ``sample_size`` bytes of its content.
+
+    :param file_path:   The path of the file.
+    :param sample_size: The number of bytes read from the file.
+    :return:            A tuple of the languages of the file, empty if
+                        they cannot be detected.
+    """
+    languages = detect_by_name(os.path.basename(file_path))
+    if languages:
+        return languages
+
+    try:
+        with open(file_path, "rb") as file:
+            sample = file.read(sample_size)
+    except OSError:
+        return ()
+    if b"\0" in sample:
+        return ()
+    return detect_by_content(sample.decode("utf-8", "replace"))
+
+
+def detect_file_languages(file_paths, jobs=None, sample_size=SAMPLE_SIZE):
+    """
+    Detects the languages of many files, reading them concurrently.
+
+    :param file_paths:
+        A list of paths of files whose extension is unknown.
+    :param jobs:
+        The number of threads reading files, defaults to the number of
+        processors if ``None``.
+    :param sample_size:
+        The number of bytes read from each file.
+    :return:
+        An iterator of tuples of languages, in the order of ``file_paths``.
+    """
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+
+    if jobs <= 1 or len(file_paths) <= 1:
+        for file_path in file_paths:
+            yield detect_languages(file_path, sample_size)
+        return
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        yield from executor.map(
+            lambda file_path: detect_languages(file_path, sample_size),
+            file_paths)
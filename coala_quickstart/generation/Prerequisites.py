@@ -0,0 +1,182 @@
+import hashlib
+import json
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+from coala_quickstart.Profiling import count
+from coala_quickstart.generation.BearCache import CachedBear, get_cache_dir
+
+
+PREREQUISITES_FORMAT = 2
+
+
+def get_prerequisites_path():
+    """
+    :return: The path of the file the executables found in the ``PATH``
+             are kept in, in the directory given by ``get_cache_dir``.
+    """
+    return os.path.join(get_cache_dir(), "prerequisites.json")
+
+
+def get_path_fingerprint(path=None):
+    """
+    Hashes the directories of the ``PATH`` with their modification times,
+    which change whenever an executable is installed in or removed from
+    them.
+
+    :param path: The value of the ``PATH``, ``os.environ["PATH"]`` by
+                 default.
+    :return:     A hex digest.
+    """
+    if path is None:
+        path = os.environ.get("PATH", os.defpath)
+    entries = []
+    for directory in path.split(os.pathsep):
+        try:
+            mtime = os.stat(directory or os.curdir).st_mtime_ns
+        except OSError:
+            mtime = None
+        entries.append((directory, mtime))
+    return hashlib.sha1(json.dumps(entries).encode(
+        "utf-8", "surrogateescape")).hexdigest()
+
+
+def get_executable(bear):
+    """
+    :param bear: A bear class.
+    :return:     The executable of a linter bear, ``None`` for other bears.
+    """
+    get_executable = getattr(bear, "get_executable", None)
+    if get_executable is not None:
+        try:
+            return get_executable()
+        except Exception:
+            pass
+    return None
+
+
+def find_executable(executable):
+    """
+    :param executable: The name of an executable.
+    :return:           Whether the executable is found in the ``PATH``.
+    """
+    return shutil.which(executable) is not None
+
+
+def probe(bear):
+    """
+    Runs the prerequisite check of a bear.
+
+    :param bear: A bear class.
+    :return:     True if the prerequisites of the bear are satisfied, or a
+                 message saying what is missing.
+    """
+    if isinstance(bear, CachedBear) and bear.bear_class is None:
+        return "The bear cannot be imported."
+    try:
+        result = bear.check_prerequisites()
+    except Exception as exception:
+        return "{}: {}".format(type(exception).__name__, exception)
+    if result is True:
+        return True
+    return result or "The prerequisites of the bear are not satisfied."
+
+
+class PrerequisiteCache:
+    """
+    An on-disk cache of whether the executables of the bears are found in
+    the ``PATH``, so that the external tools of the bears are not looked for
+    again on every run. The cache is discarded as soon as the ``PATH``
+    fingerprint changes. The other checks of the bears, which may depend on
+    installed packages or the network, are run every time.
+    """
+
+    def __init__(self, path=None, fingerprint=None):
+        """
+        :param path:        The path of the cache file,
+                            ``get_prerequisites_path()`` by default.
+        :param fingerprint: The ``PATH`` fingerprint the results are valid
+                            for, ``get_path_fingerprint()`` by default.
+        """
+        self.path = path or get_prerequisites_path()
+        self.fingerprint = fingerprint or get_path_fingerprint()
+        self.executables = {}
+        self.load()
+
+    def load(self):
+        """
+        Reads the cache file, if it was written for the same ``PATH``
+        fingerprint.
+        """
+        try:
+            with open(self.path, "r") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return
+        if (isinstance(data, dict) and
+                data.get("format") == PREREQUISITES_FORMAT and
+                data.get("fingerprint") == self.fingerprint):
+            self.executables = dict(data.get("executables", {}))
+
+    def save(self):
+        """
+        Writes the cache file. The cache is only an optimization, so failing
+        to write it is not an error.
+        """
+        data = {"format": PREREQUISITES_FORMAT,
+                "fingerprint": self.fingerprint,
+                "executables": self.executables}
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp_path = "{}.{}".format(self.path, os.getpid())
+            with open(temp_path, "w") as file:
+                json.dump(data, file)
+            os.replace(temp_path, self.path)
+        except OSError:
+            pass
+
+
+def check_prerequisites(bears, jobs=None, cache=None):
+    """
+    Checks the prerequisites of bears concurrently in a thread pool. The
+    bears are imported to find their executables first, one after the other
+    in the calling thread since importing a bear swaps ``sys.stdout``. The
+    executables that are not cached are looked for in the ``PATH``, then
+    the checks of the bears whose executables are found are run.
+
+    :param bears: A collection of bear classes.
+    :param jobs:  The number of threads, or ``None`` to use the number of
+                  processors.
+    :param cache: A ``PrerequisiteCache`` the executables are taken from and
+                  saved to, which is loaded if ``None``.
+    :return:      A dict with the bears whose prerequisites are not
+                  satisfied as keys and the messages saying what is
+                  missing as values.
+    """
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    if cache is None:
+        cache = PrerequisiteCache()
+    bears = sorted(bears, key=lambda bear: bear.name)
+
+    executables = [get_executable(bear) for bear in bears]
+    unknown = sorted({executable for executable in executables
+                      if executable is not None} - cache.executables.keys())
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as executor:
+        cache.executables.update(
+            zip(unknown, executor.map(find_executable, unknown)))
+        missing = {bear: "{!r} is not installed.".format(executable)
+                   for bear, executable in zip(bears, executables)
+                   if executable is not None and
+                   not cache.executables[executable]}
+        probed = [bear for bear in bears if bear not in missing]
+        missing.update((bear, result) for bear, result
+                       in zip(probed, executor.map(probe, probed))
+                       if result is not True)
+
+    count("executables looked up", len(unknown))
+    count("prerequisites probed", len(probed))
+    if unknown:
+        cache.save()
+    return missing
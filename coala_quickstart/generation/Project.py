@@ -3,7 +3,9 @@ import operator
 from collections import defaultdict
 
 from coala_utils.string_processing.StringConverter import StringConverter
-from coala_utils.Extensions import exts
+from coala_quickstart.generation.ExtensionClassifier import classify
+from coala_quickstart.generation.LanguageDetection import detect_languages
+from coala_quickstart.generation.ProjectIndex import ProjectIndex
 
 
 def valid_path(path: StringConverter):
@@ -32,46 +34,161 @@ def valid_path(path: StringConverter):
     return path
 
 
-def language_percentage(file_paths):
+LANGUAGE_WEIGHTS = ("files", "bytes", "lines")
+
+LINE_BUFFER_SIZE = 64 * 1024
+
+
+def count_lines(file_path, buffer_size=LINE_BUFFER_SIZE):
+    """
+    Counts the lines of a file, reading it in chunks of bounded size so that
+    large files are never held in memory. A last line without a trailing
+    newline is counted as well.
+
+    >>> import tempfile
+    >>> with tempfile.NamedTemporaryFile("wb") as file:
+    ...     _ = file.write(b"first\\nsecond\\nthird")
+    ...     file.flush()
+    ...     count_lines(file.name, buffer_size=4)
+    3
+
+    :param file_path:   The path of the file.
+    :param buffer_size: The number of bytes read at once.
+    :return:            The number of lines, 0 if the file cannot be read.
     """
-    Computes the percentage composition of each language, with unknown
-    extensions tagged with the ``Unknown`` key.
+    lines = 0
+    last = b"\n"
+    try:
+        with open(file_path, "rb") as file:
+            for chunk in iter(lambda: file.read(buffer_size), b""):
+                lines += chunk.count(b"\n")
+                last = chunk[-1:]
+    except OSError:
+        return 0
+    return lines if last == b"\n" else lines + 1
+
+
+def _file_size(file_path):
+    """
+    :param file_path: The path of the file.
+    :return:          The size of the file in bytes, 0 if it cannot be
+                      read.
+    """
+    try:
+        return os.stat(file_path).st_size
+    except OSError:
+        return 0
+
 
-    :param file_paths: A list of file paths.
-    :return:           A dict with file name as key and the percentage
-                       of occurences as the value.
+WEIGHT_FUNCTIONS = {"files": lambda file_path: 1,
+                    "bytes": _file_size,
+                    "lines": count_lines}
+
+
+def iter_file_languages(file_paths):
     """
-    if file_paths:
-        delta = 100 / len(file_paths)
+    Classifies files by their extension as they are consumed. The languages
+    of files with unknown extensions are detected from their name and
+    content.
+
+    >>> list(iter_file_languages(iter(["/tmp/a.py", "/tmp/Makefile"])))
+    [('/tmp/a.py', ('Python',)), ('/tmp/Makefile', ('Makefile',))]
+
+    :param file_paths: An iterable of file paths or a ``ProjectIndex``.
+    :return:           An iterator of tuples of a file path and the tuple
+                       of languages it belongs to.
+    """
+    if isinstance(file_paths, ProjectIndex):
+        yield from file_paths.iter_languages()
+        return
 
-    results = defaultdict(lambda: 0)
     for file_path in file_paths:
-        ext = os.path.splitext(file_path)[1]
-        if ext in exts:
-            for lang in exts[ext]:
-                results[lang] += delta
+        languages = classify(os.path.basename(file_path))[1]
+        yield file_path, languages or detect_languages(file_path)
+
+
+def language_statistics(file_paths, weight="files"):
+    """
+    Accumulates the weight of each language in a single pass over the files,
+    which may be given as a generator.
+
+    :param file_paths:
+        An iterable of file paths or a ``ProjectIndex``. A ``ProjectIndex``
+        that does not keep its files must have been built with the ``weigh``
+        function of the ``weight``.
+    :param weight:
+        What each file contributes to its languages, one of
+        ``LANGUAGE_WEIGHTS``: 1 for ``files``, its size for ``bytes`` or its
+        number of lines for ``lines``.
+    :return:
+        A tuple of a dict with language name as key and the accumulated
+        weight as value, and the total weight of all files, including
+        files of unknown languages.
+    """
+    if weight == "files" and isinstance(file_paths, ProjectIndex):
+        return dict(file_paths.language_counts()), len(file_paths)
+    if isinstance(file_paths, ProjectIndex) and not file_paths.keep_files:
+        return file_paths.language_weights(WEIGHT_FUNCTIONS[weight])
+
+    weigh = WEIGHT_FUNCTIONS[weight]
+    totals = defaultdict(int)
+    total = 0
+    for file_path, languages in iter_file_languages(file_paths):
+        file_weight = weigh(file_path)
+        total += file_weight
+        for lang in languages:
+            totals[lang] += file_weight
+    return totals, total
+
+
+def language_percentage(file_paths, weight="files"):
+    """
+    Computes the percentage composition of each language. The percentages
+    of a ``ProjectIndex`` of a sample of the project are estimated by its
+    ``estimator``, which weighed the files as they were sampled.
+
+    :param file_paths: An iterable of file paths or a ``ProjectIndex``.
+    :param weight:     How files are weighted, one of ``LANGUAGE_WEIGHTS``.
+    :return:           A dict with language name as key and the percentage
+                       of the total weight, an ``EstimatedShare`` for an
+                       estimate, as the value.
+    """
+    if (isinstance(file_paths, ProjectIndex) and
+            file_paths.estimator is not None):
+        return dict(file_paths.estimator.shares())
+
+    totals, total = language_statistics(file_paths, weight)
+    delta = 100 / total if total else 0
+
+    results = defaultdict(lambda: 0)
+    for lang, lang_weight in totals.items():
+        results[lang] += delta * lang_weight
 
     return results
 
 
-def get_used_languages(file_paths):
+def get_used_languages(file_paths, weight="files"):
     """
     Identifies the most used languages in the user's project directory
     from the files matched from the given glob expression.
 
     :param file_paths:
         A list of absolute file paths in the user's project directory.
+    :param weight:
+        How files are weighted, one of ``LANGUAGE_WEIGHTS``.
     :return:
         A tuple iterator containing a language name as the first value
-        and percentage usage in the project as the second value.
+        and percentage usage in the project as the second value. The
+        percentages estimated from a sample are ``EstimatedShare`` objects
+        with the half width of their confidence interval as ``error``.
     """
     return sorted(
-        language_percentage(file_paths).items(),
+        language_percentage(file_paths, weight).items(),
         key=operator.itemgetter(1),
         reverse=True)
 
 
-def print_used_languages(printer, results):
+def print_used_languages(printer, results, weight="files"):
     """
     Prints the sorted list of used languages along with each language's
     percentage use.
@@ -80,11 +197,24 @@ def print_used_languages(printer, results):
         A ``ConsolePrinter`` object used for console interactions.
     :param results:
         A list of tuples containing a language name as the first value
-        and percentage usage in the project as the second value.
+        and percentage usage in the project as the second value. The
+        error bounds of estimated percentages are printed as well.
+    :param weight:
+        How the files were weighted, one of ``LANGUAGE_WEIGHTS``.
     """
-    printer.print(
-        "The following languages have been automatically detected:")
+    estimated = any(hasattr(percent, "error") for _, percent in results)
+    detected = "estimated from a sample" if estimated else "detected"
+    if weight == "files":
+        printer.print(
+            "The following languages have been automatically "
+            "{}:".format(detected))
+    else:
+        printer.print(
+            "The following languages have been automatically {} "
+            "(weighted by {}):".format(detected, weight))
     for lang, percent in results:
         formatted_line = "{:>25}: {:>2}%".format(lang, int(percent))
+        if hasattr(percent, "error"):
+            formatted_line += " +/- {:.1f}%".format(percent.error)
         printer.print(formatted_line, color="cyan")
     printer.print()
@@ -0,0 +1,719 @@
+import os
+import random
+import sys
+from array import array
+from collections import defaultdict
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+
+from coalib.parsing.Globbing import glob_escape
+
+from coala_quickstart.Profiling import count
+from coala_quickstart.generation.ExtensionClassifier import classify
+from coala_quickstart.generation.GitFiles import list_git_files
+from coala_quickstart.generation.IgnoreMatcher import (
+    IgnoreMatcher, GlobTracker)
+from coala_quickstart.generation.LanguageDetection import (
+    detect_file_languages, detect_languages)
+from coala_quickstart.generation.Walker import (
+    _scan_directory, walk_directory)
+
+
+class ProjectIndex(Sequence):
+    """
+    An index of the files in a project. It is built once and shared by all
+    quickstart stages, so each file is visited and has its extension
+    classified only once per run.
+
+    Directory names are interned and stored once, every file keeps only the
+    index of its directory, of its extension and of the first ignore glob
+    matching it in compact arrays. As a sequence, the index contains the
+    absolute paths of the files that are not ignored:
+
+    >>> index = ProjectIndex.from_paths(["/tmp/file.py", "/tmp/src/file.c",
+    ...                                  "/tmp/README"])
+    >>> list(index)
+    ['/tmp/file.py', '/tmp/src/file.c', '/tmp/README']
+    >>> index.extension(1)
+    '.c'
+    >>> sorted(index.language_counts().items())
+    [('C', 1), ('Python', 1)]
+
+    Without ``keep_files``, the memory used is bounded by the number of
+    directories and extensions instead of the number of files: only the
+    files whose extension belongs to no language are kept, to detect their
+    languages, the others are only counted per extension. Such an index
+    gives the aggregates the settings are generated from, but is not a
+    sequence of paths:
+
+    >>> index = ProjectIndex(keep_files=False)
+    >>> for name in ("a.py", "b.py", "Makefile"):
+    ...     index.add("src", name)
+    >>> len(index), dict(index.language_counts())
+    (3, {'Python': 2})
+    >>> list(index)
+    Traceback (most recent call last):
+      ...
+    TypeError: The index does not keep the paths of its files.
+    """
+
+    def __init__(self, project_dir="", ignore_globs=(), ignore_rules=None,
+                 keep_files=True, weigh=None):
+        """
+        :param project_dir:
+            The directory the stored paths are relative to.
+        :param ignore_globs:
+            A list of absolute glob expressions matching files to ignore.
+        :param ignore_rules:
+            A ``GitIgnore`` object deciding which files to ignore in
+            addition to the ``ignore_globs``.
+        :param keep_files:
+            Whether every file is kept, or only the files not ignored whose
+            extension belongs to no language.
+        :param weigh:
+            A function called with the full path of every file not ignored
+            that is not kept, whose results are summed per extension for
+            ``language_weights``. The files are counted if ``None``.
+        """
+        self.project_dir = project_dir
+        self.ignore_globs = tuple(ignore_globs)
+        self.ignore_rules = ignore_rules
+        self.keep_files = keep_files
+        self.weigh = weigh
+
+        self._dirs = []
+        self._dir_ids = {}
+        self._exts = []
+        self._ext_ids = {}
+        self._ext_languages = []
+
+        self._file_dirs = array("I")
+        self._file_names = []
+        self._file_exts = array("I")
+        self._file_ignores = array("i")
+        self._included = array("I")
+        self._detected = {}
+        # The numbers and the weights of the files not ignored that are
+        # only counted, by extension id.
+        self._aggregated = 0
+        self._ext_aggregates = defaultdict(int)
+        self._ext_weights = defaultdict(int)
+
+        self._matcher = IgnoreMatcher(self.ignore_globs)
+        self._prune_matcher = IgnoreMatcher(
+            glob for glob in self.ignore_globs if glob.endswith("**"))
+        self._tracker = GlobTracker(self.ignore_globs)
+        self.glob_evaluations = 0
+        self.pruned_dirs = 0
+        # The ``LanguageEstimator`` of an index of a sample of the project.
+        self.estimator = None
+
+    @classmethod
+    def scan(cls, project_dir, ignore_globs=(), jobs=1, detect=True,
+             ignore_rules=None, state=None, keep_files=True, weigh=None):
+        """
+        Builds the index of a project directory in a single ``os.scandir``
+        pass. Directories whose whole content is ignored are not entered.
+        The ignore files of the ``ignore_rules`` are loaded as their
+        directories are reached. The languages of files with unknown
+        extensions are detected from their names and contents, with more
+        than one job while the walk goes on.
+
+        With a ``state``, the directories and files that did not change
+        since the previous run are not read again.
+
+        :param project_dir:
+            Full path of the user's project directory.
+        :param ignore_globs:
+            A list of absolute glob expressions matching files to ignore.
+        :param jobs:
+            The number of threads listing directories and reading files
+            concurrently, or ``None`` to use the number of processors.
+        :param detect:
+            Whether to detect the languages of files with unknown
+            extensions.
+        :param ignore_rules:
+            A ``GitIgnore`` object deciding which files to ignore in
+            addition to the ``ignore_globs``.
+        :param state:
+            The ``ScanState`` of the previous run.
+        :param keep_files:
+            Whether every file is kept in the index, or only aggregates.
+        :param weigh:
+            The function weighing the files that are not kept.
+        :return:
+            A ``ProjectIndex`` object.
+        """
+        if jobs is None:
+            jobs = os.cpu_count() or 1
+        index = cls(project_dir, ignore_globs, ignore_rules, keep_files,
+                    weigh)
+        scan = state.scan_directory if state is not None else None
+
+        if not detect or jobs <= 1:
+            for directory, names in walk_directory(project_dir, jobs,
+                                                   index.is_pruned, scan):
+                index._add_directory(directory, names)
+            if detect:
+                index.detect_languages(jobs, state)
+            index._count_stats()
+            return index
+
+        # The files are read to detect their languages while the rest of
+        # the project is walked.
+        pending = []
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            for directory, names in walk_directory(project_dir, jobs,
+                                                   index.is_pruned, scan):
+                first_id = len(index._file_names)
+                index._add_directory(directory, names)
+                pending.extend(
+                    (file_id, executor.submit(detect_languages,
+                                              index.path(file_id)))
+                    for file_id in index._undetected(
+                        range(first_id, len(index._file_names)), state))
+            for file_id, future in pending:
+                index._set_detected(file_id, future.result(), state)
+        index._count_stats()
+        return index
+
+    @classmethod
+    def sample(cls, project_dir, estimator, ignore_globs=(),
+               ignore_rules=None, weigh=None, seed=None):
+        """
+        Builds the index of a random sample of the directories of a project,
+        until the ``estimator`` has sampled enough of them. The next
+        directory is picked at random among the ones found so far, so every
+        directory is reached after its parent and its ignore file is loaded
+        before the files below it are added.
+
+        Directories near the top of the project are more likely to be
+        picked than deeper ones, while the ``estimator`` treats them as a
+        uniform random sample, so its confidence intervals are approximate.
+
+        :param project_dir:
+            Full path of the user's project directory.
+        :param estimator:
+            The ``LanguageEstimator`` the languages of the files of each
+            sampled directory are added to. It is kept as the ``estimator``
+            of the index.
+        :param ignore_globs:
+            A list of absolute glob expressions matching files to ignore.
+        :param ignore_rules:
+            A ``GitIgnore`` object deciding which files to ignore in
+            addition to the ``ignore_globs``.
+        :param weigh:
+            A function giving the weight of a file from its full path. The
+            files are counted if ``None``.
+        :param seed:
+            The seed of the random choice of the directories.
+        :return:
+            A ``ProjectIndex`` object of the files of the sampled
+            directories.
+        """
+        index = cls(project_dir, ignore_globs, ignore_rules)
+        index.estimator = estimator
+        rng = random.Random(seed)
+
+        pending = [""]
+        while pending and not estimator.done:
+            position = rng.randrange(len(pending))
+            pending[position], pending[-1] = pending[-1], pending[position]
+            directory = pending.pop()
+            names, subdirs = _scan_directory(project_dir, directory)
+
+            # The ignore file of the directory is loaded when its files are
+            # added, before its subdirectories are checked against it.
+            first_id = len(index._file_names)
+            index._add_directory(directory, names)
+            pending.extend(subdir for subdir, path in subdirs
+                           if not index.is_pruned(subdir, path))
+            file_ids = range(first_id, len(index._file_names))
+            unknown = index._undetected(file_ids)
+            detected = detect_file_languages(
+                [index.path(file_id) for file_id in unknown], 1)
+            for file_id, languages in zip(unknown, detected):
+                index._set_detected(file_id, languages)
+
+            weights = defaultdict(int)
+            total = files = 0
+            for file_id in file_ids:
+                if index._file_ignores[file_id] != -1:
+                    continue
+                weight = 1 if weigh is None else weigh(index.path(file_id))
+                files += 1
+                total += weight
+                for lang in index.languages(file_id):
+                    weights[lang] += weight
+            estimator.add_directory(weights, total, files)
+
+        estimator.finish(exhaustive=not pending)
+        index._count_stats()
+        return index
+
+    def _add_directory(self, directory, names):
+        """
+        Adds the files of a walked directory to the index, after loading
+        the ignore file of the directory.
+
+        :param directory: The directory, relative to the ``project_dir``.
+        :param names:     The names of the files in the directory.
+        """
+        if self.ignore_rules is not None:
+            self.ignore_rules.load_directory(directory, names)
+        for name in names:
+            self.add(directory, name)
+
+    @classmethod
+    def from_git(cls, project_dir, ignore_globs=(), jobs=1, detect=True,
+                 ignore_rules=None, state=None, keep_files=True, weigh=None):
+        """
+        Builds the index of a project directory in a git work tree from the
+        file list of the git index, without walking the directory.
+
+        The ``ignore_rules`` are still applied, to files that are tracked
+        although they are ignored, and checked against the untracked paths
+        git ignores, so that the same globs are reported as matched as with
+        ``scan``.
+
+        :param project_dir:
+            Full path of the user's project directory.
+        :param ignore_globs:
+            A list of absolute glob expressions matching files to ignore.
+        :param jobs:
+            The number of threads reading files to detect their languages,
+            or ``None`` to use the number of processors.
+        :param detect:
+            Whether to detect the languages of files with unknown
+            extensions.
+        :param ignore_rules:
+            A ``GitIgnore`` object deciding which files to ignore in
+            addition to the ``ignore_globs``.
+        :param state:
+            The ``ScanState`` of the previous run, which keeps the languages
+            detected in files that did not change.
+        :param keep_files:
+            Whether every file is kept in the index, or only aggregates.
+        :param weigh:
+            The function weighing the files that are not kept.
+        :return:
+            A ``ProjectIndex`` object, or ``None`` if the project is not in
+            a git work tree, git is not available or no file is listed.
+        """
+        listing = list_git_files(project_dir)
+        if not listing or not listing[0]:
+            return None
+        file_paths, ignored_paths = listing
+
+        index = cls(project_dir, ignore_globs, ignore_rules, keep_files,
+                    weigh)
+        ignored_dirs = {"": False}
+
+        def is_ignored_dir(directory):
+            if directory not in ignored_dirs:
+                ignored_dirs[directory] = (
+                    is_ignored_dir(os.path.dirname(directory)) or
+                    index.is_pruned(directory))
+            return ignored_dirs[directory]
+
+        if ignore_rules is not None:
+            for file_path in file_paths:
+                directory, name = os.path.split(file_path)
+                if name == ignore_rules.filename:
+                    ignore_rules.load_directory(directory, [name])
+            for path in ignored_paths:
+                is_dir = path.endswith(os.sep)
+                path = path.rstrip(os.sep)
+                if not is_ignored_dir(os.path.dirname(path)):
+                    if is_dir:
+                        is_ignored_dir(path)
+                    else:
+                        index._is_ignored_by_rules(path)
+
+        for file_path in file_paths:
+            directory, name = os.path.split(file_path)
+            if not is_ignored_dir(directory):
+                index.add(directory, name)
+
+        if detect:
+            index.detect_languages(jobs, state)
+        index._count_stats()
+        return index
+
+    @classmethod
+    def from_paths(cls, file_paths, detect=True):
+        """
+        Builds the index from a list of file paths that has already been
+        collected.
+
+        :param file_paths: A list of file paths.
+        :param detect:     Whether to detect the languages of files with
+                           unknown extensions.
+        :return:           A ``ProjectIndex`` object.
+        """
+        if isinstance(file_paths, cls):
+            return file_paths
+
+        index = cls()
+        for file_path in file_paths:
+            directory, name = os.path.split(file_path)
+            index.add(directory, name, file_path)
+
+        if detect:
+            index.detect_languages(jobs=1)
+        return index
+
+    def add(self, directory, name, path=None):
+        """
+        Adds a file to the index.
+
+        :param directory:
+            The directory of the file, relative to the ``project_dir``.
+        :param name:
+            The file name.
+        :param path:
+            The full path of the file, if it is already known.
+        """
+        dir_id = self._dir_ids.get(directory)
+        if dir_id is None:
+            dir_id = self._dir_ids[directory] = len(self._dirs)
+            self._dirs.append(sys.intern(directory))
+
+        ext, languages = classify(name)
+        ext_id = self._ext_ids.get(ext)
+        if ext_id is None:
+            ext_id = self._ext_ids[ext] = len(self._exts)
+            self._exts.append(ext)
+            self._ext_languages.append(languages)
+
+        ignore_id = None
+        if self._matcher:
+            if path is None:
+                path = os.path.join(self.project_dir, directory, name)
+            ignore_id = self._matcher.match(path)
+            self.glob_evaluations += 1
+            if ignore_id is not None and self._tracker:
+                self._tracker.add(path)
+                self.glob_evaluations += 1
+        if ignore_id is None and self._is_ignored_by_rules(
+                os.path.join(directory, name)):
+            # Files ignored by the rules instead of a glob are marked with
+            # -2, ``ignore_glob`` gives ``None`` for them.
+            ignore_id = -2
+
+        if not self.keep_files:
+            if ignore_id is not None:
+                return
+            if self._ext_languages[ext_id]:
+                self._aggregated += 1
+                self._ext_aggregates[ext_id] += 1
+                if self.weigh is not None:
+                    if path is None:
+                        path = os.path.join(self.project_dir, directory,
+                                            name)
+                    self._ext_weights[ext_id] += self.weigh(path)
+                return
+
+        file_id = len(self._file_names)
+        self._file_dirs.append(dir_id)
+        self._file_names.append(sys.intern(name))
+        self._file_exts.append(ext_id)
+        if ignore_id is None:
+            self._file_ignores.append(-1)
+            self._included.append(file_id)
+        else:
+            self._file_ignores.append(ignore_id)
+
+    def is_pruned(self, directory, path=None):
+        """
+        Checks whether every file below a directory is ignored, which is the
+        case if the directory path followed by a separator is matched by an
+        ignore glob ending in ``**``. The globs covering the directory are
+        recorded as matched.
+
+        :param directory:
+            The directory, relative to the ``project_dir``.
+        :param path:
+            The full path of the directory, if it is already known.
+        :return:
+            True if the directory does not need to be walked.
+        """
+        if self._is_ignored_by_rules(directory, True):
+            self.pruned_dirs += 1
+            return True
+        if not self._prune_matcher:
+            return False
+        if path is None:
+            path = os.path.join(self.project_dir, directory)
+        path = os.path.join(path, "")
+        self.glob_evaluations += 1
+        if self._prune_matcher.match(path) is None:
+            return False
+        if self._tracker:
+            self._tracker.add(path)
+            self.glob_evaluations += 1
+        self.pruned_dirs += 1
+        return True
+
+    def _count_stats(self):
+        """
+        Adds the numbers of files, pruned directories and glob evaluations
+        of the index to the counters of the current stage.
+        """
+        count("files scanned", len(self._file_names) + self._aggregated)
+        count("directories pruned", self.pruned_dirs)
+        count("glob evaluations", self.glob_evaluations)
+
+    def _is_ignored_by_rules(self, path, is_dir=False):
+        """
+        Checks a path against the ``ignore_rules``, which record the rule
+        ignoring the path.
+
+        :param path:   A path relative to the ``project_dir``, whose
+                       directories are not ignored.
+        :param is_dir: Whether the path is a directory.
+        :return:       True if a rule ignores the path.
+        """
+        if self.ignore_rules is None:
+            return False
+        rule = self.ignore_rules.match(path, is_dir)
+        self.glob_evaluations += 1
+        return rule is not None and not rule.negate
+
+    @property
+    def matched_globs(self):
+        """
+        :return: The set of the ``ignore_globs`` matching a path of the
+                 project, and of the absolute globs equivalent to the
+                 ``ignore_rules`` that ignored a path.
+        """
+        matched_globs = set(self._tracker.matched)
+        if self.ignore_rules is not None:
+            escaped_project_dir = glob_escape(self.project_dir)
+            matched_globs.update(
+                os.path.join(escaped_project_dir, glob)
+                for glob in self.ignore_rules.matched_globs())
+        return matched_globs
+
+    def detect_languages(self, jobs=None, state=None):
+        """
+        Detects the languages of the files not ignored whose extension
+        belongs to no language, reading only the beginning of each of them.
+
+        :param jobs:  The number of threads reading files, or ``None`` to
+                      use the number of processors.
+        :param state: The ``ScanState`` of the previous run. Files that did
+                      not change since are not read again, the languages
+                      of the others are recorded in it.
+        """
+        unknown = self._undetected(self._included, state)
+        detected = detect_file_languages([self.path(file_id)
+                                          for file_id in unknown], jobs)
+        for file_id, languages in zip(unknown, detected):
+            self._set_detected(file_id, languages, state)
+
+    def _undetected(self, file_ids, state=None):
+        """
+        Finds the files whose languages have to be detected from their
+        content. The languages the ``state`` knows are taken from it.
+
+        :param file_ids: The ids of the files to look at.
+        :param state:    The ``ScanState`` of the previous run.
+        :return:         A list of the ids of the files not ignored, whose
+                         extension belongs to no language and whose
+                         languages are not known yet.
+        """
+        undetected = []
+        for file_id in file_ids:
+            if (self._file_ignores[file_id] != -1 or
+                    self._ext_languages[self._file_exts[file_id]] or
+                    file_id in self._detected):
+                continue
+            languages = None
+            if state is not None:
+                languages = state.known_languages(self.relative_path(file_id))
+            if languages is None:
+                undetected.append(file_id)
+            elif languages:
+                self._detected[file_id] = tuple(languages)
+        return undetected
+
+    def _set_detected(self, file_id, languages, state=None):
+        """
+        Sets the languages detected in a file.
+
+        :param file_id:   The position of the file in the whole index.
+        :param languages: A tuple of the languages of the file.
+        :param state:     The ``ScanState`` to record the languages in.
+        """
+        if languages:
+            self._detected[file_id] = languages
+        if state is not None:
+            state.record_languages(self.relative_path(file_id), languages)
+
+    def _require_files(self):
+        """
+        Raises a ``TypeError`` if the index does not keep every file.
+        """
+        if not self.keep_files:
+            raise TypeError("The index does not keep the paths of its files.")
+
+    def __len__(self):
+        return len(self._included) + self._aggregated
+
+    def __getitem__(self, position):
+        self._require_files()
+        return self.path(self._included[position])
+
+    def __iter__(self):
+        self._require_files()
+        for file_id in self._included:
+            yield self.path(file_id)
+
+    def path(self, file_id):
+        """
+        :param file_id: The position of the file in the whole index,
+                        including ignored files.
+        :return:        The full path of the file.
+        """
+        return os.path.join(self.project_dir,
+                            self._dirs[self._file_dirs[file_id]],
+                            self._file_names[file_id])
+
+    def relative_path(self, file_id):
+        """
+        :param file_id: The position of the file in the whole index.
+        :return:        The path of the file relative to the
+                        ``project_dir``.
+        """
+        return os.path.join(self._dirs[self._file_dirs[file_id]],
+                            self._file_names[file_id])
+
+    def extension(self, file_id):
+        """
+        :param file_id: The position of the file in the whole index.
+        :return:        The extension of the file.
+        """
+        return self._exts[self._file_exts[file_id]]
+
+    def languages(self, file_id):
+        """
+        :param file_id: The position of the file in the whole index.
+        :return:        A tuple of the languages the file's extension
+                        belongs to, or that were detected from its
+                        content.
+        """
+        return (self._detected.get(file_id) or
+                self._ext_languages[self._file_exts[file_id]])
+
+    def ignore_glob(self, file_id):
+        """
+        :param file_id: The position of the file in the whole index.
+        :return:        The first ignore glob matching the file, or ``None``
+                        if the file is not ignored.
+        """
+        ignore_id = self._file_ignores[file_id]
+        return None if ignore_id < 0 else self.ignore_globs[ignore_id]
+
+    def iter_languages(self):
+        """
+        :return: An iterator of tuples of the full path of each file not
+                 ignored and the tuple of languages it belongs to.
+        """
+        self._require_files()
+        for file_id in self._included:
+            yield self.path(file_id), self.languages(file_id)
+
+    def _ext_counts(self):
+        """
+        :return: A dict with extension ids as keys and the number of files
+                 not ignored with that extension as values.
+        """
+        counts = defaultdict(int, self._ext_aggregates)
+        for file_id in self._included:
+            counts[self._file_exts[file_id]] += 1
+        return counts
+
+    def language_counts(self):
+        """
+        :return: A dict with language name as key and the number of files
+                 not ignored belonging to that language as value.
+        """
+        counts = defaultdict(int)
+        for ext_id, count in self._ext_counts().items():
+            for lang in self._ext_languages[ext_id]:
+                counts[lang] += count
+        for languages in self._detected.values():
+            for lang in languages:
+                counts[lang] += 1
+        return counts
+
+    def language_weights(self, weigh):
+        """
+        Sums the weights of the files per language, for an index that does
+        not keep every file. The files that are only counted were weighed
+        by the ``weigh`` function of the index as they were added, or
+        count for 1 if it has none.
+
+        :param weigh: The function weighing the kept files, given their
+                      full path.
+        :return:      A tuple of a dict with language name as key and the
+                      accumulated weight as value, and the total weight of
+                      all files, including files of unknown languages.
+        """
+        totals = defaultdict(int)
+        total = 0
+        ext_weights = (self._ext_aggregates if self.weigh is None
+                       else self._ext_weights)
+        for ext_id, weight in ext_weights.items():
+            total += weight
+            for lang in self._ext_languages[ext_id]:
+                totals[lang] += weight
+        for file_id in self._included:
+            weight = weigh(self.path(file_id))
+            total += weight
+            for lang in self.languages(file_id):
+                totals[lang] += weight
+        return totals, total
+
+    def files_by_language(self):
+        """
+        :return: A dict with lowercase language name as keys and the set of
+                 files not ignored belonging to that language as values.
+                 The ``all`` key holds every file of a known language.
+        """
+        self._require_files()
+        lang_files = defaultdict(lambda: set())
+        for file_id in self._included:
+            languages = self.languages(file_id)
+            if languages:
+                path = self.path(file_id)
+                for lang in languages:
+                    lang_files[lang.lower()].add(path)
+                lang_files["all"].add(path)
+        return lang_files
+
+    def extensions_by_language(self):
+        """
+        :return: A dict with lowercase language name as keys and the set of
+                 extensions of files not ignored belonging to that language
+                 as values.
+        """
+        extset = defaultdict(lambda: set())
+        for ext_id in self._ext_counts():
+            for lang in self._ext_languages[ext_id]:
+                extset[lang.lower()].add(self._exts[ext_id])
+        return extset
+
+    def detected_files_by_language(self):
+        """
+        :return: A dict with lowercase language name as keys and the set of
+                 paths, relative to the ``project_dir``, of the files whose
+                 language was detected from their name or content as values.
+        """
+        detected = defaultdict(lambda: set())
+        for file_id, languages in self._detected.items():
+            path = self.relative_path(file_id)
+            for lang in languages:
+                detected[lang.lower()].add(path)
+        return detected
@@ -0,0 +1,299 @@
+import hashlib
+import json
+import os
+import time
+
+from coala_quickstart.generation import Walker
+from coala_quickstart.generation.BearCache import get_cache_dir
+
+
+STATE_FORMAT = 1
+
+# Listings of directories modified less than this many seconds before they
+# were read are not kept, as the directory could still change within the
+# resolution of its modification time without the time changing.
+RACY_SECONDS = 2
+
+
+def get_state_path(project_dir):
+    """
+    :param project_dir: Full path of the user's project directory.
+    :return:            The path of the state file of the project, which
+                        lives in the ``state`` directory of the quickstart
+                        caches and is named after a hash of the path.
+    """
+    digest = hashlib.sha1(
+        os.path.abspath(project_dir).encode("utf-8", "surrogateescape"))
+    return os.path.join(get_cache_dir(), "state",
+                        digest.hexdigest() + ".json")
+
+
+def section_digest(section):
+    """
+    Hashes the settings a section was generated with, before any missing
+    setting was filled in.
+
+    :param section: A ``Section`` object.
+    :return:        A hex digest of the keys and values of the section.
+    """
+    contents = sorted((key, str(setting.value))
+                      for key, setting in section.contents.items())
+    return hashlib.sha1(json.dumps(contents).encode("utf-8")).hexdigest()
+
+
+def file_digest(path):
+    """
+    :param path: The path of a file.
+    :return:     A hex digest of the content of the file, ``None`` if it
+                 cannot be read.
+    """
+    try:
+        with open(path, "rb") as file:
+            return hashlib.sha1(file.read()).hexdigest()
+    except OSError:
+        return None
+
+
+class ScanState:
+    """
+    The state of the previous quickstart run on a project, used to only do
+    again what changed since then:
+
+    - The listing of every directory is kept with its modification time, so
+      only directories whose entries changed are listed again.
+    - The languages detected from the content of files with unknown
+      extensions are kept with the modification time of each file.
+    - The settings of every generated section are kept with a digest of the
+      section they were filled in for, so unchanged sections are not asked
+      for again.
+    - The path and a digest of the coafile written, so it is not written
+      again while it still exists unchanged and no section changed.
+    """
+
+    def __init__(self, project_dir, path=None):
+        """
+        :param project_dir: Full path of the user's project directory.
+        :param path:        The path of the state file,
+                            ``get_state_path(project_dir)`` by default.
+        """
+        self.project_dir = project_dir
+        self.path = path or get_state_path(project_dir)
+        self.dirs = {}
+        self.detected = {}
+        self.language_counts = {}
+        self.sections = {}
+        self.coafile = None
+        self.loaded = False
+
+        self._scanned_dirs = {}
+        self._detected_now = {}
+        self._sections_now = {}
+        self.changed_dirs = []
+        self.changed_sections = []
+        self.load()
+
+    def load(self):
+        """
+        Reads the state file, if it exists and was written for the same
+        project in the same format.
+        """
+        try:
+            with open(self.path, "r") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return
+
+        if (not isinstance(data, dict) or
+                data.get("format") != STATE_FORMAT or
+                data.get("project_dir") != self.project_dir):
+            return
+
+        self.dirs = data.get("dirs", {})
+        self.detected = data.get("detected", {})
+        self.language_counts = data.get("language_counts", {})
+        self.sections = data.get("sections", {})
+        self.coafile = data.get("coafile")
+        self.loaded = True
+
+    def scan_directory(self, root, directory):
+        """
+        Lists a directory like ``Walker._scan_directory``, reusing the
+        listing of the previous run if the modification time of the
+        directory did not change.
+
+        :param root:      The directory the walk started from.
+        :param directory: The directory to list, relative to ``root``.
+        :return:          A tuple of the sorted file names and a sorted list
+                          of tuples of the relative and full path of each
+                          subdirectory.
+        """
+        path = os.path.join(root, directory)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return [], []
+
+        entry = self.dirs.get(directory)
+        if entry is not None and entry[0] == mtime:
+            files, subdir_names = entry[1], entry[2]
+        else:
+            self.changed_dirs.append(directory)
+            files, subdirs = Walker._scan_directory(root, directory)
+            subdir_names = [os.path.basename(subdir)
+                            for subdir, _ in subdirs]
+            if time.time() - mtime / 1e9 < RACY_SECONDS:
+                mtime = None
+        self._scanned_dirs[directory] = [mtime, files, subdir_names]
+
+        return files, [(os.path.join(directory, name),
+                        os.path.join(path, name))
+                       for name in subdir_names]
+
+    def known_languages(self, file_path):
+        """
+        :param file_path: The path of a file, relative to the project
+                          directory.
+        :return:          The list of languages detected in the previous
+                          run, or ``None`` if the file changed since or was
+                          not looked at.
+        """
+        entry = self.detected.get(file_path)
+        mtime = self._file_mtime(file_path)
+        if entry is None or mtime is None or entry[0] != mtime:
+            return None
+        self._detected_now[file_path] = entry
+        return entry[1]
+
+    def record_languages(self, file_path, languages):
+        """
+        Records the languages detected in a file.
+
+        :param file_path: The path of the file, relative to the project
+                          directory.
+        :param languages: A sequence of the languages of the file.
+        """
+        mtime = self._file_mtime(file_path)
+        if mtime is not None:
+            self._detected_now[file_path] = [mtime, list(languages)]
+
+    def _file_mtime(self, file_path):
+        """
+        :param file_path: A path relative to the project directory.
+        :return:          The modification time of the file in nanoseconds,
+                          ``None`` if it cannot be read or is too recent to
+                          be relied on.
+        """
+        try:
+            mtime = os.stat(os.path.join(self.project_dir,
+                                         file_path)).st_mtime_ns
+        except OSError:
+            return None
+        return None if time.time() - mtime / 1e9 < RACY_SECONDS else mtime
+
+    def record_index(self, project_index):
+        """
+        Records the number of files of each language of the project.
+
+        :param project_index: The ``ProjectIndex`` of the project.
+        :return:              A sorted list of the languages whose number
+                              of files changed since the previous run.
+        """
+        counts = dict(project_index.language_counts())
+        changed = sorted(
+            lang for lang in set(counts) | set(self.language_counts)
+            if counts.get(lang) != self.language_counts.get(lang))
+        self.language_counts = counts
+        return changed
+
+    def restore_section(self, name, section, digest):
+        """
+        Copies the settings filled in for a section in the previous run to
+        the section, if it was generated with the same digest.
+
+        :param name:    The name of the section.
+        :param section: The ``Section`` object.
+        :param digest:  The ``section_digest`` of the section.
+        :return:        True if the settings were restored.
+        """
+        entry = self.sections.get(name)
+        if entry is None or entry["digest"] != digest:
+            return False
+        for key, value in entry["settings"]:
+            if key not in section.contents:
+                section[key] = value
+        return True
+
+    def record_section(self, name, section, digest):
+        """
+        Records the settings of a section after the missing ones were
+        filled in. The section is marked as changed if it differs from the
+        previous run.
+
+        :param name:    The name of the section.
+        :param section: The ``Section`` object.
+        :param digest:  The ``section_digest`` of the section before it was
+                        filled in.
+        """
+        entry = {"digest": digest,
+                 "settings": [[key, str(setting.value)] for key, setting
+                              in section.contents.items()]}
+        if self.sections.get(name) != entry:
+            self.changed_sections.append(name)
+        self._sections_now[name] = entry
+
+    def finish_sections(self):
+        """
+        Marks the sections of the previous run that were not generated
+        again as changed, and replaces the recorded sections with the ones
+        of this run.
+        """
+        self.changed_sections.extend(
+            sorted(set(self.sections) - set(self._sections_now)))
+        self.sections = self._sections_now
+        self._sections_now = {}
+
+    def record_coafile(self, path):
+        """
+        Records the coafile written in this run.
+
+        :param path: The full path of the written file.
+        """
+        self.coafile = {"path": path, "digest": file_digest(path)}
+
+    def coafile_is_current(self):
+        """
+        :return: True if the coafile written in the previous run still
+                 exists unchanged.
+        """
+        if not self.coafile or self.coafile.get("digest") is None:
+            return False
+        return file_digest(self.coafile["path"]) == self.coafile["digest"]
+
+    def save(self):
+        """
+        Writes the state file with what was seen in this run. Directories
+        that were not listed in this run, because they were removed or
+        ignored, are kept unless they no longer exist. Only the languages
+        of the files looked at in this run are kept. The state is only an
+        optimization, so failing to write it is not an error.
+        """
+        dirs = {directory: entry for directory, entry in self.dirs.items()
+                if os.path.isdir(os.path.join(self.project_dir, directory))}
+        dirs.update(self._scanned_dirs)
+        data = {
+            "format": STATE_FORMAT,
+            "project_dir": self.project_dir,
+            "dirs": {directory: entry for directory, entry in dirs.items()
+                     if entry[0] is not None},
+            "detected": self._detected_now,
+            "language_counts": self.language_counts,
+            "sections": self.sections,
+            "coafile": self.coafile}
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp_path = "{}.{}".format(self.path, os.getpid())
+            with open(temp_path, "w") as file:
+                json.dump(data, file)
+            os.replace(temp_path, self.path)
+        except OSError:
+            pass
@@ -2,19 +2,21 @@ import os
 from collections import OrderedDict
 from datetime import date
 
-from pyprint.NullPrinter import NullPrinter
 from pyprint.ConsolePrinter import ConsolePrinter
 from coalib.output.ConsoleInteraction import acquire_settings
 from coalib.settings.SectionFilling import fill_settings
 from coalib.output.printers.LogPrinter import LogPrinter
-from coala_quickstart.generation.Utilities import (
-    split_by_language, get_extensions)
+from coala_quickstart.Profiling import count, stage
+from coala_quickstart.generation.BearDependencies import BearDependencyGraph
+from coala_quickstart.generation.ProjectIndex import ProjectIndex
+from coala_quickstart.generation.ScanState import section_digest
+from coala_quickstart.generation.Utilities import get_extensions
 from coalib.settings.Section import Section
 from coalib.output.ConfWriter import ConfWriter
-from coalib.collecting.Collectors import collect_files
+from coalib.parsing.Globbing import glob_escape
 
 
-def generate_section(section_name, extensions_used, bears):
+def generate_section(section_name, extensions_used, bears, file_paths=()):
     """
     Generates a section for a particular language (or default).
 
@@ -24,18 +26,27 @@ def generate_section(section_name, extensions_used, bears):
         A list of extensions associated with this section.
     :param bears:
         A list of bear classes.
+    :param file_paths:
+        A list of paths relative to the project directory of files
+        associated with this section that are not matched by their
+        extension.
     :return:
         A ``Section`` object containing the section.
     """
     section = Section(section_name, None)
 
-    section["bears"] = ", ".join(bear.name for bear in bears)
-    section["files"] = ", ".join("**" + ext for ext in set(extensions_used))
+    # The names are sorted so that the same section is generated on every
+    # run, which the incremental mode relies on.
+    section["bears"] = ", ".join(sorted(bear.name for bear in bears))
+    section["files"] = ", ".join(
+        ["**" + ext for ext in sorted(set(extensions_used))] +
+        [glob_escape(path) for path in sorted(set(file_paths))])
 
     return section
 
 
-def generate_ignore_field(project_dir, languages, extset, ignore_globs):
+def generate_ignore_field(project_dir, languages, extset, ignore_globs,
+                          project_index=None):
     """
     Generate the ignore field for the ``default`` section.
 
@@ -46,67 +57,149 @@ def generate_ignore_field(project_dir, languages, extset, ignore_globs):
     :param extset:
         A dict with language name as key and a set of extensions as
         value. This includes only those extensions used by the project.
+    :param ignore_globs:
+        The list of ignore glob expressions.
+    :param project_index:
+        The ``ProjectIndex`` of the project. The project directory is
+        scanned again if it is not given or was built with other globs
+        than the ones given or matched by its ignore rules.
     :return:
         A comma-separated string containing the globs to ignore.
     """
-    null_printer = LogPrinter(NullPrinter())
-
-    all_files = set(collect_files(
-        "**",
-        null_printer,
-        ignored_file_paths=ignore_globs))
+    escaped_project_dir = glob_escape(project_dir)
+    ignore_path_globs = [os.path.join(escaped_project_dir, glob)
+                         for glob in ignore_globs]
+    if (project_index is None or
+            not set(ignore_path_globs) <= set(project_index.ignore_globs) |
+            project_index.matched_globs):
+        ignore_rules = (project_index.ignore_rules
+                        if project_index is not None else None)
+        # Only the matched globs are needed, not the files.
+        project_index = ProjectIndex.scan(project_dir, ignore_path_globs,
+                                          detect=False,
+                                          ignore_rules=ignore_rules,
+                                          keep_files=False)
+    matched_globs = project_index.matched_globs
 
-    ignores = []
-    for glob in ignore_globs:
-        gitignore_files = {file
-                           for file in collect_files([glob], null_printer)}
-        if not all_files.isdisjoint(gitignore_files):
-            ignores.append(os.path.relpath(glob, project_dir))
+    ignores = [os.path.relpath(os.path.join(project_dir, glob), project_dir)
+               for glob, path_glob in zip(ignore_globs, ignore_path_globs)
+               if path_glob in matched_globs]
 
     return ", ".join(ignores)
 
 
-def generate_settings(project_dir, project_files, ignore_globs, relevant_bears):
+def apply_answers(settings, section_bears, answers):
+    """
+    Sets the settings given by an answers file in the sections, so that
+    they are not asked for.
+
+    :param settings:
+        A dict with section name as key and a ``Section`` object as value.
+    :param section_bears:
+        A dict with section name as key and the bear classes of the section
+        as value.
+    :param answers:
+        An ``Answers`` object.
+    """
+    needed = {name: () for name in settings}
+    if answers.common:
+        # The values given for every bear are only set in the sections
+        # whose bears, or their dependencies, need them.
+        graph = BearDependencyGraph(
+            {bear for bears in section_bears.values() for bear in bears})
+        needed = {name: {setting for bear in section_bears[name]
+                         for setting in graph.non_optional_settings(bear)}
+                  for name in settings}
+    for name, section in settings.items():
+        count("settings answered", len(answers.apply(
+            section, section_bears[name], needed[name])))
+
+
+def generate_settings(project_dir, project_files, ignore_globs, relevant_bears,
+                      state=None, answers=None):
     """
-    Generates the settings for the given project.
+    Generates the settings for the given project. Only the languages,
+    extensions and matched ignore globs of the project files are used, not
+    the files themselves.
+
+    The settings given by the ``answers`` are set before the missing ones
+    are asked for.
+
+    With a ``state``, the settings filled in for sections that are
+    generated the same way as in the previous run are taken from it instead
+    of being asked for again, and the sections that changed are recorded.
 
     :param project_dir:
         Full path of the user's project directory.
     :param project_files:
-        A list of file paths matched in the user's project directory.
+        A ``ProjectIndex`` or a list of file paths matched in the user's
+        project directory.
     :param ignore_globs:
         The list of ignore glob expressions.
     :param relevant_bears:
         A dict with language name as key and bear classes as value.
+    :param state:
+        The ``ScanState`` of the previous run.
+    :param answers:
+        An ``Answers`` object with the values of settings given in advance.
     :return:
         A dict with section name as key and a ``Section`` object as value.
     """
     lang_map = {lang.lower(): lang for lang in relevant_bears}
-    lang_files = split_by_language(project_files)
-    extset = get_extensions(project_files)
+    project_index = ProjectIndex.from_paths(project_files)
+    languages = [lang.lower() for lang in project_index.language_counts()]
+    if languages:
+        languages.append("all")
+    extset = get_extensions(project_index)
+    detected_files = project_index.detected_files_by_language()
 
     settings = OrderedDict()
+    section_bears = {"default": relevant_bears[lang_map["all"]]}
 
     settings["default"] = generate_section(
         "default",
-        [ext for lang in lang_files for ext in extset[lang]],
-        relevant_bears[lang_map["all"]])
+        [ext for lang in languages for ext in extset[lang]],
+        relevant_bears[lang_map["all"]],
+        [path for lang in languages for path in detected_files[lang]])
 
-    ignored_files = generate_ignore_field(project_dir, lang_files.keys(),
-                                          extset, ignore_globs)
+    with stage("generate_ignore_field"):
+        ignored_files = generate_ignore_field(project_dir, languages,
+                                              extset, ignore_globs,
+                                              project_index)
 
     if ignored_files:
         settings["default"]["ignore"] = ignored_files
 
-    for lang in lang_files:
+    for lang in languages:
         if lang != "unknown" and lang != "all":
             settings[lang_map[lang]] = generate_section(
                 lang,
                 extset[lang],
-                relevant_bears[lang_map[lang]])
+                relevant_bears[lang_map[lang]],
+                detected_files[lang])
+            section_bears[lang_map[lang]] = relevant_bears[lang_map[lang]]
+
+    if answers is not None:
+        apply_answers(settings, section_bears, answers)
+
+    digests = {}
+    unfilled = settings
+    if state is not None:
+        unfilled = OrderedDict()
+        for name, section in settings.items():
+            digests[name] = section_digest(section)
+            if not state.restore_section(name, section, digests[name]):
+                unfilled[name] = section
 
     log_printer = LogPrinter(ConsolePrinter())
-    fill_settings(settings, acquire_settings, log_printer)
+    if unfilled:
+        with stage("fill_settings"):
+            fill_settings(unfilled, acquire_settings, log_printer)
+
+    if state is not None:
+        for name, section in settings.items():
+            state.record_section(name, section, digests[name])
+        state.finish_sections()
 
     return settings
 
@@ -124,18 +217,35 @@ def write_info(writer):
     writer._ConfWriter__file.write(generation_comment)
 
 
-def write_coafile(printer, project_dir, settings):
+def write_coafile(printer, project_dir, settings, state=None):
     """
     Writes the coafile to disk.
 
+    With a ``state``, nothing is written if no section changed since the
+    previous run and the file written then still exists unchanged.
+
     :param printer:
         A ``ConsolePrinter`` object used for console interactions.
     :param project_dir:
         Full path of the user's project directory.
     :param settings:
         A dict with section name as key and a ``Section`` object as value.
+    :param state:
+        The ``ScanState`` of the previous run, after ``generate_settings``.
+    :return:
+        The path of the written coafile, ``None`` if it was up to date.
     """
     coafile = os.path.join(project_dir, ".coafile")
+    if (state is not None and state.loaded and
+            not state.changed_sections and state.coafile_is_current()):
+        printer.print("'" + state.coafile["path"] + "' is up to date.",
+                      color="green")
+        return None
+
+    if state is not None and state.loaded and state.changed_sections:
+        printer.print("Changed sections: " +
+                      ", ".join(state.changed_sections))
+
     if os.path.isfile(coafile):
         printer.print("'" + coafile + "' already exists.\nThe settings will be"
                       " written to '" + coafile + ".new'",
@@ -146,5 +256,8 @@ def write_coafile(printer, project_dir, settings):
     write_info(writer)
     writer.write_sections(settings)
     writer.close()
+    if state is not None:
+        state.record_coafile(coafile)
 
     printer.print("'" + coafile + "' successfully generated.", color="green")
+    return coafile
@@ -0,0 +1,95 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _scan_directory(root, directory):
+    """
+    Lists the entries of a directory.
+
+    :param root:      The directory the walk started from.
+    :param directory: The directory to list, relative to ``root``.
+    :return:          A tuple of the sorted file names and a sorted list of
+                      tuples of the relative and full path of each
+                      subdirectory.
+    """
+    try:
+        entries = sorted(os.scandir(os.path.join(root, directory)),
+                         key=lambda entry: entry.name)
+    except OSError:
+        return [], []
+
+    files, subdirs = [], []
+    for entry in entries:
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append((os.path.join(directory, entry.name),
+                                entry.path))
+            elif entry.is_file():
+                files.append(entry.name)
+        except OSError:
+            continue
+    return files, subdirs
+
+
+def walk_directory(root, jobs=None, prune=None, scan=None):
+    """
+    Walks the given directory depth first, listing each directory with
+    ``os.scandir``. With more than one job, the subdirectories are listed
+    concurrently by a thread pool as soon as they are found, while the
+    results are still yielded in the same order as a sequential walk.
+
+    >>> import tempfile
+    >>> root = tempfile.mkdtemp()
+    >>> for path in ("b/c.py", "a.py", "b/d/e.py", "node_modules/f.js"):
+    ...     os.makedirs(os.path.dirname(os.path.join(root, path)),
+    ...                 exist_ok=True)
+    ...     open(os.path.join(root, path), "w").close()
+    >>> prune = lambda directory, path: directory == "node_modules"
+    >>> list(walk_directory(root, jobs=4, prune=prune))
+    [('', ['a.py']), ('b', ['c.py']), ('b/d', ['e.py'])]
+    >>> import shutil
+    >>> shutil.rmtree(root)
+
+    :param root:
+        The directory to walk.
+    :param jobs:
+        The number of threads listing directories concurrently. Defaults to
+        the number of processors if ``None``.
+    :param prune:
+        A function called with the relative and full path of every
+        subdirectory before it is entered. The subdirectory is skipped
+        when it returns True.
+    :param scan:
+        The function listing a directory, called like
+        ``_scan_directory``, which is the default.
+    :return:
+        An iterator of tuples of a directory path relative to ``root`` and
+        the sorted list of the names of the files in it.
+    """
+    def descend(subdirs):
+        return [directory for directory, path in subdirs
+                if prune is None or not prune(directory, path)]
+
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    if scan is None:
+        scan = _scan_directory
+
+    if jobs <= 1:
+        pending = [""]
+        while pending:
+            directory = pending.pop()
+            files, subdirs = scan(root, directory)
+            yield directory, files
+            pending.extend(reversed(descend(subdirs)))
+        return
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        pending = [("", executor.submit(scan, root, ""))]
+        while pending:
+            directory, future = pending.pop()
+            files, subdirs = future.result()
+            yield directory, files
+            pending.extend(reversed([
+                (subdir, executor.submit(scan, root, subdir))
+                for subdir in descend(subdirs)]))
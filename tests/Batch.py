@@ -0,0 +1,121 @@
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from coala_quickstart import Batch
+from coala_quickstart.Batch import (
+    collect_projects, generate_project, run_batch)
+from pyprint.NullPrinter import NullPrinter
+
+
+class TestCollectProjects(unittest.TestCase):
+
+    def setUp(self):
+        self.parent = tempfile.mkdtemp()
+        for name in ("b", "a", ".hidden"):
+            os.mkdir(os.path.join(self.parent, name))
+        open(os.path.join(self.parent, "file"), "w").close()
+
+    def tearDown(self):
+        shutil.rmtree(self.parent)
+
+    def test_directories(self):
+        project = os.path.join(self.parent, "a")
+        self.assertEqual(collect_projects([project, project + os.sep,
+                                           self.parent]),
+                         [project, self.parent])
+
+    def test_parents(self):
+        self.assertEqual(collect_projects([self.parent], parents=True),
+                         [os.path.join(self.parent, "a"),
+                          os.path.join(self.parent, "b")])
+
+    def test_file(self):
+        list_file = os.path.join(self.parent, "projects.txt")
+        with open(list_file, "w") as file:
+            file.write("# projects\nb\n\n{}\n".format(
+                os.path.join(self.parent, "a")))
+        self.assertEqual(collect_projects([list_file]),
+                         [os.path.join(self.parent, "b"),
+                          os.path.join(self.parent, "a")])
+
+
+class TestRunBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.parent = tempfile.mkdtemp()
+        self.args = argparse.Namespace(
+            batch=[os.path.join(self.parent, "missing"),
+                   os.path.join(self.parent, "project")],
+            batch_parents=False,
+            batch_report=os.path.join(self.parent, "report.json"),
+            jobs=2, non_interactive=False)
+        os.mkdir(os.path.join(self.parent, "project"))
+
+    def tearDown(self):
+        shutil.rmtree(self.parent)
+        Batch._bears = None
+
+    def test_missing_project(self):
+        result = generate_project(os.path.join(self.parent, "missing"),
+                                  self.args)
+        self.assertEqual(result["status"], "failed")
+        self.assertEqual(result["error"],
+                         "The project directory does not exist.")
+
+    def test_report(self):
+        def generate(printer, log_printer, project_dir, args, **kwargs):
+            self.assertEqual(args.jobs, 1)
+            self.assertTrue(args.non_interactive)
+            self.assertEqual(kwargs["bears"], {"SomeBear"})
+            return os.path.join(project_dir, ".coafile"), ["Python"]
+
+        with patch("coala_quickstart.generation.Bears.load_bears",
+                   return_value={"SomeBear"}) as load_bears, \
+                patch("coala_quickstart.coala_quickstart.generate_coafile",
+                      generate), \
+                patch.object(Batch, "ProcessPoolExecutor",
+                             ThreadPoolExecutor):
+            self.assertEqual(run_batch(NullPrinter(), self.args), 1)
+        self.assertEqual(load_bears.call_count, 1)
+
+        with open(self.args.batch_report) as file:
+            report = json.load(file)
+        self.assertEqual([result["status"] for result in report],
+                         ["failed", "generated"])
+        self.assertEqual(report[1]["coafile"],
+                         os.path.join(self.parent, "project", ".coafile"))
+        self.assertEqual(report[1]["languages"], ["Python"])
+
+    def test_spawned_worker(self):
+        # A spawned worker loads the bears itself, with the command line of
+        # quickstart as its ``sys.argv``.
+        with patch("sys.argv", ["coala-quickstart", "--batch",
+                                self.parent]), \
+                patch("coala_quickstart.coala_quickstart.generate_coafile",
+                      return_value=(None, [])):
+            result = generate_project(os.path.join(self.parent, "project"),
+                                      self.args)
+        self.assertIsNone(result["error"])
+        self.assertEqual(result["status"], "up to date")
+        self.assertIsNotNone(Batch._bears)
+
+    def test_worker_failure(self):
+        with patch("coala_quickstart.generation.Bears.load_bears",
+                   return_value=set()), \
+                patch.object(Batch, "generate_project",
+                             side_effect=RuntimeError("Worker died.")), \
+                patch.object(Batch, "ProcessPoolExecutor",
+                             ThreadPoolExecutor):
+            self.assertEqual(run_batch(NullPrinter(), self.args), 1)
+
+        with open(self.args.batch_report) as file:
+            report = json.load(file)
+        self.assertEqual([(result["status"], result["error"])
+                          for result in report],
+                         [("failed", "RuntimeError: Worker died.")] * 2)
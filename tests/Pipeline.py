@@ -0,0 +1,64 @@
+import argparse
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from pyprint.NullPrinter import NullPrinter
+
+from coala_quickstart.Pipeline import collect_project
+from coala_quickstart.generation import FileGlobs
+
+
+class TestCollectProject(unittest.TestCase):
+
+    def setUp(self):
+        self.project_dir = tempfile.mkdtemp()
+        with open(os.path.join(self.project_dir, "main.py"), "w") as file:
+            file.write("print(1)\n")
+        with open(os.path.join(self.project_dir, ".gitignore"), "w") as file:
+            file.write("*.log\n")
+        self.args = argparse.Namespace(jobs=1, file_source="filesystem",
+                                       language_weight="files",
+                                       low_memory=False, estimate=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.project_dir)
+
+    def test_stages_overlap(self):
+        walking = threading.Event()
+        get_project_files = FileGlobs.get_project_files
+
+        def walk(*args):
+            walking.set()
+            return get_project_files(*args)
+
+        def load_bears(arg_parser):
+            # Only returns if the project is walked at the same time.
+            self.assertTrue(walking.wait(10))
+            return {"SomeBear"}
+
+        with patch.object(FileGlobs, "get_project_files", walk), \
+                patch("coala_quickstart.generation.Bears.load_bears",
+                      load_bears):
+            project_files, ignore_globs, used_languages, bears = (
+                collect_project(NullPrinter(), None, self.project_dir,
+                                self.args))
+
+        self.assertIn(os.path.join(self.project_dir, "main.py"),
+                      list(project_files))
+        self.assertEqual(ignore_globs, [])
+        self.assertEqual(used_languages, [("Python", 50)])
+        self.assertEqual(bears, {"SomeBear"})
+
+    def test_given_bears(self):
+        with patch("coala_quickstart.generation.Bears.load_bears") \
+                as load_bears:
+            result = collect_project(NullPrinter(), None, self.project_dir,
+                                     self.args, bears={"OtherBear"},
+                                     ignore_globs=["*.txt"])
+        self.assertFalse(load_bears.called)
+        self.assertEqual(result[1], ["*.txt"])
+        self.assertEqual(result[3], {"OtherBear"})
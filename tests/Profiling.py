@@ -0,0 +1,197 @@
+import builtins
+import json
+import os
+import pstats
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from coala_quickstart import Profiling
+from coala_quickstart.Profiling import (
+    CpuProfiler, ImportTimer, MemoryProfiler, StageStats, count, stage)
+
+
+class TestImportTimer(unittest.TestCase):
+
+    def setUp(self):
+        self.module_dir = tempfile.mkdtemp()
+        with open(os.path.join(self.module_dir, "timed_outer.py"),
+                  "w") as file:
+            file.write("import timed_inner\n")
+        with open(os.path.join(self.module_dir, "timed_inner.py"),
+                  "w") as file:
+            file.write("import time\ntime.sleep(0.05)\n")
+        with open(os.path.join(self.module_dir, "timed_events.py"),
+                  "w") as file:
+            file.write("import threading\n"
+                       "started = threading.Event()\n"
+                       "release = threading.Event()\n")
+        with open(os.path.join(self.module_dir, "timed_waiting.py"),
+                  "w") as file:
+            file.write("import timed_events\n"
+                       "timed_events.started.set()\n"
+                       "timed_events.release.wait(10)\n")
+        sys.path.insert(0, self.module_dir)
+
+    def tearDown(self):
+        sys.path.remove(self.module_dir)
+        sys.modules.pop("timed_outer", None)
+        sys.modules.pop("timed_inner", None)
+        sys.modules.pop("timed_events", None)
+        sys.modules.pop("timed_waiting", None)
+        shutil.rmtree(self.module_dir)
+
+    def test_nested_imports(self):
+        original_import = builtins.__import__
+        with ImportTimer() as timer:
+            import timed_outer  # noqa
+        self.assertIs(builtins.__import__, original_import)
+
+        outer_self, outer_cumulative = timer.timings["timed_outer"]
+        inner_self, inner_cumulative = timer.timings["timed_inner"]
+        self.assertGreaterEqual(inner_self, 0.05)
+        self.assertGreaterEqual(outer_cumulative, inner_cumulative)
+        self.assertLess(outer_self, inner_self)
+
+        lines = timer.format()
+        self.assertIn("module", lines[0])
+        self.assertTrue(lines[1].endswith("timed_outer"))
+        self.assertEqual(len(timer.format(limit=1)), 2)
+
+    def test_concurrent_imports(self):
+        import timed_events
+
+        with ImportTimer() as timer:
+            thread = threading.Thread(target=__import__,
+                                      args=("timed_waiting",))
+            thread.start()
+            timed_events.started.wait(10)
+            import timed_inner  # noqa
+            timed_events.release.set()
+            thread.join()
+
+        # The import in the main thread is not a child of the one in the
+        # other thread.
+        waiting_self, waiting_cumulative = timer.timings["timed_waiting"]
+        self.assertEqual(waiting_self, waiting_cumulative)
+        self.assertGreaterEqual(timer.timings["timed_inner"][0], 0.05)
+
+    def test_failed_import(self):
+        with ImportTimer() as timer:
+            with self.assertRaises(ImportError):
+                import timed_missing  # noqa
+        self.assertNotIn("timed_missing", timer.timings)
+
+
+class TestStageStats(unittest.TestCase):
+
+    def test_inactive(self):
+        with stage("walk"):
+            count("files scanned")
+        self.assertEqual(Profiling._recorders, [])
+
+    def test_stages(self):
+        with StageStats() as stats:
+            self.assertEqual(Profiling._recorders, [stats])
+            with stage("settings"):
+                count("bears imported", 2)
+                with stage("fill"):
+                    count("bears imported")
+            with stage("settings"):
+                count("bears imported")
+            count("outside")
+        self.assertEqual(Profiling._recorders, [])
+
+        self.assertEqual(list(stats.stages), ["settings", "fill"])
+        self.assertEqual(stats.stages["settings"]["counters"],
+                         {"bears imported": 3})
+        self.assertEqual(stats.stages["fill"]["counters"],
+                         {"bears imported": 1})
+        self.assertGreaterEqual(stats.stages["settings"]["wall_time"],
+                                stats.stages["fill"]["wall_time"])
+
+        lines = stats.format()
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[1].startswith("settings"))
+        self.assertTrue(lines[1].endswith("bears imported=3"))
+
+        data = json.loads(stats.to_json())
+        self.assertEqual([record["name"] for record in data["stages"]],
+                         ["settings", "fill"])
+        self.assertEqual(set(data["stages"][0]),
+                         {"name", "wall_time", "cpu_time", "peak_rss",
+                          "counters"})
+
+    def test_threads(self):
+        def walk():
+            with stage("walk"):
+                count("files scanned", 5)
+
+        with StageStats() as stats:
+            with stage("bears"):
+                thread = threading.Thread(target=walk)
+                thread.start()
+                thread.join()
+                count("bears imported")
+        self.assertEqual(stats.stages["walk"]["counters"],
+                         {"files scanned": 5})
+        self.assertEqual(stats.stages["bears"]["counters"],
+                         {"bears imported": 1})
+
+
+def profiled_in_thread():
+    return sum(range(1000))
+
+
+class TestProfilers(unittest.TestCase):
+
+    def test_cpu_profiler(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "run.pstats")
+
+        with CpuProfiler(path):
+            thread = threading.Thread(target=profiled_in_thread)
+            thread.start()
+            thread.join()
+        self.assertIsNone(sys.getprofile())
+
+        functions = {function for _, _, function
+                     in pstats.Stats(path).stats}
+        self.assertIn("profiled_in_thread", functions)
+        self.assertIn("start", functions)
+
+    def test_cpu_profiler_thread_pool(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "run.pstats")
+
+        with CpuProfiler(path), stage("scan"):
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                futures = [executor.submit(profiled_in_thread)
+                           for _ in range(8)]
+                results = [future.result(timeout=10) for future in futures]
+        self.assertEqual(results, [499500] * 8)
+        self.assertIsNone(sys.getprofile())
+
+        functions = {function for _, _, function
+                     in pstats.Stats(path).stats}
+        self.assertIn("profiled_in_thread", functions)
+
+    def test_memory_profiler(self):
+        with MemoryProfiler(limit=2) as profiler, StageStats() as stats:
+            with stage("allocate"):
+                blocks = [bytearray(1024) for _ in range(100)]  # noqa
+            with stage("idle"):
+                pass
+        self.assertEqual(Profiling._recorders, [])
+        self.assertIn("allocate", stats.stages)
+        self.assertLessEqual(len(profiler.stages["allocate"]), 2)
+        self.assertGreaterEqual(
+            profiler.stages["allocate"][0].size_diff, 100 * 1024)
+        lines = profiler.format()
+        self.assertTrue(lines[0].startswith("allocate: +"))
+        self.assertIn("bytearray(1024)", lines[1])
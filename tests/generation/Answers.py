@@ -0,0 +1,74 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from coalib.settings.Section import Section
+from coala_quickstart.generation.Answers import Answers
+
+
+class TestAnswers(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, "w") as file:
+            file.write(content)
+        return path
+
+    def test_load_formats(self):
+        expected_named = {"linecountbear": {"max_lines_per_file": "500"}}
+        expected_common = {"use_spaces": "true"}
+        for name, content in (
+                ("answers.json", '{"LineCountBear": '
+                                 '{"max_lines_per_file": 500}, '
+                                 '"use_spaces": true}'),
+                ("answers.yaml", "LineCountBear:\n"
+                                 "  max_lines_per_file: 500\n"
+                                 "use_spaces: true\n"),
+                ("answers.ini", "[DEFAULT]\nuse_spaces = true\n"
+                                "[LineCountBear]\n"
+                                "max_lines_per_file = 500\n")):
+            answers = Answers.load(self.write(name, content))
+            self.assertEqual(answers.named, expected_named, name)
+            self.assertEqual(answers.common, expected_common, name)
+
+    def test_load_ini_overrides(self):
+        answers = Answers.load(self.write(
+            "answers.ini", "[DEFAULT]\nmax_line_length = 80\n"
+                           "use_spaces = true\n"
+                           "[PycodestyleBear]\nmax_line_length = 100\n"))
+        self.assertEqual(answers.named,
+                         {"pycodestylebear": {"max_line_length": "100"}})
+        self.assertEqual(answers.common,
+                         {"max_line_length": "80", "use_spaces": "true"})
+        self.assertEqual(answers.lookup("max_line_length",
+                                        ["PycodestyleBear"]), "100")
+
+    def test_load_errors(self):
+        for name, content in (("answers.txt", ""),
+                              ("answers.json", "{"),
+                              ("answers.json", "[1, 2]"),
+                              ("answers.yml", "a:\n  b:\n    c: 1\n")):
+            with self.assertRaises(ValueError):
+                Answers.load(self.write(name, content))
+        with self.assertRaises(ValueError):
+            Answers.load(os.path.join(self.directory, "missing.json"))
+
+    def test_apply(self):
+        answers = Answers({"python": {"max_line_length": 80},
+                           "PycodestyleBear": {"max_line_length": 100},
+                           "use_spaces": True,
+                           "unused": 1})
+        bear = type("PycodestyleBear", (), {"name": "PycodestyleBear"})
+        section = Section("python")
+        self.assertEqual(answers.apply(section, [bear], {"use_spaces"}),
+                         ["max_line_length", "use_spaces"])
+        self.assertEqual(str(section["max_line_length"]), "100")
+        self.assertEqual(str(section["use_spaces"]), "true")
+        self.assertNotIn("unused", section)
@@ -0,0 +1,117 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from coala_quickstart.generation.BearCache import (
+    BearCache, CachedBear, get_cache_path)
+
+
+BEAR_SOURCE = """
+from coalib.bears.LocalBear import LocalBear
+
+
+class SomeBear(LocalBear):
+    LANGUAGES = {"Python"}
+
+    def run(self, filename, file, max_length: int):
+        '''
+        :param max_length: Maximum length.
+        '''
+        pass
+
+
+class DependentBear(LocalBear):
+    LANGUAGES = {"All"}
+    BEAR_DEPS = {SomeBear}
+
+    def run(self, filename, file, dependency_results=None):
+        pass
+"""
+
+
+class TestBearCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.cache_dir, "bears.json")
+        self.module = os.path.join(self.cache_dir, "CacheTestBears.py")
+        with open(self.module, "w") as file:
+            file.write(BEAR_SOURCE)
+        self.manifest = {
+            "SomeBear": {"module": self.module, "languages": ["Python"]},
+            "DependentBear": {"module": self.module, "languages": None}}
+
+    def tearDown(self):
+        if self.cache_dir in sys.path:
+            sys.path.remove(self.cache_dir)
+        sys.modules.pop("CacheTestBears", None)
+        shutil.rmtree(self.cache_dir)
+
+    def test_get_cache_path(self):
+        with patch.dict(os.environ, {"XDG_CACHE_HOME": self.cache_dir}):
+            self.assertEqual(get_cache_path(),
+                             os.path.join(self.cache_dir, "coala-quickstart",
+                                          "bears.json"))
+
+    def test_lazy_import(self):
+        cache = BearCache(self.path)
+        self.assertIsNone(cache.get())
+        cache.update(self.manifest)
+        bears = {bear.name: bear for bear in cache.get()}
+        self.assertIsInstance(bears["SomeBear"], CachedBear)
+
+        with patch("coala_quickstart.generation.BearCache.import_bear",
+                   side_effect=AssertionError):
+            self.assertEqual(bears["SomeBear"].LANGUAGES, {"Python"})
+
+        self.assertEqual(bears["DependentBear"].LANGUAGES, {"All"})
+        self.assertEqual(bears["DependentBear"].BEAR_DEPS,
+                         {bears["SomeBear"]})
+        self.assertEqual(bears["SomeBear"].get_non_optional_settings(),
+                         {"max_length": ("Maximum length.", None)})
+        self.assertEqual(bears["DependentBear"].bear_class.name,
+                         "DependentBear")
+
+    def test_round_trip(self):
+        cache = BearCache(self.path)
+        cache.update(self.manifest)
+        bears = {bear.name: bear for bear in cache.get()}
+        bears["DependentBear"].BEAR_DEPS
+        bears["SomeBear"].get_non_optional_settings()
+        cache.save()
+
+        with patch("coala_quickstart.generation.BearCache.import_bear",
+                   side_effect=AssertionError):
+            bears = {bear.name: bear for bear in BearCache(self.path).get()}
+            self.assertEqual(bears["DependentBear"].LANGUAGES, {"All"})
+            self.assertEqual(bears["DependentBear"].BEAR_DEPS,
+                             {bears["SomeBear"]})
+            self.assertEqual(bears["SomeBear"].get_non_optional_settings(),
+                             {"max_length": ("Maximum length.", None)})
+
+    def test_import_failure(self):
+        bear = CachedBear("MissingBear",
+                          os.path.join(self.cache_dir, "Missing.py"))
+        self.assertEqual(bear.LANGUAGES, set())
+        self.assertEqual(bear.get_non_optional_settings(), {})
+        self.assertIsNone(bear.to_dict()["languages"])
+
+    def test_invalidation(self):
+        cache = BearCache(self.path, ["/bears/**"])
+        cache.update(self.manifest)
+        cache.save()
+
+        self.assertIsNotNone(BearCache(self.path, ["/bears/**"]).get())
+        self.assertIsNone(BearCache(self.path, ["/other/**"]).get())
+        with patch("coala_quickstart.generation.BearCache."
+                   "get_installed_versions",
+                   return_value={"coala": "0.0.1", "coala-bears": "0.0.1"}):
+            self.assertIsNone(BearCache(self.path, ["/bears/**"]).get())
+
+    def test_corrupt_cache(self):
+        with open(self.path, "w") as file:
+            file.write("{")
+        self.assertIsNone(BearCache(self.path).get())
@@ -0,0 +1,105 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from coala_quickstart.Profiling import StageStats, stage
+from coala_quickstart.generation.BearManifest import (
+    build_manifest, import_bear, scan_bear_file)
+
+
+class TestBearManifest(unittest.TestCase):
+
+    def setUp(self):
+        self.bear_dir = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.bear_dir, "c_languages"))
+        with open(os.path.join(self.bear_dir, "c_languages",
+                               "CBears.py"), "w") as file:
+            file.write("""
+from coalib.bears.LocalBear import LocalBear
+from coalib.bearlib.abstractions.Linter import linter
+
+
+class ClangBear(LocalBear):
+    LANGUAGES = {'C', 'C++'}
+
+
+class ClangComplexityBear(LocalBear):
+    LANGUAGES = ClangBear.LANGUAGES
+
+
+@linter(executable='cppcheck', output_format='regex',
+        output_regex=r'(?P<message>.*)')
+class CPPCheckBear:
+    LANGUAGES = {'C++'}
+
+
+class DynamicBear(LocalBear):
+    LANGUAGES = set(['C'])
+
+
+class Helper:
+    LANGUAGES = {'C'}
+
+
+class InheritingBear(ClangBear):
+    pass
+
+
+class PlainBear(LocalBear):
+    pass
+
+
+class MixedBear(Helper, ClangBear):
+    pass
+""")
+        with open(os.path.join(self.bear_dir, "Broken.py"), "w") as file:
+            file.write("class (:")
+
+    def tearDown(self):
+        for module_dir in (self.bear_dir,
+                           os.path.join(self.bear_dir, "c_languages")):
+            if module_dir in sys.path:
+                sys.path.remove(module_dir)
+        sys.modules.pop("CBears", None)
+        shutil.rmtree(self.bear_dir)
+
+    def test_scan_bear_file(self):
+        self.assertEqual(
+            scan_bear_file(os.path.join(self.bear_dir, "c_languages",
+                                        "CBears.py")),
+            {"ClangBear": ["C", "C++"],
+             "ClangComplexityBear": "ClangBear",
+             "CPPCheckBear": ["C++"],
+             "DynamicBear": None,
+             "InheritingBear": "ClangBear",
+             "PlainBear": [],
+             "MixedBear": None})
+        self.assertEqual(
+            scan_bear_file(os.path.join(self.bear_dir, "Broken.py")), {})
+
+    def test_build_manifest(self):
+        manifest = build_manifest([os.path.join(self.bear_dir, "**")])
+        module = os.path.join(self.bear_dir, "c_languages", "CBears.py")
+        self.assertEqual(manifest, {
+            "ClangBear": {"module": module, "languages": ["C", "C++"]},
+            "ClangComplexityBear": {"module": module,
+                                    "languages": ["C", "C++"]},
+            "CPPCheckBear": {"module": module, "languages": ["C++"]},
+            "DynamicBear": {"module": module, "languages": None},
+            "InheritingBear": {"module": module, "languages": ["C", "C++"]},
+            "PlainBear": {"module": module, "languages": []},
+            "MixedBear": {"module": module, "languages": None}})
+
+    def test_import_bear(self):
+        module = os.path.join(self.bear_dir, "c_languages", "CBears.py")
+        with StageStats() as stats, stage("import"):
+            self.assertEqual(import_bear(module, "DynamicBear").LANGUAGES,
+                             {"C"})
+            self.assertIsNone(import_bear(module, "MissingBear"))
+            self.assertIsNone(import_bear(
+                os.path.join(self.bear_dir, "Broken.py"), "Bear"))
+        # Only the bears actually imported are counted.
+        self.assertEqual(stats.stages["import"]["counters"],
+                         {"bears imported": 1})
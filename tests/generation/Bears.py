@@ -1,12 +1,39 @@
+import os
+import shutil
 import sys
+import tempfile
 import unittest
 from copy import deepcopy
 
 from pyprint.ConsolePrinter import ConsolePrinter
 from coalib.output.printers.LogPrinter import LogPrinter
 from coala_utils.ContextManagers import retrieve_stdout
+from coala_quickstart.generation.Answers import Answers
+from coala_quickstart.generation.BearCache import CachedBear
 from coala_quickstart.generation.Bears import (
-    filter_relevant_bears, print_relevant_bears)
+    filter_relevant_bears, get_non_optional_settings,
+    get_non_optional_settings_bears, print_relevant_bears)
+
+
+def make_bear(name, settings=None, dependencies=(), calls=None):
+    """
+    :param name:         The name of the bear class.
+    :param settings:     A dict of its non-optional settings.
+    :param dependencies: Its ``BEAR_DEPS``.
+    :param calls:        A list the names of the bears whose settings are
+                         looked up are added to.
+    :return:             A bear class.
+    """
+    def get_non_optional_settings(cls):
+        if calls is not None:
+            calls.append(cls.name)
+        return dict(settings or {})
+
+    return type(name, (), {
+        "name": name,
+        "BEAR_DEPS": set(dependencies),
+        "get_non_optional_settings": classmethod(get_non_optional_settings)})
+
 
 class TestBears(unittest.TestCase):
 
@@ -15,9 +42,17 @@ class TestBears(unittest.TestCase):
         self.log_printer = LogPrinter(self.printer)
         self.old_argv = deepcopy(sys.argv)
         del sys.argv[1:]
+        self.old_cache_home = os.environ.get("XDG_CACHE_HOME")
+        self.cache_home = tempfile.mkdtemp()
+        os.environ["XDG_CACHE_HOME"] = self.cache_home
 
     def tearDown(self):
         sys.argv = self.old_argv
+        shutil.rmtree(self.cache_home)
+        if self.old_cache_home is None:
+            del os.environ["XDG_CACHE_HOME"]
+        else:
+            os.environ["XDG_CACHE_HOME"] = self.old_cache_home
 
     def test_filter_relevant_bears(self):
         res = filter_relevant_bears([('Python', 70), ('C', 20)])
@@ -26,6 +61,45 @@ class TestBears(unittest.TestCase):
         self.assertTrue(len(res["C"]) > 0)
         self.assertTrue(len(res["Python"]) > 0)
 
+    def test_filter_relevant_bears_cached(self):
+        res = filter_relevant_bears([('Python', 70), ('C', 20)])
+        cached_res = filter_relevant_bears([('Python', 70), ('C', 20)])
+        self.assertEqual(
+            {lang: {bear.name for bear in bears}
+             for lang, bears in res.items()},
+            {lang: {bear.name for bear in bears}
+             for lang, bears in cached_res.items()})
+        for bears in cached_res.values():
+            for bear in bears:
+                self.assertIsInstance(bear, CachedBear)
+
+    def test_get_non_optional_settings(self):
+        calls = []
+        base = make_bear("BaseBear", {"key": ("Key.", None)}, calls=calls)
+        middle = make_bear("MiddleBear", {}, [base], calls)
+        other = make_bear("OtherBear", {}, [base], calls)
+        top = make_bear("TopBear", {}, [middle], calls)
+        free = make_bear("FreeBear", {}, calls=calls)
+        settings = get_non_optional_settings({"Python": {top, other},
+                                              "All": {free}})
+        # The settings of indirect dependencies are found as well.
+        self.assertEqual(settings[top], {"key": ("Key.", None)})
+        self.assertEqual(settings[other], {"key": ("Key.", None)})
+        self.assertEqual(settings[free], {})
+        # The settings of every bear are only looked up once.
+        self.assertEqual(sorted(calls), ["BaseBear", "FreeBear",
+                                         "MiddleBear", "OtherBear",
+                                         "TopBear"])
+        self.assertEqual(set(get_non_optional_settings_bears(
+            {"Python": {top, other}, "All": {free}})), {top, other})
+
+        answers = Answers({"TopBear": {"key": "value"}})
+        self.assertEqual(set(get_non_optional_settings_bears(
+            {"Python": {top, other}, "All": {free}}, answers)), {other})
+        answers = Answers({"python": {"key": "value"}})
+        self.assertEqual(get_non_optional_settings_bears(
+            {"Python": {top, other}, "All": {free}}, answers), ())
+
     def test_print_relevant_bears(self):
         with retrieve_stdout() as custom_stdout:
             print_relevant_bears(self.printer, filter_relevant_bears(
@@ -0,0 +1,102 @@
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from coala_quickstart.generation.Estimate import (
+    EstimatedShare, LanguageEstimator)
+from coala_quickstart.generation.GitIgnore import GitIgnore
+from coala_quickstart.generation.Project import get_used_languages
+from coala_quickstart.generation.ProjectIndex import ProjectIndex
+
+
+class TestLanguageEstimator(unittest.TestCase):
+
+    def test_stops_when_ranking_is_stable(self):
+        estimator = LanguageEstimator(min_dirs=10, check_every=5,
+                                      stable_checks=2)
+        for number in range(100):
+            estimator.add_directory({"Python": 3, "C": number % 2}, 4)
+            if estimator.done:
+                break
+        self.assertEqual(estimator.sampled_dirs, 20)
+        shares = dict(estimator.shares())
+        self.assertAlmostEqual(shares["Python"], 75)
+        self.assertEqual(shares["Python"].error, 0)
+        self.assertGreater(shares["C"].error, 0)
+
+    def test_exhaustive(self):
+        estimator = LanguageEstimator()
+        estimator.add_directory({"Python": 1}, 2)
+        estimator.add_directory({"Python": 2, "C": 1}, 2)
+        estimator.finish(exhaustive=True)
+        self.assertEqual([(lang, float(share), share.error)
+                          for lang, share in estimator.shares()],
+                         [("Python", 75.0, 0.0), ("C", 25.0, 0.0)])
+
+    def test_share_pickles(self):
+        share = pickle.loads(pickle.dumps(EstimatedShare(10.0, 1.5)))
+        self.assertEqual((share, share.error), (10.0, 1.5))
+
+
+class TestSample(unittest.TestCase):
+
+    def setUp(self):
+        self.project_dir = tempfile.mkdtemp()
+        for number in range(40):
+            directory = os.path.join(self.project_dir,
+                                     "dir{}".format(number % 8))
+            os.makedirs(directory, exist_ok=True)
+            for name in ("a{}.py".format(number), "b{}.c".format(number)):
+                open(os.path.join(directory, name), "w").close()
+        os.makedirs(os.path.join(self.project_dir, "build"))
+        open(os.path.join(self.project_dir, "build", "x.js"), "w").close()
+
+    def tearDown(self):
+        shutil.rmtree(self.project_dir)
+
+    def test_sample_whole_project(self):
+        estimator = LanguageEstimator()
+        index = ProjectIndex.sample(
+            self.project_dir, estimator,
+            [os.path.join(self.project_dir, "build", "**")], seed=1)
+        self.assertTrue(estimator.exhaustive)
+        self.assertEqual(estimator.sampled_dirs, 9)
+        self.assertEqual(len(index), 80)
+        used_languages = dict(get_used_languages(index))
+        self.assertEqual(used_languages, {"Python": 50, "C": 50})
+        self.assertEqual(used_languages["C"].error, 0)
+
+    def test_sample_stops_early(self):
+        estimator = LanguageEstimator(min_dirs=2, check_every=1,
+                                      stable_checks=1)
+        index = ProjectIndex.sample(self.project_dir, estimator, seed=1)
+        self.assertFalse(estimator.exhaustive)
+        self.assertLess(estimator.sampled_dirs, 10)
+        self.assertEqual(len(index), estimator.sampled_files)
+
+    def test_sample_gitignore(self):
+        with open(os.path.join(self.project_dir, ".gitignore"), "w") as file:
+            file.write("node_modules/\nbuild/\n")
+        os.makedirs(os.path.join(self.project_dir, "node_modules", "lib"))
+        for number in range(20):
+            open(os.path.join(self.project_dir, "node_modules", "lib",
+                              "m{}.js".format(number)), "w").close()
+        estimator = LanguageEstimator()
+        index = ProjectIndex.sample(
+            self.project_dir, estimator,
+            ignore_rules=GitIgnore(self.project_dir, excludes_file=""),
+            seed=1)
+        self.assertTrue(estimator.exhaustive)
+        self.assertEqual(estimator.sampled_dirs, 9)
+        full_index = ProjectIndex.scan(
+            self.project_dir,
+            ignore_rules=GitIgnore(self.project_dir, excludes_file=""))
+        used_languages = dict(get_used_languages(index))
+        self.assertNotIn("JavaScript", used_languages)
+        self.assertEqual(used_languages,
+                         dict(get_used_languages(full_index)))
+        self.assertEqual(index.matched_globs, full_index.matched_globs)
+        self.assertIn(os.path.join(self.project_dir, "node_modules", "**"),
+                      index.matched_globs)
@@ -0,0 +1,49 @@
+import unittest
+
+from coala_quickstart.generation.ExtensionClassifier import (
+    ExtensionClassifier, classify)
+from coala_quickstart.generation.ProjectIndex import ProjectIndex
+
+
+class TestExtensionClassifier(unittest.TestCase):
+
+    def setUp(self):
+        self.classifier = ExtensionClassifier({
+            ".js": {"JavaScript"},
+            ".ts": {"TypeScript"},
+            ".h": {"C", "C++"},
+            ".H": {"C++"},
+            ".tar.gz": {"Archive"}})
+
+    def test_classify(self):
+        self.assertEqual(self.classifier.classify("a.js"),
+                         (".js", ("JavaScript",)))
+        self.assertEqual(self.classifier.classify("a.Js"),
+                         (".Js", ("JavaScript",)))
+        self.assertEqual(self.classifier.classify("types.d.ts"),
+                         (".ts", ("TypeScript",)))
+        self.assertEqual(self.classifier.classify("x.tar.gz"),
+                         (".tar.gz", ("Archive",)))
+        self.assertEqual(self.classifier.classify("x.gz"), (".gz", ()))
+        self.assertEqual(self.classifier.classify("README"), ("", ()))
+        # Leading dots are no extension dots, as with os.path.splitext.
+        self.assertEqual(self.classifier.classify(".js"), ("", ()))
+        self.assertEqual(self.classifier.classify("..js"), ("", ()))
+
+    def test_case_variants_merged(self):
+        self.assertEqual(self.classifier.classify("a.h"),
+                         (".h", ("C", "C++")))
+
+    def test_memoized_per_suffix(self):
+        for name in ("a.min.js", "b.min.js", "c.js"):
+            self.classifier.classify(name)
+        self.assertEqual(sorted(self.classifier._memo),
+                         [".js", ".min.js"])
+
+    def test_project_index(self):
+        index = ProjectIndex.from_paths(["/tmp/APP.JS", "/tmp/lib.min.js",
+                                         "/tmp/index.d.ts"], detect=False)
+        self.assertEqual(dict(index.extensions_by_language()),
+                         {"javascript": {".JS", ".js"},
+                          "typescript": {".ts"}})
+        self.assertEqual(classify("APP.JS"), (".JS", ("JavaScript",)))
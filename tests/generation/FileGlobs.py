@@ -1,12 +1,17 @@
 import os
+import shutil
+import tempfile
 import unittest
+from unittest.mock import patch
 
 from pyprint.ConsolePrinter import ConsolePrinter
 from coalib.output.printers.LogPrinter import LogPrinter
 from coala_utils.ContextManagers import (
     simulate_console_inputs, suppress_stdout)
 from coala_quickstart.generation.FileGlobs import get_project_files
-from coala_quickstart.generation.Utilities import get_gitignore_glob
+from coala_quickstart.generation.Utilities import (
+    get_gitignore_glob, parse_gitignore_line)
+from coala_quickstart.generation import Walker
 from coalib.collecting.Collectors import collect_files
 
 
@@ -30,7 +35,10 @@ class TestQuestion(unittest.TestCase):
         open(os.path.join("ignore_dir", "src.js"), "w").close()
 
         with suppress_stdout(), simulate_console_inputs("ignore_dir/**"):
-            res, _ = get_project_files(self.log_printer, self.printer, os.getcwd())
+            # The files created here are ignored by the .gitignore of the
+            # repository, so they are not listed from git.
+            res, _ = get_project_files(self.log_printer, self.printer,
+                                       os.getcwd(), source="filesystem")
             self.assertIn(os.path.join(os.getcwd(), "src", "file.c"), res)
             self.assertIn(os.path.join(os.getcwd(), "root.c"), res)
             self.assertNotIn(os.path.join(os.getcwd(), "ignore_dir/src.c"), res)
@@ -91,8 +99,79 @@ __pycache__
         with suppress_stdout():
             self.assertEqual(
                 sorted(get_project_files(
-                    self.log_printer, self.printer, os.getcwd())[0]),
+                    self.log_printer, self.printer, os.getcwd(),
+                    source="filesystem")[0]),
                 sorted(files))
 
         os.remove(".gitignore")
         os.chdir(orig_cwd)
+
+    def test_parse_gitignore_directory_line(self):
+        self.assertEqual(list(parse_gitignore_line("node_modules/\n")),
+                         [os.path.join("node_modules", "**"),
+                          os.path.join("**", "node_modules", "**")])
+        self.assertEqual(list(parse_gitignore_line("/build/\n")),
+                         [os.path.join("build", "**")])
+        self.assertEqual(list(parse_gitignore_line("/\n")), [])
+
+    def test_get_project_files_prunes_ignored_directories(self):
+        project_dir = tempfile.mkdtemp()
+        for file in [os.path.join("src", "main.js"),
+                     os.path.join("node_modules", "lib", "index.js"),
+                     os.path.join("src", "node_modules", "lib", "index.js")]:
+            path = os.path.join(project_dir, file)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            open(path, "w").close()
+        with open(os.path.join(project_dir, ".gitignore"), "w") as f:
+            f.write("node_modules/\n")
+
+        scanned = []
+        scan_directory = Walker._scan_directory
+
+        def record_scan(root, directory):
+            scanned.append(directory)
+            return scan_directory(root, directory)
+
+        with suppress_stdout(), patch.object(
+                Walker, "_scan_directory", record_scan):
+            res, _ = get_project_files(
+                self.log_printer, self.printer, project_dir)
+        shutil.rmtree(project_dir)
+
+        self.assertEqual(list(res), [os.path.join(project_dir, ".gitignore"),
+                                     os.path.join(project_dir, "src",
+                                                  "main.js")])
+        self.assertEqual(sorted(scanned), ["", "src"])
+
+    def test_get_project_files_nested_gitignore(self):
+        project_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, project_dir)
+        files = {".gitignore": "*.log\n",
+                 os.path.join("lib", ".gitignore"): "vendor/\n!keep.log\n",
+                 os.path.join("lib", "main.c"): "",
+                 os.path.join("lib", "keep.log"): "",
+                 os.path.join("lib", "error.log"): "",
+                 os.path.join("lib", "vendor", "dep.c"): "",
+                 os.path.join("vendor", "main.c"): "",
+                 os.path.join(".git", "info", "exclude"): "*.tmp\n",
+                 "cache.tmp": ""}
+        for file, content in files.items():
+            path = os.path.join(project_dir, file)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(content)
+
+        with suppress_stdout():
+            res, ignore_globs = get_project_files(
+                self.log_printer, self.printer, project_dir)
+
+        self.assertEqual(sorted(res), sorted(
+            os.path.join(project_dir, file)
+            for file in (".gitignore", os.path.join("lib", ".gitignore"),
+                         os.path.join("lib", "main.c"),
+                         os.path.join("lib", "keep.log"),
+                         os.path.join("vendor", "main.c"))))
+        self.assertEqual(ignore_globs,
+                         ["**.tmp", os.path.join("lib", "error.log"),
+                          os.path.join("lib", "vendor", "**"),
+                          os.path.join("lib", "**", "vendor", "**")])
@@ -0,0 +1,85 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+from coala_quickstart.generation.GitFiles import list_git_files
+from coala_quickstart.generation.GitIgnore import GitIgnore
+from coala_quickstart.generation.ProjectIndex import ProjectIndex
+
+
+def git(project_dir, *args):
+    subprocess.check_call(
+        ("git", "-c", "user.name=test", "-c", "user.email=test@example.com")
+        + args, cwd=project_dir, stdout=subprocess.DEVNULL)
+
+
+@unittest.skipIf(shutil.which("git") is None, "git is not installed")
+class TestGitFiles(unittest.TestCase):
+
+    def setUp(self):
+        self.project_dir = tempfile.mkdtemp()
+        files = {".gitignore": "*.log\nbuild/\n",
+                 os.path.join("src", "main.c"): "",
+                 os.path.join("src", "deleted.c"): "",
+                 os.path.join("src", ".gitignore"): "!keep.log\n",
+                 "tracked.log": ""}
+        for file, content in files.items():
+            self.write(file, content)
+        git(self.project_dir, "init", "-q")
+        git(self.project_dir, "add", "-f", ".")
+        git(self.project_dir, "commit", "-q", "-m", "Initial commit")
+
+        os.remove(os.path.join(self.project_dir, "src", "deleted.c"))
+        for file in ("new.py", os.path.join("src", "keep.log"),
+                     "debug.log", os.path.join("build", "out.o")):
+            self.write(file, "")
+
+    def tearDown(self):
+        shutil.rmtree(self.project_dir)
+
+    def write(self, file, content):
+        path = os.path.join(self.project_dir, file)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+
+    def test_list_git_files(self):
+        files, ignored = list_git_files(self.project_dir)
+        self.assertEqual(files, [".gitignore", "new.py",
+                                 os.path.join("src", ".gitignore"),
+                                 os.path.join("src", "keep.log"),
+                                 os.path.join("src", "main.c"),
+                                 "tracked.log"])
+        self.assertEqual(sorted(ignored),
+                         [os.path.join("build", ""), "debug.log"])
+
+        files, _ = list_git_files(os.path.join(self.project_dir, "src"))
+        self.assertEqual(files, [".gitignore", "keep.log", "main.c"])
+
+    def test_not_a_repository(self):
+        project_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, project_dir)
+        self.assertIsNone(list_git_files(project_dir))
+        self.assertIsNone(ProjectIndex.from_git(project_dir))
+
+    def test_from_git(self):
+        git_index = ProjectIndex.from_git(
+            self.project_dir,
+            ignore_rules=GitIgnore(self.project_dir, excludes_file=""))
+        scan_index = ProjectIndex.scan(
+            self.project_dir, [os.path.join(self.project_dir, ".git", "**")],
+            ignore_rules=GitIgnore(self.project_dir, excludes_file=""))
+
+        self.assertEqual(sorted(git_index), sorted(scan_index))
+        self.assertNotIn(os.path.join(self.project_dir, "tracked.log"),
+                         git_index)
+        # src/keep.log is re-included, so the log files are listed.
+        globs = ["debug.log", "tracked.log", os.path.join("build", "**"),
+                 os.path.join("**", "build", "**")]
+        self.assertEqual(sorted(git_index.ignore_rules.matched_globs()),
+                         sorted(globs))
+        self.assertEqual(git_index.matched_globs,
+                         {os.path.join(self.project_dir, glob)
+                          for glob in globs})
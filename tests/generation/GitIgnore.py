@@ -0,0 +1,208 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from coala_quickstart.generation.GitIgnore import (
+    GitIgnore, IgnoreFile, IgnoreRule, minimize_globs)
+
+
+class TestIgnoreRule(unittest.TestCase):
+
+    def test_parse(self):
+        self.assertIsNone(IgnoreRule.parse("\n"))
+        self.assertIsNone(IgnoreRule.parse("# comment\n"))
+        self.assertIsNone(IgnoreRule.parse("/\n"))
+        rule = IgnoreRule.parse("\\#file \n")
+        self.assertTrue(rule.matches("#file"))
+        rule = IgnoreRule.parse("\\!important\n")
+        self.assertFalse(rule.negate)
+        self.assertTrue(rule.matches("src/!important"))
+        rule = IgnoreRule.parse("trailing\\ \n")
+        self.assertTrue(rule.matches("trailing "))
+
+    def test_matches(self):
+        rule = IgnoreRule.parse("*.o")
+        self.assertTrue(rule.matches("main.o"))
+        self.assertTrue(rule.matches("src/lib/main.o"))
+        self.assertFalse(rule.matches("main.os"))
+
+        rule = IgnoreRule.parse("src/*.o")
+        self.assertTrue(rule.matches("src/main.o"))
+        self.assertFalse(rule.matches("lib/src/main.o"))
+        self.assertFalse(rule.matches("src/lib/main.o"))
+
+        rule = IgnoreRule.parse("**/cache/*.tmp")
+        self.assertTrue(rule.matches("cache/a.tmp"))
+        self.assertTrue(rule.matches("a/b/cache/a.tmp"))
+
+        rule = IgnoreRule.parse("file[0-9!].[!c]")
+        self.assertTrue(rule.matches("file1.h"))
+        self.assertFalse(rule.matches("file1.c"))
+
+        rule = IgnoreRule.parse("logs/")
+        self.assertTrue(rule.matches("a/logs", is_dir=True))
+        self.assertFalse(rule.matches("a/logs"))
+
+    def test_globs(self):
+        self.assertEqual(IgnoreRule.parse("/build/").globs(),
+                         [os.path.join("build", "**")])
+        self.assertEqual(IgnoreRule.parse("*.pyc", "sub").globs(),
+                         [os.path.join("sub", "**.pyc", "**"),
+                          os.path.join("sub", "**.pyc")])
+        self.assertEqual(IgnoreRule.parse("build").globs(directories=False),
+                         ["build", os.path.join("**", "build")])
+        self.assertEqual(IgnoreRule.parse("build").globs(files=False),
+                         [os.path.join("build", "**"),
+                          os.path.join("**", "build", "**")])
+        self.assertEqual(IgnoreRule.parse("**/doc/*.txt").globs(
+                             directories=False),
+                         [os.path.join("doc", "*.txt"),
+                          os.path.join("**", "doc", "*.txt")])
+        self.assertEqual(IgnoreRule.parse("src/*.o").globs(directories=False),
+                         [os.path.join("src", "*.o")])
+        self.assertEqual(IgnoreRule.parse("(a)").globs()[-1],
+                         os.path.join("**", "[(]a[)]"))
+        self.assertEqual(IgnoreRule.parse("!keep").globs(), [])
+        self.assertEqual(IgnoreRule.parse("a/**/b").globs(directories=False),
+                         [os.path.join("a", "**", "b"),
+                          os.path.join("a", "b")])
+        self.assertEqual(
+            IgnoreRule.parse("a/**/b/**/c").globs(directories=False),
+            [os.path.join("a", "**", "b", "**", "c"),
+             os.path.join("a", "**", "b", "c"),
+             os.path.join("a", "b", "**", "c"),
+             os.path.join("a", "b", "c")])
+
+
+class TestIgnoreFile(unittest.TestCase):
+
+    def test_last_rule_wins(self):
+        rules = [IgnoreRule.parse(line) for line in
+                 ("*.log", "logs/", "/src/main.c", "src/*.c", "!keep.log",
+                  "**/tmp", "!*.c")]
+        ignore_file = IgnoreFile(rules)
+        for path, is_dir, position in (
+                ("a/error.log", False, 0), ("a/keep.log", False, 4),
+                ("a/logs", True, 1), ("a/logs", False, None),
+                ("src/main.c", False, 6), ("src/main.h", False, None),
+                ("a/b/tmp", False, 5), ("tmp", True, 5)):
+            rule = ignore_file.match(path, is_dir)
+            self.assertIs(rule, None if position is None else rules[position],
+                          path)
+
+    def test_literal_rules(self):
+        self.assertEqual(
+            [IgnoreRule.parse(line).literal for line in
+             ("build", "**/build", "*.o", "*", "/a/b", "a/**/b", "**/a/b",
+              "*.[oa]", "b?ild")],
+            [("name", "build"), ("name", "build"), ("suffix", ".o"),
+             ("suffix", ""), ("path", "a/b"), (None, None), (None, None),
+             (None, None), (None, None)])
+
+
+class TestMinimizeGlobs(unittest.TestCase):
+
+    def test_minimize_globs(self):
+        self.assertEqual(
+            minimize_globs(["**/vendor/**", "build/**", "**/vendor/*.js",
+                            "build/**", "src/*.o", "build/src/*.o"]),
+            ["**/vendor/**", "build/**", "src/*.o"])
+        self.assertEqual(minimize_globs([]), [])
+
+
+class TestGitIgnore(unittest.TestCase):
+
+    def setUp(self):
+        self.project_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.project_dir)
+
+    def write(self, file, content):
+        path = os.path.join(self.project_dir, file)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def test_nested_files(self):
+        self.write(".gitignore", "*.log\nvendor/\n")
+        self.write(os.path.join("sub", ".gitignore"),
+                   "!debug.log\n/local\n")
+        ignore = GitIgnore(self.project_dir, excludes_file="")
+        ignore.load_directory("", [".gitignore"])
+        ignore.load_directory("sub", [".gitignore"])
+
+        self.assertTrue(ignore.is_ignored("error.log"))
+        self.assertTrue(ignore.is_ignored(os.path.join("sub", "error.log")))
+        self.assertFalse(ignore.is_ignored(os.path.join("sub", "debug.log")))
+        self.assertTrue(ignore.is_ignored("debug.log"))
+        self.assertTrue(ignore.is_ignored(os.path.join("sub", "local")))
+        self.assertFalse(ignore.is_ignored("local"))
+        self.assertFalse(ignore.is_ignored(
+            os.path.join("other", "sub", "local")))
+        self.assertTrue(ignore.is_ignored(
+            os.path.join("sub", "vendor", "debug.log")))
+        self.assertFalse(ignore.is_ignored("vendor"))
+        self.assertTrue(ignore.is_ignored("vendor", is_dir=True))
+
+        # sub/debug.log is re-included, so the log files are listed.
+        self.assertEqual(
+            ignore.matched_globs(),
+            ["error.log", os.path.join("sub", "error.log"), "debug.log",
+             os.path.join("sub", "local"),
+             os.path.join("vendor", "**"),
+             os.path.join("**", "vendor", "**")])
+
+    def test_negated_matched_globs(self):
+        self.write(".gitignore", "*.log\n!keep.log\n*.tmp\n")
+        ignore = GitIgnore(self.project_dir, excludes_file="")
+        ignore.load_directory("", [".gitignore"])
+        for path in ("debug.log", os.path.join("sub", "error.log"),
+                     "keep.log", "cache.tmp"):
+            ignore.is_ignored(path)
+        # **.log would ignore keep.log, so the log files are listed.
+        self.assertEqual(ignore.matched_globs(),
+                         ["debug.log", os.path.join("sub", "error.log"),
+                          "**.tmp"])
+
+    def test_last_rule_wins(self):
+        self.write(".gitignore", "*.c\n!main.c\n/src/main.c\n")
+        ignore = GitIgnore(self.project_dir, excludes_file="")
+        ignore.load_directory("", [".gitignore"])
+        self.assertTrue(ignore.is_ignored("util.c"))
+        self.assertFalse(ignore.is_ignored("main.c"))
+        self.assertTrue(ignore.is_ignored(os.path.join("src", "main.c")))
+        self.assertFalse(ignore.is_ignored(
+            os.path.join("lib", "src", "main.c")))
+
+    def test_ignored_directories_cache(self):
+        self.write(".gitignore", "")
+        self.write(os.path.join("a", ".gitignore"), "b/\n")
+        ignore = GitIgnore(self.project_dir, excludes_file="")
+        path = os.path.join("a", "b", "c", "file")
+        self.assertFalse(ignore.is_ignored(path))
+        ignore.load_directory("a", [".gitignore"])
+        self.assertTrue(ignore.is_ignored(path))
+
+    def test_excludes(self):
+        excludes_file = self.write("global_ignore", "*.swp\n*.bak\n")
+        self.write(os.path.join(".git", "info", "exclude"),
+                   "*.tmp\n!keep.swp\n")
+        self.write(".gitignore", "!keep.tmp\n")
+        ignore = GitIgnore(self.project_dir, excludes_file=excludes_file)
+        ignore.load_directory("", [".gitignore"])
+
+        self.assertTrue(ignore)
+        self.assertTrue(ignore.is_ignored("file.swp"))
+        self.assertTrue(ignore.is_ignored("file.bak"))
+        self.assertTrue(ignore.is_ignored("file.tmp"))
+        self.assertFalse(ignore.is_ignored("keep.swp"))
+        self.assertFalse(ignore.is_ignored("keep.tmp"))
+
+    def test_empty(self):
+        ignore = GitIgnore(self.project_dir, excludes_file="")
+        self.assertFalse(ignore)
+        ignore.load_directory("", ["file"])
+        self.assertFalse(ignore.is_ignored("file"))
@@ -0,0 +1,45 @@
+import unittest
+
+from coala_quickstart.generation.IgnoreMatcher import (
+    GlobTracker, IgnoreMatcher)
+
+
+class TestIgnoreMatcher(unittest.TestCase):
+
+    def test_match(self):
+        matcher = IgnoreMatcher(["/tmp/build/**",
+                                 "/tmp/**/*.pyc",
+                                 "/tmp/**/(a|b).c"])
+        self.assertEqual(matcher.match("/tmp/build/main.pyc"), 0)
+        self.assertEqual(matcher.match("/tmp/src/main.pyc"), 1)
+        self.assertEqual(matcher.match("/tmp/src/b.c"), 2)
+        self.assertIsNone(matcher.match("/tmp/src/c.c"))
+        self.assertIsNone(matcher.match("/tmp/src/main.py"))
+
+    def test_matching_globs(self):
+        matcher = IgnoreMatcher(["/tmp/build/**",
+                                 "/tmp/**/*.pyc",
+                                 "/tmp/**/*.py"])
+        self.assertEqual(matcher.matching_globs("/tmp/build/main.pyc"),
+                         [0, 1])
+        self.assertEqual(matcher.matching_globs("/tmp/main.c"), [])
+
+    def test_empty_matcher(self):
+        matcher = IgnoreMatcher([])
+        self.assertFalse(matcher)
+        self.assertIsNone(matcher.match("/tmp/file.py"))
+
+    def test_glob_tracker(self):
+        globs = ["/tmp/build/**", "/tmp/**/*.pyc", "/tmp/**/*.py",
+                 "/tmp/**/*.o"]
+        tracker = GlobTracker(globs)
+        for path in ["/tmp/build/main.o", "/tmp/src/main.pyc",
+                     "/tmp/src/main.c"]:
+            tracker.add(path)
+        self.assertEqual(tracker.matched,
+                         {"/tmp/build/**", "/tmp/**/*.pyc", "/tmp/**/*.o"})
+        self.assertTrue(tracker)
+        tracker.add("/tmp/src/main.py")
+        self.assertEqual(tracker.matched, set(globs))
+        self.assertFalse(tracker)
+        self.assertFalse(GlobTracker([]))
@@ -0,0 +1,66 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from coala_quickstart.generation.LanguageDetection import (
+    detect_by_content, detect_file_languages, detect_languages)
+
+
+class TestLanguageDetection(unittest.TestCase):
+
+    def setUp(self):
+        self.project_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.project_dir)
+
+    def write(self, name, content):
+        path = os.path.join(self.project_dir, name)
+        with open(path, "wb") as file:
+            file.write(content)
+        return path
+
+    def test_shebangs(self):
+        self.assertEqual(detect_by_content("#!/usr/bin/python2.7\n"),
+                         ("Python",))
+        self.assertEqual(detect_by_content("#!/usr/bin/env -S node --x\n"),
+                         ("JavaScript",))
+        self.assertEqual(detect_by_content("#!/bin/sh\n"), ("sh",))
+        self.assertEqual(detect_by_content("#!/usr/bin/env\n"), ())
+        self.assertEqual(detect_by_content("#!/bin/unknown\n"), ())
+
+    def test_modelines(self):
+        self.assertEqual(detect_by_content("# -*- python -*-\n"),
+                         ("Python",))
+        self.assertEqual(
+            detect_by_content("# -*- coding: utf-8; mode: perl -*-\n"),
+            ("Perl",))
+        self.assertEqual(detect_by_content("# -*- coding: utf-8 -*-\n"), ())
+        self.assertEqual(detect_by_content("\n\n/* vim: ft=cpp */\n"),
+                         ("C++",))
+
+    def test_detect_languages(self):
+        self.assertEqual(detect_languages(self.write("Dockerfile", b"")),
+                         ("Dockerfile",))
+        self.assertEqual(detect_languages(self.write("run", b"#!/bin/bash")),
+                         ("bash",))
+        self.assertEqual(detect_languages(self.write("blob", b"#!\0sh")), ())
+        self.assertEqual(
+            detect_languages(os.path.join(self.project_dir, "missing")), ())
+
+    def test_sample_size(self):
+        path = self.write("late", b"\n" * 1000 + b"# vim: ft=ruby\n")
+        self.assertEqual(detect_languages(path), ())
+        self.assertEqual(detect_languages(path, sample_size=2000),
+                         ("Ruby",))
+
+    def test_detect_file_languages(self):
+        paths = [self.write("script{}".format(i),
+                            b"#!/usr/bin/ruby\n" if i % 2 else b"text")
+                 for i in range(10)]
+        expected = [("Ruby",) if i % 2 else () for i in range(10)]
+        self.assertEqual(list(detect_file_languages(paths, jobs=4)),
+                         expected)
+        self.assertEqual(list(detect_file_languages(paths, jobs=1)),
+                         expected)
@@ -0,0 +1,113 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from coala_quickstart.generation.BearCache import CachedBear
+from coala_quickstart.generation.Prerequisites import (
+    PrerequisiteCache, check_prerequisites, get_executable,
+    get_path_fingerprint)
+
+
+def make_bear(name, executable=None, result=True, probes=None):
+    """
+    :param name:       The name of the bear class.
+    :param executable: The executable of a linter bear, ``None`` for other
+                       bears.
+    :param result:     What ``check_prerequisites`` returns.
+    :param probes:     A list the names of the probed bears are added to.
+    :return:           A bear class.
+    """
+    def check_prerequisites(cls):
+        if probes is not None:
+            probes.append(cls.name)
+        return result
+
+    attributes = {"name": name,
+                  "check_prerequisites": classmethod(check_prerequisites)}
+    if executable is not None:
+        attributes["get_executable"] = classmethod(lambda cls: executable)
+    return type(name, (), attributes)
+
+
+class TestPrerequisites(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.cache_dir, "prerequisites.json")
+        self.probes = []
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_get_executable(self):
+        self.assertEqual(get_executable(make_bear("LintBear", "lint")),
+                         "lint")
+        self.assertIsNone(get_executable(make_bear("PipBear")))
+
+    def test_check_prerequisites(self):
+        bears = [make_bear("ABear", "does-not-exist", True, self.probes),
+                 make_bear("BBear", "sh", True, self.probes),
+                 make_bear("CBear", "sh", "'sh' has no module.",
+                           self.probes),
+                 make_bear("DBear", None, False, self.probes)]
+        cache = PrerequisiteCache(self.cache_path, "fingerprint")
+        missing = check_prerequisites(bears, jobs=4, cache=cache)
+        self.assertEqual(
+            {bear.name: message for bear, message in missing.items()},
+            {"ABear": "'does-not-exist' is not installed.",
+             "CBear": "'sh' has no module.",
+             "DBear": "The prerequisites of the bear are not satisfied."})
+        # Bears sharing an executable still run their own checks, bears
+        # whose executable is missing are not checked any further.
+        self.assertEqual(sorted(self.probes), ["BBear", "CBear", "DBear"])
+
+        # Only the executables found are kept across runs.
+        cache = PrerequisiteCache(self.cache_path, "fingerprint")
+        self.assertEqual(cache.executables,
+                         {"does-not-exist": False, "sh": True})
+        cache.executables["does-not-exist"] = True
+        self.probes.clear()
+        self.assertEqual(len(check_prerequisites(bears, cache=cache)), 2)
+        self.assertEqual(sorted(self.probes),
+                         ["ABear", "BBear", "CBear", "DBear"])
+
+        cache = PrerequisiteCache(self.cache_path, "other fingerprint")
+        self.assertEqual(cache.executables, {})
+
+    def test_unimportable_bear(self):
+        bear = CachedBear("MissingBear", "/does/not/exist.py", ["Python"])
+        cache = PrerequisiteCache(self.cache_path, "fingerprint")
+        self.assertEqual(check_prerequisites([bear], cache=cache),
+                         {bear: "The bear cannot be imported."})
+
+    def test_stdout_is_kept(self):
+        # Importing a bear swaps sys.stdout, which must not happen in
+        # several threads at once.
+        bears = []
+        for index in range(8):
+            name = "Printing{}Bear".format(index)
+            path = os.path.join(self.cache_dir, name + ".py")
+            with open(path, "w") as file:
+                file.write("import time\n"
+                           "print('importing')\n"
+                           "time.sleep(0.01)\n"
+                           "class {}:\n"
+                           "    kind = lambda: 'local'\n"
+                           "    check_prerequisites = classmethod(\n"
+                           "        lambda cls: True)\n".format(name))
+            bears.append(CachedBear(name, path, ["Python"]))
+        stdout = sys.stdout
+        cache = PrerequisiteCache(self.cache_path, "fingerprint")
+        self.assertEqual(check_prerequisites(bears, jobs=8, cache=cache), {})
+        self.assertIs(sys.stdout, stdout)
+        self.assertTrue(all(bear.bear_class is not None for bear in bears))
+
+    def test_path_fingerprint(self):
+        path = os.pathsep.join([self.cache_dir, "/does/not/exist"])
+        fingerprint = get_path_fingerprint(path)
+        self.assertEqual(get_path_fingerprint(path), fingerprint)
+        os.mkdir(os.path.join(self.cache_dir, "bin"))
+        os.utime(self.cache_dir, (0, 0))
+        self.assertNotEqual(get_path_fingerprint(path), fingerprint)
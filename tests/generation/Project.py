@@ -1,9 +1,15 @@
+import os
+import shutil
+import tempfile
 import unittest
 
 from pyprint.ConsolePrinter import ConsolePrinter
 from coala_utils.ContextManagers import retrieve_stdout
+from coala_quickstart.generation.Estimate import EstimatedShare
 from coala_quickstart.generation.Project import (
-    get_used_languages, print_used_languages)
+    count_lines, get_used_languages, language_statistics,
+    print_used_languages)
+from coala_quickstart.generation.ProjectIndex import ProjectIndex
 
 
 class TestPopularLanguages(unittest.TestCase):
@@ -29,6 +35,44 @@ class TestPopularLanguages(unittest.TestCase):
             result = get_used_languages(file_list)
             self.assertEqual(sorted(result), sorted(expected_result))
 
+    def test_weights(self):
+        project_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, project_dir)
+        contents = {"big.c": "int a;\n" * 30,
+                    "stub.py": "pass\n" * 10,
+                    "README": "x" * 60}
+        for name, content in contents.items():
+            with open(os.path.join(project_dir, name), "w") as file:
+                file.write(content)
+        file_paths = [os.path.join(project_dir, name)
+                      for name in sorted(contents)]
+
+        self.assertEqual(language_statistics(iter(file_paths)),
+                         ({"C": 1, "Python": 1}, 3))
+        self.assertEqual(language_statistics(iter(file_paths), "bytes"),
+                         ({"C": 210, "Python": 50}, 320))
+        self.assertEqual(language_statistics(iter(file_paths), "lines"),
+                         ({"C": 30, "Python": 10}, 41))
+
+        index = ProjectIndex.scan(project_dir)
+        self.assertEqual(get_used_languages(index, "lines"),
+                         get_used_languages(file_paths, "lines"))
+        self.assertEqual([lang for lang, _ in
+                          get_used_languages(index, "bytes")],
+                         ["C", "Python"])
+
+    def test_count_lines(self):
+        project_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, project_dir)
+        file_path = os.path.join(project_dir, "file")
+        for content, lines in ((b"", 0), (b"a", 1), (b"a\n", 1),
+                               (b"a\nb", 2), (b"\n" * 100, 100)):
+            with open(file_path, "wb") as file:
+                file.write(content)
+            self.assertEqual(count_lines(file_path, buffer_size=3), lines)
+        self.assertEqual(count_lines(os.path.join(project_dir, "missing")),
+                         0)
+
     def test_print_used_languages(self):
         with retrieve_stdout() as custom_stdout:
             print_used_languages(self.printer, [('Python', 100)])
@@ -40,6 +84,18 @@ class TestPopularLanguages(unittest.TestCase):
             print_used_languages(self.printer, [('Python', 75), ('C++', 25)])
             self.assertIn("75%\n", custom_stdout.getvalue())
 
+        with retrieve_stdout() as custom_stdout:
+            print_used_languages(self.printer, [('Python', 100)], "lines")
+            self.assertIn("weighted by lines", custom_stdout.getvalue())
+
+    def test_print_estimated_languages(self):
+        with retrieve_stdout() as custom_stdout:
+            print_used_languages(self.printer,
+                                 [('Python', EstimatedShare(75.5, 2.25))])
+            res = custom_stdout.getvalue()
+            self.assertIn("estimated from a sample", res)
+            self.assertIn("75% +/- 2.2%", res)
+
     def test_no_results(self):
         with retrieve_stdout() as custom_stdout:
             print_used_languages(self.printer, [])
@@ -0,0 +1,141 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from coala_quickstart.generation.ProjectIndex import ProjectIndex
+
+
+class TestProjectIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.project_dir = tempfile.mkdtemp()
+        self.files = [os.path.join("src", "main.c"),
+                      os.path.join("src", "main.h"),
+                      os.path.join("src", "lib", "util.py"),
+                      os.path.join("build", "main.o"),
+                      "README"]
+        for file in self.files:
+            path = os.path.join(self.project_dir, file)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            open(path, "w").close()
+
+    def tearDown(self):
+        shutil.rmtree(self.project_dir)
+
+    def test_scan(self):
+        index = ProjectIndex.scan(self.project_dir)
+        self.assertEqual(
+            sorted(index),
+            sorted(os.path.join(self.project_dir, file)
+                   for file in self.files))
+        self.assertEqual(list(index), list(ProjectIndex.scan(
+            self.project_dir)))
+
+    def test_scan_ignore_globs(self):
+        ignore_globs = [os.path.join(self.project_dir, "build", "**"),
+                        os.path.join(self.project_dir, "**", "*.h"),
+                        os.path.join(self.project_dir, "**", "*.js")]
+        index = ProjectIndex.scan(self.project_dir, ignore_globs)
+        self.assertNotIn(os.path.join(self.project_dir, "build", "main.o"),
+                         index)
+        self.assertNotIn(os.path.join(self.project_dir, "src", "main.h"),
+                         index)
+        self.assertIn(os.path.join(self.project_dir, "README"), index)
+        self.assertEqual(index.matched_globs, set(ignore_globs[:2]))
+
+    def test_languages(self):
+        index = ProjectIndex.scan(self.project_dir)
+        self.assertEqual(dict(index.language_counts()),
+                         {"C": 2, "C++": 1, "Python": 1})
+        self.assertEqual(dict(index.extensions_by_language()),
+                         {"c": {".c", ".h"},
+                          "c++": {".h"},
+                          "python": {".py"}})
+        lang_files = index.files_by_language()
+        self.assertEqual(len(lang_files["all"]), 3)
+        self.assertEqual(lang_files["python"],
+                         {os.path.join(self.project_dir,
+                                       "src", "lib", "util.py")})
+
+    def test_without_files(self):
+        with open(os.path.join(self.project_dir, "run"), "w") as file:
+            file.write("#!/usr/bin/env python3\n")
+        ignore_globs = [os.path.join(self.project_dir, "**", "*.h")]
+        index = ProjectIndex.scan(self.project_dir, ignore_globs)
+        aggregates = ProjectIndex.scan(self.project_dir, ignore_globs,
+                                       keep_files=False)
+        self.assertEqual(len(aggregates), len(index))
+        self.assertEqual(dict(aggregates.language_counts()),
+                         dict(index.language_counts()))
+        self.assertEqual(dict(aggregates.extensions_by_language()),
+                         dict(index.extensions_by_language()))
+        self.assertEqual(dict(aggregates.detected_files_by_language()),
+                         dict(index.detected_files_by_language()))
+        self.assertEqual(aggregates.matched_globs, index.matched_globs)
+        # Only the files of unknown extensions are kept.
+        self.assertEqual(len(aggregates._file_names), 3)
+        with self.assertRaises(TypeError):
+            aggregates.files_by_language()
+
+    def test_language_weights(self):
+        with open(os.path.join(self.project_dir, "src", "main.c"),
+                  "w") as file:
+            file.write("int main;\n")
+        with open(os.path.join(self.project_dir, "Makefile"), "w") as file:
+            file.write("all:\n")
+        index = ProjectIndex.scan(self.project_dir, keep_files=False,
+                                  weigh=os.path.getsize)
+        totals, total = index.language_weights(os.path.getsize)
+        self.assertEqual(dict(totals), {"C": 10, "C++": 0, "Python": 0,
+                                        "Makefile": 5})
+        self.assertEqual(total, 15)
+
+    def test_from_paths(self):
+        index = ProjectIndex.from_paths(["/tmp/file.py", "/tmp/file.py"])
+        self.assertEqual(len(index), 2)
+        self.assertEqual(index[1], "/tmp/file.py")
+        self.assertEqual(index.languages(0), ("Python",))
+        self.assertIs(ProjectIndex.from_paths(index), index)
+
+    def test_scan_jobs(self):
+        ignore_globs = [os.path.join(self.project_dir, "**", "*.h")]
+        self.assertEqual(
+            list(ProjectIndex.scan(self.project_dir, ignore_globs, jobs=1)),
+            list(ProjectIndex.scan(self.project_dir, ignore_globs, jobs=4)))
+
+    def test_scan_prunes_ignored_directories(self):
+        build_glob = os.path.join(self.project_dir, "build", "**")
+        index = ProjectIndex.scan(self.project_dir, [build_glob])
+        self.assertEqual(index.pruned_dirs, 1)
+        self.assertGreater(index.glob_evaluations, len(index))
+        self.assertTrue(index.is_pruned("build"))
+        self.assertFalse(index.is_pruned("src"))
+        self.assertNotIn("build", index._dir_ids)
+        self.assertEqual(index.matched_globs, {build_glob})
+
+    def test_detect_languages(self):
+        contents = {"Makefile": "all:\n",
+                    os.path.join("bin", "run"): "#!/usr/bin/env python3\n",
+                    os.path.join("bin", "data"): "plain text\n"}
+        for file, content in contents.items():
+            path = os.path.join(self.project_dir, file)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(content)
+
+        index = ProjectIndex.scan(self.project_dir, jobs=2)
+        self.assertEqual(dict(index.language_counts()),
+                         {"C": 2, "C++": 1, "Python": 2, "Makefile": 1})
+        self.assertEqual(dict(index.detected_files_by_language()),
+                         {"python": {os.path.join("bin", "run")},
+                          "makefile": {"Makefile"}})
+        self.assertIn(os.path.join(self.project_dir, "bin", "run"),
+                      index.files_by_language()["python"])
+        self.assertEqual(
+            ProjectIndex.scan(self.project_dir,
+                              jobs=1).detected_files_by_language(),
+            index.detected_files_by_language())
+
+        index = ProjectIndex.scan(self.project_dir, detect=False)
+        self.assertEqual(dict(index.detected_files_by_language()), {})
@@ -0,0 +1,206 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from collections import OrderedDict
+from unittest.mock import Mock, patch
+
+from coalib.settings.Section import Section
+
+from coala_quickstart.generation import Walker
+from coala_quickstart.generation.ProjectIndex import ProjectIndex
+from coala_quickstart.generation.ScanState import (
+    ScanState, get_state_path, section_digest)
+
+
+def age(path, seconds=60):
+    """
+    Moves the modification time of a path back, so that it is not too
+    recent to be trusted.
+    """
+    mtime = time.time() - seconds
+    os.utime(path, (mtime, mtime))
+
+
+class TestScanState(unittest.TestCase):
+
+    def setUp(self):
+        self.project_dir = tempfile.mkdtemp()
+        self.state_path = os.path.join(self.project_dir, "..",
+                                       os.path.basename(self.project_dir) +
+                                       ".state.json")
+        os.makedirs(os.path.join(self.project_dir, "src"))
+        for name, content in (("script", "#!/bin/sh\n"),
+                              ("src/main.py", ""),
+                              ("src/notes", "text\n")):
+            path = os.path.join(self.project_dir, name)
+            with open(path, "w") as file:
+                file.write(content)
+            age(path)
+        age(os.path.join(self.project_dir, "src"))
+        age(self.project_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.project_dir)
+        if os.path.exists(self.state_path):
+            os.remove(self.state_path)
+
+    def scan(self):
+        state = ScanState(self.project_dir, self.state_path)
+        index = ProjectIndex.scan(self.project_dir, state=state)
+        return state, index
+
+    def test_get_state_path(self):
+        with patch.dict(os.environ, {"XDG_CACHE_HOME": "/cache"}):
+            path = get_state_path(self.project_dir)
+        self.assertEqual(os.path.dirname(path),
+                         os.path.join("/cache", "coala-quickstart", "state"))
+        self.assertNotEqual(path, get_state_path(self.project_dir + "x"))
+
+    def test_unchanged_directories_are_not_listed(self):
+        state, index = self.scan()
+        self.assertFalse(state.loaded)
+        self.assertEqual(sorted(state.changed_dirs), ["", "src"])
+        state.save()
+
+        with patch.object(Walker, "_scan_directory") as scan_directory:
+            state, index = self.scan()
+        self.assertTrue(state.loaded)
+        self.assertFalse(scan_directory.called)
+        self.assertEqual(state.changed_dirs, [])
+        self.assertEqual(sorted(index),
+                         sorted(os.path.join(self.project_dir, name)
+                                for name in ("script", "src/main.py",
+                                             "src/notes")))
+        self.assertEqual(dict(index.language_counts()),
+                         {"Python": 1, "sh": 1})
+
+    def test_changed_directory_is_listed(self):
+        state, index = self.scan()
+        state.record_index(index)
+        state.save()
+
+        path = os.path.join(self.project_dir, "src", "lib.py")
+        open(path, "w").close()
+        age(path)
+        age(os.path.join(self.project_dir, "src"), 30)
+
+        state, index = self.scan()
+        self.assertEqual(state.changed_dirs, ["src"])
+        self.assertIn(path, list(index))
+        self.assertEqual(state.record_index(index), ["Python"])
+        self.assertEqual(state.language_counts, {"Python": 2, "sh": 1})
+
+    def test_recent_directory_is_not_kept(self):
+        os.utime(os.path.join(self.project_dir, "src"))
+        state, _ = self.scan()
+        state.save()
+
+        state, _ = self.scan()
+        self.assertEqual(state.changed_dirs, ["src"])
+
+    def test_detected_languages_are_kept(self):
+        state, _ = self.scan()
+        state.save()
+
+        with patch("coala_quickstart.generation.ProjectIndex."
+                   "detect_file_languages",
+                   return_value=iter(())) as detect:
+            state, index = self.scan()
+        self.assertEqual(detect.call_args[0][0], [])
+        self.assertEqual(dict(index.language_counts()),
+                         {"Python": 1, "sh": 1})
+
+        path = os.path.join(self.project_dir, "script")
+        with open(path, "w") as file:
+            file.write("#!/usr/bin/env ruby\n")
+        age(path, 30)
+        state, index = self.scan()
+        self.assertEqual(dict(index.language_counts()),
+                         {"Python": 1, "Ruby": 1})
+
+    def test_sections(self):
+        state = ScanState(self.project_dir, self.state_path)
+        section = Section("python")
+        section["bears"] = "SomeBear"
+        digest = section_digest(section)
+        self.assertFalse(state.restore_section("python", section, digest))
+        section["max_length"] = "80"
+        state.record_section("python", section, digest)
+        state.finish_sections()
+        self.assertEqual(state.changed_sections, ["python"])
+        state.save()
+
+        state = ScanState(self.project_dir, self.state_path)
+        section = Section("python")
+        section["bears"] = "SomeBear"
+        self.assertTrue(state.restore_section("python", section, digest))
+        self.assertEqual(str(section["max_length"]), "80")
+        state.record_section("python", section, digest)
+        state.finish_sections()
+        self.assertEqual(state.changed_sections, [])
+
+        other = Section("python")
+        other["bears"] = "OtherBear"
+        self.assertFalse(state.restore_section("python", other,
+                                               section_digest(other)))
+
+        state = ScanState(self.project_dir, self.state_path)
+        state.finish_sections()
+        self.assertEqual(state.changed_sections, ["python"])
+
+
+class TestIncrementalSettings(unittest.TestCase):
+
+    def test_unchanged_sections_are_not_filled(self):
+        from coala_quickstart.generation.Settings import generate_settings
+
+        project_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, project_dir)
+        state = ScanState(project_dir,
+                          os.path.join(project_dir, "state.json"))
+        state.sections = {"default": {
+            "digest": None, "settings": [["bears", ""], ["files", ""]]}}
+        sections = OrderedDict(default=Section("default"))
+        sections["default"]["bears"] = ""
+        sections["default"]["files"] = ""
+        state.sections["default"]["digest"] = section_digest(
+            sections["default"])
+
+        with patch("coala_quickstart.generation.Settings.fill_settings") \
+                as fill_settings:
+            settings = generate_settings(project_dir, [], [],
+                                         {"All": []}, state)
+        self.assertFalse(fill_settings.called)
+        self.assertEqual(list(settings), ["default"])
+        self.assertEqual(state.changed_sections, [])
+
+    def test_coafile_is_written_again_when_missing(self):
+        from coala_quickstart.generation.Settings import write_coafile
+
+        project_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, project_dir)
+        state_path = os.path.join(project_dir, "state.json")
+        with open(os.path.join(project_dir, ".coafile"), "w") as file:
+            file.write("[all]\n")
+        settings = OrderedDict(default=Section("default"))
+        settings["default"]["bears"] = "SomeBear"
+        printer = Mock()
+
+        def run():
+            state = ScanState(project_dir, state_path)
+            state.record_section("default", settings["default"], "digest")
+            state.finish_sections()
+            written = write_coafile(printer, project_dir, settings, state)
+            state.save()
+            return written
+
+        generated = os.path.join(project_dir, ".coafile.new")
+        self.assertEqual(run(), generated)
+        self.assertIsNone(run())
+        os.remove(generated)
+        self.assertEqual(run(), generated)
+        with open(generated, "a") as file:
+            file.write("# edited\n")
+        self.assertEqual(run(), generated)
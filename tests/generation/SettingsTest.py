@@ -1,10 +1,12 @@
 import os
+import shutil
 import tempfile
 import unittest
 from datetime import date
 
 from coalib.output.ConfWriter import ConfWriter
-from coala_quickstart.generation.Settings import write_info
+from coala_quickstart.generation.Settings import (
+    generate_ignore_field, generate_section, write_info)
 
 class SettingsTest(unittest.TestCase):
 
@@ -27,3 +29,47 @@ class SettingsTest(unittest.TestCase):
             line = f.readline()
             
         self.assertEqual(result_comment, line)
+
+
+class GenerateSectionTest(unittest.TestCase):
+
+    def test_generate_section_file_paths(self):
+        section = generate_section(
+            "makefile", [], [], ["Makefile", os.path.join("sub", "Makefile")])
+        self.assertEqual(str(section["files"]),
+                         "Makefile, " + os.path.join("sub", "Makefile"))
+
+        section = generate_section("python", [".py"], [],
+                                   [os.path.join("bin", "run[1]")])
+        self.assertEqual(str(section["files"]),
+                         "**.py, " + os.path.join("bin", "run[[]1[]]"))
+
+
+class GenerateIgnoreFieldTest(unittest.TestCase):
+
+    def setUp(self):
+        self.project_dir = tempfile.mkdtemp()
+        for file in [os.path.join("build", "main.o"),
+                     os.path.join("src", "main.c"),
+                     os.path.join("src", "main.pyc")]:
+            path = os.path.join(self.project_dir, file)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            open(path, "w").close()
+
+    def tearDown(self):
+        shutil.rmtree(self.project_dir)
+
+    def test_generate_ignore_field(self):
+        ignore_globs = [os.path.join(self.project_dir, "build", "**"),
+                        os.path.join(self.project_dir, "**", "*.pyc"),
+                        os.path.join(self.project_dir, "**", "*.py"),
+                        "vendor/**"]
+        self.assertEqual(
+            generate_ignore_field(self.project_dir, [], {}, ignore_globs),
+            "build/**, **/*.pyc")
+
+    def test_generate_ignore_field_relative_globs(self):
+        self.assertEqual(
+            generate_ignore_field(self.project_dir, [], {},
+                                  ["src/*.c", "src/*.h"]),
+            "src/*.c")